@@ -0,0 +1,103 @@
+"""
+# Benchmark: COG encoding profiles
+
+Run each test-data fixture product through its processor once per encoding
+profile and report encode time, output size and tile read latency (a
+block from the full resolution image and from the smallest overview).
+
+Fixtures are found the same way as the integration tests: JSON product
+lists under `$GEOPROC/fixtures` with `local_source` relative to `$GEOPROC`.
+
+Usage:
+
+    GEOPROC=/path/to/geoproc python benchmarks/cog_profiles.py \
+        --profiles default fast small lossy-precip --plugin ncep-mrms-v12-multisensor-qpe-01h-pass2
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from osgeo import gdal
+
+from cumulus_geoproc.processors import geo_proc
+from cumulus_geoproc.utils import cgdal
+
+gdal.UseExceptions()
+
+
+def fixture_products(repo_root: Path):
+    """Test products from the fixture JSON files"""
+    for dirname, _, filenames in os.walk(repo_root / "fixtures"):
+        for filename in filenames:
+            if filename.endswith(".json"):
+                with Path(dirname, filename).open("r", encoding="utf-8") as fptr:
+                    objs = json.load(fptr)
+                if isinstance(objs, list):
+                    yield from objs
+
+
+def tile_read_seconds(tif: str):
+    """Read one block at full resolution and the smallest overview"""
+    start = time.perf_counter()
+    ds = gdal.Open(tif)
+    band = ds.GetRasterBand(1)
+    xblock, yblock = band.GetBlockSize()
+    band.ReadRaster(
+        band.XSize // 2 // xblock * xblock,
+        band.YSize // 2 // yblock * yblock,
+        min(xblock, band.XSize),
+        min(yblock, band.YSize),
+    )
+    if band.GetOverviewCount():
+        band.GetOverview(band.GetOverviewCount() - 1).ReadRaster()
+    ds = None
+    return time.perf_counter() - start
+
+
+def run(product: dict, repo_root: Path, profile: str):
+    """Process a product with a profile returning (seconds, bytes, read seconds)"""
+    with TemporaryDirectory() as td, cgdal.use_cog_profile(profile):
+        start = time.perf_counter()
+        outputs = geo_proc(
+            plugin=product["plugin"],
+            src=str(repo_root / product["local_source"]),
+            dst=td,
+        )
+        encode = time.perf_counter() - start
+        files = [o["file"] for o in outputs]
+        size = sum(os.path.getsize(f) for f in files)
+        read = sum(tile_read_seconds(f) for f in files) / max(1, len(files))
+    return encode, size, read, len(files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--profiles", nargs="+", default=["default", "fast", "small", "lossy-precip"]
+    )
+    parser.add_argument("--plugin", nargs="*", help="only these processors")
+    args = parser.parse_args()
+
+    repo_root = Path(os.environ["GEOPROC"])
+
+    print(
+        f"{'plugin':45} {'profile':14} {'files':>5} {'encode s':>9} "
+        f"{'MiB':>9} {'read ms':>8}"
+    )
+    for product in fixture_products(repo_root):
+        if args.plugin and product["plugin"] not in args.plugin:
+            continue
+        for profile in args.profiles:
+            encode, size, read, count = run(product, repo_root, profile)
+            print(
+                f"{product['plugin']:45} {profile:14} {count:5d} {encode:9.2f} "
+                f"{size / 2**20:9.2f} {read * 1000:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+# Micro-benchmark: per-object S3 overhead
+
+Compare uploading small objects with a new boto3 resource per call (the
+previous behavior) against the shared `boto.s3_client()`.
+
+Runs against `ENDPOINT_URL_S3` (e.g. MinIO from docker compose) or, with
+`--moto`, an in-process moto stand-in.
+
+Usage:
+
+    python benchmarks/s3_client.py --objects 60 --moto
+"""
+
+import argparse
+import os
+import time
+from contextlib import nullcontext
+from tempfile import NamedTemporaryFile
+
+from cumulus_geoproc.configurations import ENDPOINT_URL_S3
+from cumulus_geoproc.utils import boto
+
+
+def per_call_resource(file_name: str, bucket: str, key: str):
+    """Upload building a new resource each call"""
+    s3 = boto.boto3_resource(service_name="s3", endpoint_url=ENDPOINT_URL_S3)
+    s3.meta.client.upload_file(Filename=file_name, Bucket=bucket, Key=key)
+
+
+def shared_client(file_name: str, bucket: str, key: str):
+    """Upload with the shared, cached client"""
+    boto.s3_upload_file(file_name, bucket, key)
+
+
+def timeit(func, file_name: str, bucket: str, objects: int):
+    start = time.perf_counter()
+    for i in range(objects):
+        func(file_name, bucket, f"benchmark/{func.__name__}/{i}.tif")
+    return (time.perf_counter() - start) / objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--objects", type=int, default=60)
+    parser.add_argument("--size", type=int, default=64 * 1024, help="bytes")
+    parser.add_argument("--bucket", default="cumulus-benchmark")
+    parser.add_argument("--moto", action="store_true", help="use moto mock_aws")
+    args = parser.parse_args()
+
+    if args.moto:
+        from moto import mock_aws
+
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        context = mock_aws()
+    else:
+        context = nullcontext()
+
+    with context, NamedTemporaryFile(suffix=".tif") as fptr:
+        fptr.write(os.urandom(args.size))
+        fptr.flush()
+
+        client = boto.s3_client()
+        try:
+            client.create_bucket(Bucket=args.bucket)
+        except client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+        for func in (per_call_resource, shared_client):
+            seconds = timeit(func, fptr.name, args.bucket, args.objects)
+            print(f"{func.__name__:>20}: {seconds * 1000:8.2f} ms/object")
+
+
+if __name__ == "__main__":
+    main()
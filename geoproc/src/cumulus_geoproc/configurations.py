@@ -35,14 +35,38 @@ USE_SSL: bool = (
 # SQS Configuration
 # ------------------------- #
 QUEUE_NAME: str = os.getenv("QUEUE_NAME", "cumulus-geoprocess")
-WAIT_TIME_SECONDS: int = os.getenv("WAIT_TIME_SECONDS", default=20)
-MAX_Q_MESSAGES: int = os.getenv("MAX_Q_MESSAGES", default=10)
+WAIT_TIME_SECONDS: int = int(os.getenv("WAIT_TIME_SECONDS", default=20))
+MAX_Q_MESSAGES: int = int(os.getenv("MAX_Q_MESSAGES", default=10))
+
+# Seconds a received message stays hidden; extended while still processing
+VISIBILITY_TIMEOUT: int = int(os.getenv("VISIBILITY_TIMEOUT", default=300))
+
+# ------------------------- #
+# Worker Configuration
+# ------------------------- #
+# Number of messages processed concurrently, one process each
+WORKER_PROCESSES: int = int(
+    os.getenv("WORKER_PROCESSES", default=os.cpu_count() or 1)
+)
 
 # ------------------------- #
 # S3 Configuration
 # ------------------------- #
 WRITE_TO_BUCKET: str = os.getenv("WRITE_TO_BUCKET", default="castle-data-develop")
 
+# boto3 TransferConfig for the shared S3 client; sizes in bytes
+S3_MULTIPART_THRESHOLD: int = int(
+    os.getenv("S3_MULTIPART_THRESHOLD", default=8 * 1024 * 1024)
+)
+S3_MULTIPART_CHUNKSIZE: int = int(
+    os.getenv("S3_MULTIPART_CHUNKSIZE", default=8 * 1024 * 1024)
+)
+S3_MAX_CONCURRENCY: int = int(os.getenv("S3_MAX_CONCURRENCY", default=10))
+# connection pool size of the shared S3 client
+S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", default=32))
+# number of products uploaded concurrently per message
+S3_UPLOAD_CONCURRENCY: int = int(os.getenv("S3_UPLOAD_CONCURRENCY", default=16))
+
 
 # ------------------------- #
 # GDAL Configuration
@@ -55,6 +79,82 @@ CPL_VSIL_USE_TEMP_FILE_FOR_RANDOM_WRITE: str = os.getenv(
 )
 CPL_TMPDIR: str = os.getenv("CPL_TMPDIR", default="/tmp")
 
+# threads per process for GDAL (NUM_THREADS of COG writes); unset derives it
+# from the cores and the processes sharing them, all cores for a lone
+# process and cores / pool size in a worker process (cgdal.configure_gdal)
+GDAL_THREAD_BUDGET: int = (
+    int(os.getenv("GDAL_THREAD_BUDGET")) if os.getenv("GDAL_THREAD_BUDGET") else None
+)
+GDAL_NUM_THREADS: str = os.getenv("GDAL_NUM_THREADS", default=None)
+# raster block cache; GDAL's default unless set.  Worker processes share
+# GDAL_CACHEMAX_WORKERS_PERCENT of RAM between them when it is unset
+GDAL_CACHEMAX: str = os.getenv("GDAL_CACHEMAX", default=None)
+GDAL_CACHEMAX_WORKERS_PERCENT: int = int(
+    os.getenv("GDAL_CACHEMAX_WORKERS_PERCENT", default=20)
+)
+# read-ahead cache for /vsis3/, /vsicurl/ and /vsigzip/ sources
+VSI_CACHE: str = os.getenv("VSI_CACHE", default="TRUE")
+VSI_CACHE_SIZE: str = os.getenv("VSI_CACHE_SIZE", default=str(25 * 1024 * 1024))
+
+# rastercalc window size in pixels (window x window) processed at a time
+RASTER_CALC_WINDOW: int = int(os.getenv("RASTER_CALC_WINDOW", default=1024))
+
+# SNODAS interpolation product codes processed concurrently
+SNODAS_INTERP_WORKERS: int = int(
+    os.getenv("SNODAS_INTERP_WORKERS", default=min(5, os.cpu_count() or 1))
+)
+
+# COGs written concurrently from one multi-band source read
+COG_WRITE_WORKERS: int = int(
+    os.getenv("COG_WRITE_WORKERS", default=min(4, os.cpu_count() or 1))
+)
+
+# utils.parallel.parallel_map worker threads, each with its own GDAL handle
+PARALLEL_MAP_WORKERS: int = int(
+    os.getenv("PARALLEL_MAP_WORKERS", default=min(4, os.cpu_count() or 1))
+)
+
+# COG validation after writes: always | sampled:N (every Nth) | off | tests-only
+COG_VALIDATION: str = os.getenv("COG_VALIDATION", default="always").lower()
+# full: validate_cloud_optimized_geotiff walking every tile offset
+# structural: ghost header, tiling and IFD order only
+COG_VALIDATOR: str = os.getenv("COG_VALIDATOR", default="full").lower()
+
+# COG encoding profile (cgdal.COG_PROFILES) used unless the processor sets
+# COG_PROFILE or the acquirable is mapped in COG_ACQUIRABLE_PROFILES
+# e.g. COG_ACQUIRABLE_PROFILES="wpc-qpf-2p5km=small,hrrr-total-precip=fast"
+COG_PROFILE: str = os.getenv("COG_PROFILE", default="default")
+COG_ACQUIRABLE_PROFILES: dict = dict(
+    item.split("=", 1)
+    for item in os.getenv("COG_ACQUIRABLE_PROFILES", default="").split(",")
+    if "=" in item
+)
+
+# directory persisting precomputed resampling kernels (utils.resample)
+RESAMPLE_KERNEL_CACHE: str = os.getenv(
+    "RESAMPLE_KERNEL_CACHE", default=os.path.join(CPL_TMPDIR, "cumulus-kernels")
+)
+
+# most timesteps read and resampled together (utils.resample.apply_kernel_batch)
+RESAMPLE_TIME_CHUNK: int = int(os.getenv("RESAMPLE_TIME_CHUNK", default="24"))
+
+# ceiling in MiB for a single NetCDF read (utils.ncread)
+NETCDF_READ_LIMIT_MB: int = int(os.getenv("NETCDF_READ_LIMIT_MB", default="256"))
+
+# Pass acquirables as GDAL virtual paths (/vsis3/ or /vsicurl/) to processors
+# declaring VIRTUAL_SOURCE rather than downloading them first
+VIRTUAL_SOURCES: bool = (
+    bool(0)
+    if os.getenv("VIRTUAL_SOURCES", default="False").lower() == "false"
+    else bool(1)
+)
+VIRTUAL_SOURCE_VSI: str = os.getenv("VIRTUAL_SOURCE_VSI", default="vsis3")
+
+# buffer size in bytes used when streaming decompressed files to disk
+DECOMPRESS_BUFFER_SIZE: int = int(
+    os.getenv("DECOMPRESS_BUFFER_SIZE", default=1024 * 1024)
+)
+
 
 # ------------------------- #
 # Configuration Parameters
@@ -74,6 +174,12 @@ HTTP2: bool = (
     bool(0) if os.getenv("HTTP2", default="False").lower() == "false" else bool(1)
 )
 
+# Cumulus API productfiles notifications; payloads larger than the chunk size
+# are POSTed as concurrent batches and retried with exponential backoff
+CUMULUS_API_CHUNK_SIZE: int = int(os.getenv("CUMULUS_API_CHUNK_SIZE", default=100))
+CUMULUS_API_RETRIES: int = int(os.getenv("CUMULUS_API_RETRIES", default=3))
+CUMULUS_API_BACKOFF: float = float(os.getenv("CUMULUS_API_BACKOFF", default=0.5))
+
 # Cumulus products key
 CUMULUS_PRODUCTS_BASEKEY: str = os.getenv(
     "CUMULUS_PRODUCTS_BASEKEY", default="cumulus/products"
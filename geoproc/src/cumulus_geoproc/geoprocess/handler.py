@@ -2,8 +2,10 @@
 """
 
 import asyncio
+import atexit
 import os
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 from botocore.exceptions import ClientError
 from cumulus_geoproc import logger
@@ -12,19 +14,75 @@ from cumulus_geoproc.configurations import (
     CUMULUS_API_URL,
     CUMULUS_PRODUCTS_BASEKEY,
     HTTP2,
+    S3_UPLOAD_CONCURRENCY,
+    VIRTUAL_SOURCE_VSI,
+    VIRTUAL_SOURCES,
 )
 from cumulus_geoproc.geoprocess.snodas import interpolate
-from cumulus_geoproc.processors import geo_proc
-from cumulus_geoproc.utils import boto, capi
+from cumulus_geoproc.processors import cog_profile, geo_proc, virtual_source
+from cumulus_geoproc.utils import boto, capi, cgdal
 
 this = os.path.basename(__file__)
 
+# event loop and CumulusAPI kept open for the life of the (worker) process
+_notify = None
+_notify_pid = None
+
+
+def cumulus_notifier():
+    """Event loop and CumulusAPI with a pooled client reused across messages
+
+    Created once per process so notifications share connections rather than
+    a new event loop, TLS handshake and pool per message.
+
+    Returns
+    -------
+    tuple[asyncio.AbstractEventLoop, capi.CumulusAPI]
+        event loop and open CumulusAPI with the productfiles endpoint
+    """
+    global _notify, _notify_pid
+
+    if _notify is None or _notify_pid != os.getpid():
+        loop = asyncio.new_event_loop()
+        cumulus_api = capi.CumulusAPI(CUMULUS_API_URL, HTTP2)
+
+        # Patch to work with new /api endpoints if present
+        if cumulus_api.endpoint == "/api":
+            cumulus_api.endpoint = "api/productfiles"
+        else:
+            # Use the old path where there is not /api present
+            cumulus_api.endpoint = "productfiles"
+
+        cumulus_api.query = {"key": APPLICATION_KEY}
+
+        loop.run_until_complete(cumulus_api.open())
+        _notify, _notify_pid = (loop, cumulus_api), os.getpid()
+
+    return _notify
+
+
+def close_notifier():
+    """Close the process CumulusAPI client and its event loop"""
+    global _notify
+
+    if _notify is not None and _notify_pid == os.getpid():
+        loop, cumulus_api = _notify
+        loop.run_until_complete(cumulus_api.aclose())
+        loop.close()
+    _notify = None
+
+
+atexit.register(close_notifier)
+
 
 def handle_message(geoprocess: str, GeoCfg: namedtuple, dst: str):
     """Handle the message from SQS determining what to do with it
 
     Geo processing is either 'snodas-interpolate' or 'incoming-file-to-cogs'
 
+    With VIRTUAL_SOURCES enabled, processors declaring VIRTUAL_SOURCE get a
+    /vsis3/ (or /vsicurl/) path instead of a downloaded file.
+
     Return a list of dictionary objects defining what was created and needs
     to be uploaded to S3 and notify Cumulus DB.
 
@@ -55,20 +113,66 @@ def handle_message(geoprocess: str, GeoCfg: namedtuple, dst: str):
     elif geoprocess == "incoming-file-to-cogs":
         # process and get resulting dictionary object defining the new grid
         # add acquirable id to each object in the list
-        if src := boto.s3_download_file(bucket=GeoCfg.bucket, key=GeoCfg.key, dst=dst):
-            proc_list = geo_proc(
-                plugin=GeoCfg.acquirable_slug,
-                src=src,
-                dst=dst,
-                acquirable=GeoCfg.acquirable_slug,
-            )
+        if VIRTUAL_SOURCES and virtual_source(GeoCfg.acquirable_slug):
+            # processor reads only what it needs directly from S3
+            src = cgdal.vsi_source(GeoCfg.bucket, GeoCfg.key, vsi=VIRTUAL_SOURCE_VSI)
+            logger.debug(f"Virtual source: {src}")
+        else:
+            src = boto.s3_download_file(bucket=GeoCfg.bucket, key=GeoCfg.key, dst=dst)
+
+        if src:
+            with cgdal.use_cog_profile(cog_profile(GeoCfg.acquirable_slug)):
+                proc_list = geo_proc(
+                    plugin=GeoCfg.acquirable_slug,
+                    src=src,
+                    dst=dst,
+                    acquirable=GeoCfg.acquirable_slug,
+                )
 
     return proc_list
 
 
+def upload_notice(notice: dict, bucket: str):
+    """Upload a single processed product to S3
+
+    Parameters
+    ----------
+    notice : dict
+        processed product object from the processor
+    bucket : str
+        S3 bucket
+
+    Returns
+    -------
+    dict | None
+        notice with 'file' switched to the S3 key or None if not uploaded
+    """
+    # try to upload and return None if it doesn't so only what was
+    # successfully uploaded gets notified
+    logger.debug(f"Upload Notice from Notices: {notice=}")
+    try:
+        file = notice["file"]
+        filename = os.path.basename(file)
+        key = "/".join([CUMULUS_PRODUCTS_BASEKEY, notice["filetype"], filename])
+        logger.debug(f"Notice key: {key}")
+
+        # upload the file to S3
+        if boto.s3_upload_file(file, bucket, key):
+            logger.debug(f"S3 Upload: {file} -> {bucket}/{key}")
+
+            # If successful on upload, notify cumulus, but
+            # switch file to the key first
+            return {**notice, "file": key}
+    except (KeyError, ClientError, Exception) as ex:
+        logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+
 def upload_notify(notices: list, bucket: str):
     """Upload processed products and POST notification
 
+    Uploads run concurrently, bounded by S3_UPLOAD_CONCURRENCY, sharing
+    the cached S3 client.
+
     Parameters
     ----------
     notices : list
@@ -79,54 +183,33 @@ def upload_notify(notices: list, bucket: str):
     Returns
     -------
     List
-        List of successful uploads and POST notifications
+        List of successful uploads and POST notifications; one "upload"
+        entry per notification POST (CUMULUS_API_CHUNK_SIZE notices each)
     """
     responses = []
     payload = []
 
-    # upload
-    for notice in notices:
-        # try to upload and continue if it doesn't returning only
-        # what was successfully uploaded
-        logger.debug(f"Upload Notice from Notices: {notice=}")
-        try:
-            # try to upload to S3
-            file = notice["file"]
-            filename = os.path.basename(file)
-            key = "/".join([CUMULUS_PRODUCTS_BASEKEY, notice["filetype"], filename])
-            logger.debug(f"Notice key: {key}")
-
-            # upload the file to S3
-            if boto.s3_upload_file(file, bucket, key):
-                logger.debug(f"S3 Upload: {file} -> {bucket}/{key}")
-
-                # If successful on upload, notify cumulus, but
-                # switch file to the key first
-                notice["file"] = key
-
-                responses.append({"key": key})
-                payload.append(notice)
-                logger.debug(f"Append Response: {responses[-1]}")
-        except (KeyError, ClientError, Exception) as ex:
-            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
-            continue
+    # upload; map preserves the order of the notices
+    workers = max(1, min(S3_UPLOAD_CONCURRENCY, len(notices)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        uploaded = executor.map(lambda n: upload_notice(n, bucket), notices)
+
+        for notice in uploaded:
+            if notice is None:
+                continue
+            responses.append({"key": notice["file"]})
+            payload.append(notice)
+            logger.debug(f"Append Response: {responses[-1]}")
 
     # notify
     if len(payload) > 0:
-        cumulus_api = capi.CumulusAPI(CUMULUS_API_URL, HTTP2)
-
-        # Patch to work with new /api endpoints if present
-        if cumulus_api.endpoint == "/api":
-            cumulus_api.endpoint = "api/productfiles"
-        else:
-            # Use the old path where there is not /api present
-            cumulus_api.endpoint = "productfiles"
-
-        cumulus_api.query = {"key": APPLICATION_KEY}
+        loop, cumulus_api = cumulus_notifier()
 
         logger.debug(f"Payload to POST: {payload}")
-        resp = asyncio.run(cumulus_api.post_(cumulus_api.url, payload=payload))
+        resps = loop.run_until_complete(
+            cumulus_api.post_chunked(cumulus_api.url, payload=payload)
+        )
 
-        responses.append({"upload": resp})
+        responses.extend({"upload": resp} for resp in resps)
 
     return responses
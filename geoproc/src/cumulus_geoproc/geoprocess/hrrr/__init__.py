@@ -18,6 +18,9 @@ class HrrrIdx:
     This class provides methods to parse lines from idx files and return a band
     number.  Logic to determine if the resulting parse values are done outside this
     class.
+
+    Reading whole idx files, matching messages and their byte ranges is done
+    with cumulus_geoproc.utils.gribidx
     """
 
     def __init__(self):
@@ -27,7 +30,7 @@ class HrrrIdx:
         self.cycle_dt = None
         self.desc = None
         self.fcst_hr = None
-        self.sdf = "%Y%m%d%H%M"
+        self.sdf = "%Y%m%d%H"
         self.fcst_pattern = re.compile(r"\d+-?\d+")
 
     def __repr__(self):
@@ -61,7 +64,7 @@ class HrrrIdx:
     @property
     def cycle_date(self):
         try:
-            return datetime.strptime(self.cycle_date, self.sdf).replace(
+            return datetime.strptime(self.cycle_dt, self.sdf).replace(
                 tzinfo=timezone.utc
             )
         except Exception as ex:
@@ -9,8 +9,9 @@ import os
 from datetime import datetime, timezone
 from string import Template
 
+import numpy
 from cumulus_geoproc import logger
-from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils import cgdal, rastercalc
 from osgeo import gdal
 
 gdal.UseExceptions()
@@ -122,35 +123,19 @@ def snow_melt_mm(translated_tif: dict):
         return
 
     snowmelt_mm = snowmelt.replace(snowmelt_code, snowmelt_code_mm)
-    temp_snowmelt_mm = snowmelt.replace(snowmelt_code, "9999")
 
     # convert snow melt runoff as meters / 100_000 to mm
     # 100_000 is the scale factor getting values to meters
     try:
-        cgdal.gdal_calculate(
-            "-A",
-            snowmelt,
-            "--outfile",
-            temp_snowmelt_mm,
-            "--calc",
-            "A.astype(numpy.float32) / 100_000 * 1000",
-            "--quiet",
-            "--overwrite",
-        )
-        gdal.Translate(
+        rastercalc.calculate_to_cog(
+            {"A": snowmelt},
+            lambda A: A.astype(numpy.float32) / 100_000 * 1000,
             tif := snowmelt_mm,
-            temp_snowmelt_mm,
-            format="COG",
-            creationOptions=[
-                "RESAMPLING=BILINEAR",
-                "OVERVIEWS=IGNORE_EXISTING",
-                "OVERVIEW_RESAMPLING=BILINEAR",
-            ],
         )
         # validate COG
         if (validate := cgdal.validate_cog("-q", tif)) == 0:
             logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-    except RuntimeError as ex:
+    except (RuntimeError, ValueError) as ex:
         logger.debug(f"{type(ex).__name__}: {this}: {ex}")
         return None
 
@@ -201,34 +186,20 @@ def cold_content(translated_tif):
         return
 
     cold_content_filename = swe.replace(swe_code, coldcontent_code)
-    temp_cold_content = swe.replace(swe_code, "9999")
 
     try:
-        cgdal.gdal_calculate(
-            "-A",
-            swe,
-            "-B",
-            avg_temp,
-            "--outfile",
-            temp_cold_content,
-            "--calc",
-            "A.astype(numpy.float32) * 2114 * (B.astype(numpy.float32) - 273) / 333000",
-            "--quiet",
-        )
-        gdal.Translate(
+        rastercalc.calculate_to_cog(
+            {"A": swe, "B": avg_temp},
+            lambda A, B: A.astype(numpy.float32)
+            * 2114
+            * (B.astype(numpy.float32) - 273)
+            / 333000,
             tif := cold_content_filename,
-            temp_cold_content,
-            format="COG",
-            creationOptions=[
-                "RESAMPLING=BILINEAR",
-                "OVERVIEWS=IGNORE_EXISTING",
-                "OVERVIEW_RESAMPLING=BILINEAR",
-            ],
         )
         # validate COG
         if (validate := cgdal.validate_cog("-q", tif)) == 0:
             logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-    except RuntimeError as ex:
+    except (RuntimeError, ValueError) as ex:
         logger.debug(f"{type(ex).__name__}: {this}: {ex}")
         return None
 
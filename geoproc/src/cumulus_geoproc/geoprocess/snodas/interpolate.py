@@ -2,16 +2,23 @@
 """
 
 import asyncio
+import functools
 import os
+import time
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from string import Template
 
+import numpy
 import pkg_resources
 from cumulus_geoproc import logger
-from cumulus_geoproc.configurations import CUMULUS_PRODUCTS_BASEKEY
+from cumulus_geoproc.configurations import (
+    CUMULUS_PRODUCTS_BASEKEY,
+    SNODAS_INTERP_WORKERS,
+)
 from cumulus_geoproc.geoprocess.snodas import no_data_value, product_code
-from cumulus_geoproc.utils import boto, cgdal, file_extension
+from cumulus_geoproc.utils import boto, cgdal, file_extension, rastercalc
 from osgeo import gdal
 
 gdal.UseExceptions()
@@ -43,7 +50,7 @@ def is_lakefix(dt: datetime, code: str):
         return False
 
 
-async def snodas_interp_task(
+def snodas_interp(
     filepath: str,
     product: str,
     dt: datetime,
@@ -51,7 +58,7 @@ async def snodas_interp_task(
     nodata: str,
     lakefix: bool = False,
 ):
-    """SNODAS interpolation task method used with asyncio
+    """SNODAS interpolation of a single product; blocking, run in an executor
 
     Parameters
     ----------
@@ -62,7 +69,7 @@ async def snodas_interp_task(
     dt : datetime
         datetime object
     max_dist : str
-        maximum distance in pixel for gdal_fillnodata
+        maximum distance in pixel for gdal.FillNodata
     nodata : str
         raster no data value
     lakefix : bool, optional
@@ -73,70 +80,42 @@ async def snodas_interp_task(
     dict[str, str] | None
         Dictionary of attributes needed to upload to S3 or None
     """
+    timings = {}
+    lakefix_tif = None
     try:
         dst, filename = os.path.split(filepath)
 
+        start = time.perf_counter()
         if lakefix:
             # get the no data masking raster
             masking_raster = pkg_resources.resource_filename(
                 __package__, "data/no_data_areas_swe_20140201.tif"
             )
-            lakefix_tif = os.path.join(
-                dst,
-                file_extension(filename, suffix=".tiff"),
-            )
             # set zeros as no data (-9999)
-            cgdal.gdal_calculate(
-                "-A",
-                filepath,
-                "-B",
-                masking_raster,
-                "--outfile",
-                lakefix_tif,
-                "--calc",
-                f"numpy.where((A == 0) & (B == {nodata}), {nodata}, A)",
-                "--NoDataValue",
-                nodata,
-                "--quiet",
+            nodata_val = float(nodata)
+            lakefix_tif = rastercalc.calculate(
+                {"A": filepath, "B": masking_raster},
+                lambda A, B: numpy.where((A == 0) & (B == nodata_val), nodata_val, A),
+                nodata=nodata_val,
             )
             filepath = lakefix_tif
+            timings["lakefix"] = time.perf_counter() - start
 
-        # -of GTiff required here because COG has no Create(); therefore GTiff
-        # driver used with creationOptions to be COG
-        fill_tif = os.path.join(
-            dst, file_extension(filename, suffix="-interpolated.tiff")
-        )
-
-        # fillnodata to GTiff
-        if max_dist == 0 or (
-            cgdal.gdal_fillnodataval(
+        # fill nodata in memory and convert to COG; no fill if max_dist is 0
+        if (
+            tif := cgdal.fill_nodata(
                 filepath,
-                fill_tif,
-                "-q",
-                "-md",
-                str(max_dist),
+                os.path.join(dst, file_extension(filename, suffix="-interpolated.tif")),
+                float(max_dist),
             )
-            != 0
-        ):
-            logger.info("gdal_fillnodata.py not executed")
-            fill_tif = filepath
-
-        # convert to COG
-        gdal.Translate(
-            tif := os.path.join(
-                dst, file_extension(filename, suffix="-interpolated.tif")
-            ),
-            fill_tif,
-            format="COG",
-            creationOptions=[
-                "RESAMPLING=BILINEAR",
-                "OVERVIEWS=IGNORE_EXISTING",
-                "OVERVIEW_RESAMPLING=BILINEAR",
-            ],
-        )
+        ) is None:
+            raise RuntimeError(f"fill nodata failed for {filepath}")
+        timings["fill_cog"] = time.perf_counter() - start - sum(timings.values())
+
         # validate COG
         if (validate := cgdal.validate_cog("-q", tif)) == 0:
             logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
+        timings["validate"] = time.perf_counter() - start - sum(timings.values())
 
         return {
             "file": tif,
@@ -148,12 +127,67 @@ async def snodas_interp_task(
     except (RuntimeError, KeyError, Exception) as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
     finally:
-        ds = None
+        if lakefix_tif is not None:
+            gdal.Unlink(lakefix_tif)
+        logger.info(f"{product} timings: {format_timings(timings)}")
+
+
+def format_timings(timings: dict):
+    """Stage timings as 'stage=0.00s' pairs"""
+    return " ".join(f"{stage}={seconds:.2f}s" for stage, seconds in timings.items())
+
+
+async def snodas_interp_task(
+    bucket: str,
+    key: str,
+    dst: str,
+    executor: ThreadPoolExecutor,
+    **kwargs,
+):
+    """SNODAS interpolation task method used with asyncio
+
+    The download runs on the default executor so downloads overlap; the
+    interpolation runs on `executor` bounding how many products process at once.
+
+    Parameters
+    ----------
+    bucket : str
+        S3 bucket
+    key : str
+        S3 key to the processed SNODAS COG
+    dst : str
+        FQPN to temporary directory
+    executor : ThreadPoolExecutor
+        executor running snodas_interp
+    **kwargs
+        keyword arguments for snodas_interp
+
+    Returns
+    -------
+    dict[str, str] | None
+        Dictionary of attributes needed to upload to S3 or None
+    """
+    loop = asyncio.get_running_loop()
+
+    start = time.perf_counter()
+    download_file = await loop.run_in_executor(
+        None, functools.partial(boto.s3_download_file, bucket, key, dst=dst)
+    )
+    logger.info(f"Download {key}: {time.perf_counter() - start:.2f}s")
+    if not download_file:
+        return None
+
+    return await loop.run_in_executor(
+        executor, functools.partial(snodas_interp, download_file, **kwargs)
+    )
 
 
 async def snodas(cfg: namedtuple, dst: str):
     """Main method building asyncio tasks
 
+    Product codes download and interpolate concurrently, at most
+    SNODAS_INTERP_WORKERS interpolating at once.
+
     Parameters
     ----------
     cfg : namedtuple
@@ -173,6 +207,7 @@ async def snodas(cfg: namedtuple, dst: str):
         "1038",
     )
     tasks = []
+    executor = ThreadPoolExecutor(max_workers=SNODAS_INTERP_WORKERS)
     dt = (
         datetime.strptime(cfg.datetime, "%Y%m%d")
         .replace(hour=6)
@@ -210,26 +245,27 @@ async def snodas(cfg: namedtuple, dst: str):
 
         max_dist = 0 if code in no_interp else cfg.max_distance
 
-        if download_file := boto.s3_download_file(cfg.bucket, key, dst=dst):
-            tasks.append(
-                asyncio.create_task(
-                    snodas_interp_task(
-                        download_file,
-                        product,
-                        dt,
-                        max_dist,
-                        nodata_value,
-                        lakefix,
-                    )
-                )
+        tasks.append(
+            snodas_interp_task(
+                cfg.bucket,
+                key,
+                dst,
+                executor,
+                product=product,
+                dt=dt,
+                max_dist=max_dist,
+                nodata=nodata_value,
+                lakefix=lakefix,
             )
+        )
 
     # return the list of objects that are not None
-    return_objs = []
-    for task in tasks:
-        result = await task
-        if result is not None:
-            return_objs.append(result)
+    start = time.perf_counter()
+    with executor:
+        results = await asyncio.gather(*tasks)
+    logger.info(f"SNODAS interpolation: {time.perf_counter() - start:.2f}s")
+
+    return_objs = [result for result in results if result is not None]
 
     return return_objs
 
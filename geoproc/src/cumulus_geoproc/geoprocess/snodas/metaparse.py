@@ -1,8 +1,136 @@
 """Metadata parser
 """
 
-from collections import namedtuple
+import os
 from textwrap import dedent
+from xml.sax.saxutils import escape
+
+import numpy
+from osgeo import gdal, osr
+
+gdal.UseExceptions()
+
+# SNODAS flat binary: 16 bit signed integer, big endian (ENVI byte order = 1)
+DAT_DTYPE = numpy.dtype(">i2")
+
+
+# known SNODAS metadata fields parsed eagerly with their types; any other
+# field is kept as text and converted on first access
+SCHEMA = {
+    "data_file_pathname": str,
+    "number_of_columns": int,
+    "number_of_rows": int,
+    "no_data_value": float,
+    "horizontal_datum": str,
+    "minimum_x_axis_coordinate": float,
+    "maximum_x_axis_coordinate": float,
+    "minimum_y_axis_coordinate": float,
+    "maximum_y_axis_coordinate": float,
+    "start_year": int,
+    "start_month": int,
+    "start_day": int,
+    "start_hour": int,
+    "start_minute": int,
+    "start_second": int,
+    "stop_year": int,
+    "stop_month": int,
+    "stop_day": int,
+    "stop_hour": int,
+    "stop_minute": int,
+    "stop_second": int,
+}
+
+_SLUG = str.maketrans({" ": "_", "-": "_"})
+
+
+def _convert(value: str):
+    """Make the string an int or float if a number"""
+    if value.isdigit():
+        return int(value)
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+class Metadata:
+    """SNODAS metadata with typed schema fields and lazily converted extras
+
+    Attribute access works for every field in the .txt, like the namedtuple
+    previously returned by `to_namedtuple`.
+
+    Parameters
+    ----------
+    raw : dict
+        slugified field name to value text
+    """
+
+    __slots__ = tuple(SCHEMA) + ("_raw", "_extra")
+
+    def __init__(self, raw: dict):
+        self._raw = raw
+        self._extra = {}
+        for field, convert in SCHEMA.items():
+            value = raw.get(field)
+            if value is not None:
+                try:
+                    value = convert(value)
+                except ValueError:
+                    value = _convert(value)
+            setattr(self, field, value)
+
+    def __getattr__(self, name: str):
+        # only called for fields outside the schema
+        extra = object.__getattribute__(self, "_extra")
+        if name not in extra:
+            raw = object.__getattribute__(self, "_raw")
+            if name not in raw:
+                raise AttributeError(f"{__class__.__name__} has no field {name}")
+            extra[name] = _convert(raw[name])
+        return extra[name]
+
+    def __repr__(self) -> str:
+        return f"{__class__.__name__}({self.data_file_pathname})"
+
+    @property
+    def _fields(self):
+        return tuple(self._raw)
+
+    def _asdict(self):
+        """Every field in file order with converted values"""
+        return {
+            field: getattr(self, field) if field in SCHEMA else _convert(value)
+            for field, value in self._raw.items()
+        }
+
+
+def parse(src: str):
+    """Parse SNODAS metadata
+
+    Parameters
+    ----------
+    src : str
+        SNODAS metadata as .txt
+
+    Returns
+    -------
+    Metadata | None
+        parsed metadata or None if the file doesn't exist
+    """
+    try:
+        with open(src, "r") as fh:
+            text = fh.read()
+    except FileNotFoundError:
+        return None
+
+    raw = {}
+    for line in text.splitlines():
+        k, sep, v = line.partition(":")
+        if not sep:
+            continue
+        # only the text up to the next ':' is the value
+        raw[k.translate(_SLUG).lower()] = v.split(":", 1)[0].strip()
+    return Metadata(raw)
 
 
 def to_dictionary(src: str):
@@ -20,43 +148,26 @@ def to_dictionary(src: str):
     dict | None
         dictionary of metadata parameters and their values or None
     """
-    try:
-        with open(src, "r") as fh:
-            config_dict = {}
-            for line in fh.readlines():
-                k, v = line.split(":")[:2]
-                k = k.replace(" ", "_").replace("-", "_").lower()
-                v = v.strip()
-                # try make the string an int or float if a number
-                try:
-                    v = int(v) if v.isdigit() else float(v)
-                except:
-                    pass
-                config_dict[k] = v
-    except FileNotFoundError as ex:
-        return
-
-    return config_dict
+    if (metadata := parse(src)) is not None:
+        return metadata._asdict()
 
 
 def to_namedtuple(src: str, name: str = "Metadata"):
-    """Use to_dictionary to generate a namedtuple
+    """Parse SNODAS metadata for attribute access
 
     Parameters
     ----------
     src : str
         SNODAS metadata as .txt
     name : str, optional
-        collections.namedtuple name, by default "Metadata"
+        unused, kept for compatibility, by default "Metadata"
 
     Returns
     -------
-    collections.namedtuple
-        namedtuple
+    Metadata | None
+        parsed metadata or None
     """
-    mdata = to_dictionary(src)
-    if isinstance(mdata, dict):
-        return namedtuple(name, mdata.keys())(*mdata.values())
+    return parse(src)
 
 
 def write_hdr(src: str, /, columns: int, rows: int):
@@ -97,3 +208,113 @@ def write_hdr(src: str, /, columns: int, rows: int):
             return hdr_file
     except OSError as ex:
         return
+
+
+def geotransform(meta_ntuple: Metadata):
+    """GDAL geotransform from the metadata bounds and dimensions
+
+    Parameters
+    ----------
+    meta_ntuple : Metadata
+        SNODAS metadata
+
+    Returns
+    -------
+    tuple
+        (minx, xres, 0, maxy, 0, -yres)
+    """
+    xres = (
+        meta_ntuple.maximum_x_axis_coordinate - meta_ntuple.minimum_x_axis_coordinate
+    ) / meta_ntuple.number_of_columns
+    yres = (
+        meta_ntuple.maximum_y_axis_coordinate - meta_ntuple.minimum_y_axis_coordinate
+    ) / meta_ntuple.number_of_rows
+    return (
+        meta_ntuple.minimum_x_axis_coordinate,
+        xres,
+        0,
+        meta_ntuple.maximum_y_axis_coordinate,
+        0,
+        -yres,
+    )
+
+
+def srs(meta_ntuple: Metadata):
+    """WKT from the metadata horizontal datum"""
+    datum = meta_ntuple.horizontal_datum
+    spatial_ref = osr.SpatialReference()
+    spatial_ref.ImportFromProj4(f"+proj=longlat +ellps={datum} +datum={datum} +no_defs")
+    return spatial_ref.ExportToWkt()
+
+
+def memmap_dat(src: str, meta_ntuple: Metadata):
+    """Memory map the SNODAS flat binary described by the metadata
+
+    Parameters
+    ----------
+    src : str
+        SNODAS metadata as .txt; the data file is resolved relative to it
+    meta_ntuple : Metadata
+        SNODAS metadata
+
+    Returns
+    -------
+    numpy.memmap
+        read only, big endian int16 array shaped (rows, columns)
+    """
+    return numpy.memmap(
+        os.path.join(os.path.dirname(src), meta_ntuple.data_file_pathname),
+        dtype=DAT_DTYPE,
+        mode="r",
+        shape=(meta_ntuple.number_of_rows, meta_ntuple.number_of_columns),
+    )
+
+
+def open_dat(src: str, meta_ntuple: Metadata = None):
+    """Open a SNODAS flat binary without an hdr file or a byte swapped copy
+
+    GDAL reads the file through a VRT raw band with MSB byte order and NumPy
+    through a read only big endian memory map; neither copies the file.
+
+    Parameters
+    ----------
+    src : str
+        SNODAS metadata as .txt
+    meta_ntuple : Metadata, optional
+        SNODAS metadata, by default parsed from src
+
+    Returns
+    -------
+    Tuple[gdal.Dataset, numpy.memmap] | None
+        VRT dataset and the big endian int16 memory map
+    """
+    if meta_ntuple is None and (meta_ntuple := parse(src)) is None:
+        return None
+
+    try:
+        mapped = memmap_dat(src, meta_ntuple)
+    except (OSError, ValueError):
+        return None
+
+    rows, columns = mapped.shape
+    vrt = dedent(
+        f"""
+        <VRTDataset rasterXSize="{columns}" rasterYSize="{rows}">
+          <SRS>{escape(srs(meta_ntuple))}</SRS>
+          <GeoTransform>{", ".join(map(str, geotransform(meta_ntuple)))}</GeoTransform>
+          <VRTRasterBand dataType="Int16" band="1" subClass="VRTRawRasterBand">
+            <NoDataValue>{int(meta_ntuple.no_data_value)}</NoDataValue>
+            <SourceFilename relativeToVRT="0">{escape(mapped.filename)}</SourceFilename>
+            <ImageOffset>0</ImageOffset>
+            <PixelOffset>{DAT_DTYPE.itemsize}</PixelOffset>
+            <LineOffset>{DAT_DTYPE.itemsize * columns}</LineOffset>
+            <ByteOrder>MSB</ByteOrder>
+          </VRTRasterBand>
+        </VRTDataset>
+        """
+    )
+    try:
+        ds = gdal.Open(vrt.strip())
+    except RuntimeError:
+        return None
+    return ds, mapped
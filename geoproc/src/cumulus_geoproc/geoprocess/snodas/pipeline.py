@@ -0,0 +1,213 @@
+"""SNODAS unmasked processing in a single pass
+
+Each raw SNODAS flat binary (.dat) is memory mapped once, without an hdr file.  The raw product
+COGs and the derived cold content (2072) and snow melt mm (3333) COGs are all
+written from the in-memory arrays, so finished COGs are never re-opened.
+"""
+
+import os
+from collections import namedtuple
+from datetime import datetime, timezone
+
+import numpy
+from cumulus_geoproc import logger
+from cumulus_geoproc.geoprocess.snodas import metaparse, product_code
+from cumulus_geoproc.utils import cgdal, file_extension, rastercalc
+from osgeo import gdal
+
+gdal.UseExceptions()
+
+this = os.path.basename(__file__)
+
+SnodasGrid = namedtuple(
+    "SnodasGrid",
+    ["code", "dataset", "array", "nodata", "geotransform", "srs", "datetime", "tif"],
+)
+"""namedtuple: raw SNODAS product as a VRT and a memory map over its flat binary
+and the output COG FQPN"""
+
+
+def stop_datetime(meta_ntuple: metaparse.Metadata):
+    """Product datetime from the SNODAS metadata stop time
+
+    Parameters
+    ----------
+    meta_ntuple : metaparse.Metadata
+        SNODAS metadata
+
+    Returns
+    -------
+    datetime
+        stop datetime, UTC
+    """
+    return datetime(
+        meta_ntuple.stop_year,
+        meta_ntuple.stop_month,
+        meta_ntuple.stop_day,
+        # Metadata value `Stop hour: 5` present in earlier SNODAS files results in incorrect timestamp if used directly as the timestamp for the data
+        # This has since been corrected in the SNODAS metadata .txt files. `Stop hour: 5` is no longer present in current files as of today (2022-08-08)
+        # Additional Information: https://github.com/USACE/cumulus/issues/264, https://github.com/USACE/cumulus/issues/244#issuecomment-1209465407
+        meta_ntuple.stop_hour if meta_ntuple.stop_year >= 2022 else 6,
+        meta_ntuple.stop_minute,
+        meta_ntuple.stop_second,
+        tzinfo=timezone.utc,
+    )
+
+
+def read_grid(txt_file: str):
+    """Map a SNODAS product into memory from its metadata .txt
+
+    Parameters
+    ----------
+    txt_file : str
+        FQPN to the SNODAS metadata .txt
+
+    Returns
+    -------
+    SnodasGrid | None
+        product in memory or None if it can't be read
+    """
+    meta_ntuple = metaparse.parse(txt_file)
+    if meta_ntuple is None:
+        return None
+
+    # map the flat binary directly; no hdr sidecar or GDAL read
+    if (opened := metaparse.open_dat(txt_file, meta_ntuple)) is None:
+        return None
+    ds, array = opened
+    logger.debug(f"Data File Path: {meta_ntuple.data_file_pathname}")
+
+    return SnodasGrid(
+        code=os.path.basename(txt_file)[8:12],
+        dataset=ds,
+        array=array,
+        nodata=int(meta_ntuple.no_data_value),
+        geotransform=ds.GetGeoTransform(),
+        srs=ds.GetProjection(),
+        datetime=stop_datetime(meta_ntuple),
+        tif=file_extension(
+            os.path.join(os.path.dirname(txt_file), meta_ntuple.data_file_pathname),
+            suffix=".tif",
+        ),
+    )
+
+
+def write_cog(
+    array: numpy.ndarray,
+    grid: SnodasGrid,
+    tif: str,
+    nodata: float,
+    datatype: int = gdal.GDT_Int16,
+):
+    """Write an array with the grid's georeferencing as a COG
+
+    Float results written to integer types are rounded by GDAL, as gdal_calc did
+    """
+    rows, cols = array.shape
+    mem_ds = gdal.GetDriverByName("MEM").Create("", cols, rows, 1, datatype)
+    try:
+        mem_ds.SetGeoTransform(grid.geotransform)
+        mem_ds.SetProjection(grid.srs)
+        band = mem_ds.GetRasterBand(1)
+        band.SetNoDataValue(nodata)
+        band.WriteArray(array)
+        band = None
+
+        cgdal.gdal_translate_w_options(tif, mem_ds, validate=True)
+    finally:
+        mem_ds = None
+
+    # validate COG
+    if (validate := cgdal.validate_cog("-q", tif)) == 0:
+        logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
+    return tif
+
+
+def notice(code: str, tif: str, dt: datetime):
+    """Processor return object for a SNODAS product code"""
+    return {
+        "file": tif,
+        "filetype": product_code[code]["product"],
+        "datetime": dt.isoformat(),
+        "version": None,
+    }
+
+
+def unmasked(directory: str, codes=("1034", "1036", "1038", "1044")):
+    """Process decompressed SNODAS unmasked products in one pass
+
+    Parameters
+    ----------
+    directory : str
+        FQP to the decompressed SNODAS files
+    codes : tuple, optional
+        raw product codes, by default ("1034", "1036", "1038", "1044")
+
+    Returns
+    -------
+    dict
+        product code to processor return object; snow melt (1044) is replaced
+        by snow melt mm (3333) and cold content (2072) added when computable
+    """
+    grids = {}
+    for txt_file in sorted(os.listdir(directory)):
+        if not txt_file.endswith(".txt") or txt_file[8:12] not in codes:
+            continue
+        if (grid := read_grid(os.path.join(directory, txt_file))) is not None:
+            grids[grid.code] = grid
+
+    translated = {}
+    for code, grid in grids.items():
+        cgdal.gdal_translate_w_options(grid.tif, grid.dataset, validate=True)
+        if (validate := cgdal.validate_cog("-q", grid.tif)) == 0:
+            logger.debug(f"Validate COG = {validate}\t{grid.tif} is a COG")
+        translated[code] = notice(code, grid.tif, grid.datetime)
+        logger.debug(f"Update Tif: {translated[code]}")
+
+    # gdal_calc defaults kept: largest input type (Int16) and its nodata
+    nodata = rastercalc.DEFAULT_NODATA[gdal.GDT_Int16]
+
+    # cold content = swe * 2114 * snowtemp (degc) / 333000
+    # id 2072
+    if (swe := grids.get("1034")) and (avg_temp := grids.get("1038")):
+        try:
+            cold_content = rastercalc.apply(
+                {"A": swe.array, "B": avg_temp.array},
+                lambda A, B: A.astype(numpy.float32)
+                * 2114
+                * (B.astype(numpy.float32) - 273)
+                / 333000,
+                {"A": swe.nodata, "B": avg_temp.nodata},
+                nodata,
+            )
+            tif = write_cog(
+                cold_content, swe, swe.tif.replace("1034", "2072"), nodata
+            )
+            translated["2072"] = notice("2072", tif, swe.datetime)
+            logger.debug("Cold content product computed and dictionary updated")
+        except RuntimeError as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    # convert snow melt runoff as meters / 100_000 to mm
+    if snowmelt := grids.get("1044"):
+        try:
+            snowmelt_mm = rastercalc.apply(
+                {"A": snowmelt.array},
+                lambda A: A.astype(numpy.float32) / 100_000 * 1000,
+                {"A": snowmelt.nodata},
+                nodata,
+            )
+            tif = write_cog(
+                snowmelt_mm, snowmelt, snowmelt.tif.replace("1044", "3333"), nodata
+            )
+            translated["3333"] = notice("3333", tif, snowmelt.datetime)
+            # remove snowmelt with unit meters and scale factor 100_000
+            _ = translated.pop("1044", None)
+            logger.debug(
+                "Snow melt product conversion and original popped from dictionary"
+            )
+        except RuntimeError as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    grids = None
+    return translated
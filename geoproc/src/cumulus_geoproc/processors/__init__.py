@@ -1,7 +1,63 @@
 """
 # Initialize Geo Processor Plugins
 """
+import importlib
+
 import pyplugs
+from cumulus_geoproc.configurations import COG_ACQUIRABLE_PROFILES, COG_PROFILE
 
 geo_procs = pyplugs.names_factory(__package__)
 geo_proc = pyplugs.call_factory(__package__)
+
+
+def _module(plugin: str):
+    try:
+        return importlib.import_module(f"{__package__}.{plugin}")
+    except ImportError:
+        return None
+
+
+def virtual_source(plugin: str):
+    """Determine if a processor reads `src` as a GDAL virtual path
+
+    Processors declare support with a module level `VIRTUAL_SOURCE = True`.
+    Only processors that open `src` solely through GDAL (no tar, gzip or
+    netCDF4 access) and read it once qualify; the handler then passes a
+    /vsis3/ or /vsicurl/ path instead of downloading the acquirable.
+    Processors opening the source once per thread (utils.parallel with
+    src=...) stay off, each handle would repeat the remote range reads.
+
+    Parameters
+    ----------
+    plugin : str
+        processor (acquirable) name
+
+    Returns
+    -------
+    bool
+        True if the processor supports /vsis3/ or /vsicurl/ sources
+    """
+    if (module := _module(plugin)) is None:
+        return False
+    return getattr(module, "VIRTUAL_SOURCE", False) is True
+
+
+def cog_profile(plugin: str):
+    """COG encoding profile for a processor
+
+    COG_ACQUIRABLE_PROFILES takes precedence over a module level
+    `COG_PROFILE`, falling back to the COG_PROFILE configuration
+
+    Parameters
+    ----------
+    plugin : str
+        processor (acquirable) name
+
+    Returns
+    -------
+    str
+        cgdal.COG_PROFILES name
+    """
+    if plugin in COG_ACQUIRABLE_PROFILES:
+        return COG_ACQUIRABLE_PROFILES[plugin]
+    return getattr(_module(plugin), "COG_PROFILE", COG_PROFILE)
@@ -104,6 +104,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         valid_times_list = list(eval(sub_meta[f"{SUBSET_NAME}#validTimes"]))
         valid_times_list.sort()
 
+        outfiles = {}
         for i, t in enumerate(valid_times_list):
             # skip the zero valid time
             if i == 0:
@@ -111,31 +112,17 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
             valid_datetime = datetime.fromtimestamp(t).replace(tzinfo=timezone.utc)
 
-            raster_band = ds.GetRasterBand(i)
-
-            nodata = raster_band.GetNoDataValue()
-
-            cgdal.gdal_translate_w_options(
-                tif := str(
+            outfiles[i] = {
+                "filetype": acquirable,
+                "file": str(
                     dst_path / f'qpf.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
                 ),
-                ds,
-                bandList=[i],
-                noData=nodata,
-            )
+                "datetime": valid_datetime.isoformat(),
+                "version": version_datetime.isoformat(),
+            }
 
-            # validate COG
-            if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-            outfile_list.append(
-                {
-                    "filetype": acquirable,
-                    "file": tif,
-                    "datetime": valid_datetime.isoformat(),
-                    "version": version_datetime.isoformat(),
-                },
-            )
+        # read the source once; bands keep their own nodata
+        outfile_list = cgdal.translate_bands(ds, outfiles)
 
     except (RuntimeError, KeyError, Exception) as ex:
         exc_type, exc_value, exc_traceback = sys.exc_info()
@@ -112,44 +112,13 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         valid_times_list = list(eval(sub_meta[f"{SUBSET_NAME}#validTimes"]))
         valid_times_list.sort()
 
-        # Initial metadata value for qpe_grid#latLonLL looks like: "{-123.6735229012065,29.94159256439344}"
-        # strip() removes characters "{" and "}"
-        # split() returns a list of two strings (which represent numbers), split on the ","
-        # map() converts each string to a float; list() converts the map object back to a list
-        #
-        # lower left coordinates (minimum x, minimum y)
-        lonLL, latLL = list(map(float, sub_meta[f"{SUBSET_NAME}#latLonLL"].strip('{}').split(','))) # Lon/Lat
-        hrap_xmin, hrap_ymin = list(map(float, sub_meta[f"{SUBSET_NAME}#gridPointLL"].strip('{}').split(','))) # HRAP
-        ster_xmin, ster_ymin = hrap.ster_x(hrap_xmin), hrap.ster_y(hrap_ymin) # Polar Stereographic
+        # geotransform and SRS cached per HRAP domain
+        hrap_grid, (lonLL, latLL, lonUR, latUR) = hrap.from_metadata(sub_meta, SUBSET_NAME)
 
-        #
-        # upper right coordinates (maximum x, maximum y) in geographic space and pixel space
-        lonUR, latUR = list(map(float, sub_meta[f"{SUBSET_NAME}#latLonUR"].strip('{}').split(','))) # Lon/Lat
-        hrap_xmax, hrap_ymax = list(map(float, sub_meta[f"{SUBSET_NAME}#gridPointUR"].strip('{}').split(','))) # HRAP
-        ster_xmax, ster_ymax = hrap.ster_x(hrap_xmax), hrap.ster_y(hrap_ymax) # Polar Stereographic
-        #
-        # size of the grid
-        # nrows = number of rows in the grid (y or latitude direction)
-        # ncols = number of columns in the grid (x or longitude direction)
-        ncols, nrows = list(map(float, sub_meta[f"{SUBSET_NAME}#domainExtent"].strip('{}').split(',')))
-
-        # Grid Cell Resolution; polar stereographic reference
-        xres = (ster_xmax - ster_xmin) / float(ncols)
-        yres = (ster_ymax - ster_ymin) / float(nrows)
-
-        # Specify geotransform
-        # https://gdal.org/tutorials/geotransforms_tut.html#introduction-to-geotransforms
-        # GT(0) x-coordinate of the upper-left corner of the upper-left pixel.
-        # GT(1) w-e pixel resolution / pixel width.
-        # GT(2) row rotation (typically zero).
-        # GT(3) y-coordinate of the upper-left corner of the upper-left pixel.
-        # GT(4) column rotation (typically zero).
-        # GT(5) n-s pixel resolution / pixel height (negative value for a north-up image).
-        geotransform = (ster_xmin, xres, 0, ster_ymax, 0, -yres)
-
-        ds.SetGeoTransform(geotransform)
-        ds.SetProjection(hrap.PROJ4)
+        ds.SetGeoTransform(hrap_grid.geotransform)
+        ds.SetProjection(hrap_grid.wkt)
 
+        outfiles = {}
         for i, t in enumerate(valid_times_list):
             # skip the zero valid time
             if i == 0:
@@ -157,33 +126,22 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
             valid_datetime = datetime.fromtimestamp(t).replace(tzinfo=timezone.utc)
 
-            raster_band = ds.GetRasterBand(i)
-
-            nodata = raster_band.GetNoDataValue()
-
-            cgdal.gdal_translate_w_options(
-                tif := str(
+            outfiles[i] = {
+                "filetype": acquirable,
+                "file": str(
                     dst_path / f'qpf.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
                 ),
-                ds,
-                outputBounds=[lonLL, latUR, lonUR, latLL],
-                outputSRS="EPSG:4326",
-                bandList=[i],
-                noData=nodata,
-            )
-
-            # validate COG
-            if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-            outfile_list.append(
-                {
-                    "filetype": acquirable,
-                    "file": tif,
-                    "datetime": valid_datetime.isoformat(),
-                    "version": version_datetime.isoformat(),
-                },
-            )
+                "datetime": valid_datetime.isoformat(),
+                "version": version_datetime.isoformat(),
+            }
+
+        # read the source once; bands keep their own nodata
+        outfile_list = cgdal.translate_bands(
+            ds,
+            outfiles,
+            outputBounds=[lonLL, latUR, lonUR, latLL],
+            outputSRS="EPSG:4326",
+        )
 
     except (RuntimeError, KeyError, Exception) as ex:
         exc_type, exc_value, exc_traceback = sys.exc_info()
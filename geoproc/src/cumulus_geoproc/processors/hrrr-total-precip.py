@@ -9,6 +9,9 @@
     ever changing '01 hr Total Precipitation' raster band number.  Archived
     HRRR products do not have idx files saved in S3, so this processor
     tries to account for that.
+
+    When the idx is available only the matching message's byte range is read
+    (see cumulus_geoproc.utils.gribidx).
 """
 
 import os
@@ -17,7 +20,7 @@ from datetime import datetime, timezone
 
 import pyplugs
 from cumulus_geoproc import logger, utils
-from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils import cgdal, gribidx
 from osgeo import gdal
 
 gdal.UseExceptions()
@@ -25,6 +28,8 @@ gdal.UseExceptions()
 
 this = os.path.basename(__file__)
 
+VIRTUAL_SOURCE = True
+
 
 @pyplugs.register
 def process(*, src: str, dst: str = None, acquirable: str = None):
@@ -55,6 +60,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
     ```
     """
     outfile_list = []
+    msg = None
 
     try:
         filename = os.path.basename(src)
@@ -72,30 +78,20 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         if dst is None:
             dst = os.path.dirname(src)
 
-        # open the hrrr.grib2 file
-        ds = gdal.Open(src)
-
-        # Can't use index file with product downloaded by handler
-        # Successful download means we have the idx we need
-        # idx_file = key + ".idx"
-
-        # if hrrridx := boto.s3_download_file(bucket=bucket, key=idx_file, dst=dst):
-        #     idx = hrrr.HrrrIdx()
-        #     with open(hrrridx, "r") as fh:
-        #         for line in fh.readlines():
-        #             idx.linex(line)
-        #             # This if statement means Total Precip for 01 hr forecast
-        #             if idx.element == "APCP" and (
-        #                 idx.forecast_hour == 0 or idx.forecast_hour == -1
-        #             ):
-        #                 band_number = idx.raster_band
-        #     if band_number is None:
-        #         raise Exception("Band number not found in idx: {hrrridx}")
-        #     logger.debug(f"Band number '{band_number}' found in {hrrridx}")
-        # else:
-        #     if (band_number := cgdal.find_band(ds, attr)) is None:
-        #         raise Exception(f"Band number not found for attributes: {attr}")
-        #     print(f"Band number '{band_number}' found for attributes {attr}")
+        # Read only the '01 hr Total Precipitation' message when an idx is
+        # published next to the source (src + ".idx"); otherwise, including
+        # downloaded sources, open the whole hrrr.grib2 file
+        if (
+            msg := gribidx.open_message(
+                src,
+                element="APCP",
+                level="surface",
+                forecast=gribidx.accumulation(1),
+            )
+        ) is not None:
+            ds = gdal.Open(msg)
+        if msg is None or cgdal.find_band(ds, attr) != 1:
+            ds = gdal.Open(src)
 
         if (band_number := cgdal.find_band(ds, attr)) is None:
             raise Exception(f"Band number not found for attributes: {attr}")
@@ -132,5 +128,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
     finally:
         ds = None
         raster = None
+        if msg is not None:
+            gdal.Unlink(msg)
 
     return outfile_list
@@ -4,14 +4,15 @@
 
 import os
 import re
+import threading
 from datetime import datetime, timezone
-import numpy
 
 import pyplugs
 from cumulus_geoproc import logger
 from cumulus_geoproc.utils import cgdal
-from osgeo import gdal, osr
-from netCDF4 import Dataset, num2date, date2index
+from cumulus_geoproc.utils.parallel import parallel_map
+from osgeo import gdal
+from netCDF4 import Dataset, num2date
 
 this = os.path.basename(__file__)
 
@@ -83,60 +84,45 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                 yres = (ymax - ymin) / float(nrows)
                 geotransform = (xmin, xres, 0, ymax, 0, -yres)
 
-                _data = None
-                for dt in num2date(
-                    nctime[:], nctime.units, only_use_cftime_datetimes=False
-                ):
+                # netCDF4 isn't thread safe; only the reads are serialised
+                read_lock = threading.Lock()
+
+                def timestep_to_cog(item):
+                    idx, dt = item
                     dt_valid = dt.replace(tzinfo=timezone.utc)
-                    idx = date2index(dt, nctime)
                     nctime_str = datetime.strftime(dt, "%Y%m%d%H%M")
 
-                    raster = gdal.GetDriverByName("GTiff").Create(
-                        tmptif := os.path.join(
-                            dst, filename.replace(".nc", f"-{k}-{nctime_str}-tmp.tif")
-                        ),
-                        xsize=ncols,
-                        ysize=nrows,
-                        bands=1,
-                        eType=gdal.GDT_Float32,
-                    )
-                    raster.SetGeoTransform(geotransform)
-                    srs = osr.SpatialReference()
-                    srs.ImportFromWkt(wkt)
-
-                    raster.SetProjection(wkt)
-                    band = raster.GetRasterBand(1)
+                    with read_lock:
+                        _data = ncvar[idx]
 
                     # Reference the following for reason to flip
                     # https://www.unidata.ucar.edu/support/help/MailArchives/netcdf/msg03585.html
                     # Basically, get the array sequence like other Tiffs
-                    _data = ncvar[idx]
-                    _data = numpy.flipud(_data)
-                    band.WriteArray(_data)
-                    raster.FlushCache()
-                    raster = None
-
-                    cgdal.gdal_translate_w_options(
-                        tif := os.path.join(dst, tmptif.replace("-tmp.tif", ".tif")),
-                        tmptif,
-                        noData=nodata,
+                    tif = cgdal.array_to_cog(
+                        _data,
+                        geotransform,
+                        wkt,
+                        nodata,
+                        os.path.join(
+                            dst, filename.replace(".nc", f"-{k}-{nctime_str}.tif")
+                        ),
+                        flip=True,
+                        outputType=gdal.GDT_Float32,
                     )
 
-                    # validate COG
-                    if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                        logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-                    outfile_list.append(
-                        {
-                            "filetype": acquirable_,
-                            "file": tif,
-                            "datetime": dt_valid.isoformat(),
-                            "version": date_created.isoformat(),
-                        }
-                    )
+                    return {
+                        "filetype": acquirable_,
+                        "file": tif,
+                        "datetime": dt_valid.isoformat(),
+                        "version": date_created.isoformat(),
+                    }
+
+                # time index is the position in the time variable
+                timesteps = enumerate(
+                    num2date(nctime[:], nctime.units, only_use_cftime_datetimes=False)
+                )
+                outfile_list.extend(parallel_map(timestep_to_cog, timesteps))
     except (RuntimeError, KeyError, Exception) as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
-    finally:
-        raster = None
 
     return outfile_list
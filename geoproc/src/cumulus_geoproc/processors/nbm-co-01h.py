@@ -12,10 +12,12 @@ import pyplugs
 from osgeo import gdal
 
 from cumulus_geoproc import logger
-from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils import cgdal, gribidx
 
 gdal.UseExceptions()
 
+VIRTUAL_SOURCE = True
+
 
 @pyplugs.register
 def process(*, src: str, dst: str = None, acquirable: str = None):
@@ -52,6 +54,14 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         "GRIB_SHORT_NAME": "0\\-SFC",
     }
 
+    idx_criteria = {
+        "element": "APCP",
+        "level": "surface",
+        "forecast": gribidx.accumulation(1),
+    }
+
+    msg = None
+
     try:
         filename = Path(src).name
 
@@ -61,10 +71,15 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         if dst is None:
             dst = Path(src).parent
 
-        ds = gdal.Open(src)
-        gdal_info = gdal.Info(ds, format="json")
+        # read only the matching message when an idx is next to the source
+        if (msg := gribidx.open_message(src, **idx_criteria)) is not None:
+            ds = gdal.Open(msg)
+        if msg is None or cgdal.BandIndex(ds).find(attr, True, anchored=True) != 1:
+            ds = gdal.Open(src)
 
-        if (band_number := cgdal.band_from_json(gdal_info, attr, True)) is None:
+        # single pass over the band metadata
+        band_index = cgdal.BandIndex(ds)
+        if (band_number := band_index.find(attr, True, anchored=True)) is None:
             raise Exception("Band number not found for attributes: {attr}")
 
         logger.debug(f"Band number '{band_number}' found for attributes {attr}")
@@ -116,5 +131,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         # closing the data source
         ds = None
         raster = None
+        if msg is not None:
+            gdal.Unlink(msg)
 
     return outfile_list
@@ -17,6 +17,8 @@ gdal.UseExceptions()
 
 this = os.path.basename(__file__)
 
+VIRTUAL_SOURCE = True
+
 
 @pyplugs.register
 def process(*, src: str, dst: str = None, acquirable: str = None):
@@ -11,6 +11,7 @@ from string import Template
 import pyplugs
 from cumulus_geoproc import logger, utils
 from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils.parallel import parallel_map
 from osgeo import gdal
 
 gdal.UseExceptions()
@@ -70,6 +71,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         count = ds.RasterCount
         time_pattern = re.compile(r"\d+")
         tdelta2 = timedelta()
+        outfiles = []
 
         for band_number in range(1, count + 1):
             try:
@@ -103,29 +105,27 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                     )
                     logger.debug(f"New Filename: {filename_dst}")
 
-                    cgdal.gdal_translate_w_options(
-                        tif := os.path.join(dst, filename_dst),
-                        ds,
-                        bandList=[band_number],
-                    )
-
-                    # validate COG
-                    if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                        logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-                    outfile_list.append(
-                        {
-                            "filetype": f_type_dict[tdelta],
-                            "file": tif,
-                            "datetime": vtime.isoformat(),
-                            "version": rtime.isoformat(),
-                        }
+                    outfiles.append(
+                        (
+                            band_number,
+                            {
+                                "filetype": f_type_dict[tdelta],
+                                "file": os.path.join(dst, filename_dst),
+                                "datetime": vtime.isoformat(),
+                                "version": rtime.isoformat(),
+                            },
+                        )
                     )
 
             except (RuntimeError, Exception) as ex:
                 logger.error(f"{type(ex).__name__}: {this}: {ex}")
             finally:
                 continue
+        raster = None
+        ds = None
+
+        # each worker thread translates from its own handle to the source
+        outfile_list = parallel_map(cgdal.translate_band, outfiles, src=src)
 
     except (RuntimeError, KeyError) as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
@@ -17,6 +17,8 @@ gdal.UseExceptions()
 
 this = os.path.basename(__file__)
 
+VIRTUAL_SOURCE = True
+
 
 @pyplugs.register
 def process(*, src: str, dst: str = None, acquirable: str = None):
@@ -61,6 +63,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
         count = ds.RasterCount
         time_pattern = re.compile(r"\d+")
+        outfiles = {}
         for band_number in range(1, count + 1):
             try:
                 raster = ds.GetRasterBand(band_number)
@@ -81,26 +84,20 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
                 logger.debug(f"New Filename: {filename_dst}")
 
-                cgdal.gdal_translate_w_options(
-                    tif := os.path.join(dst, filename_dst), ds, bandList=[band_number]
-                )
-
-                # validate COG
-                if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                    logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-                outfile_list.append(
-                    {
-                        "filetype": acquirable,
-                        "file": tif,
-                        "datetime": vtime.isoformat(),
-                        "version": rtime.isoformat(),
-                    }
-                )
+                outfiles[band_number] = {
+                    "filetype": acquirable,
+                    "file": os.path.join(dst, filename_dst),
+                    "datetime": vtime.isoformat(),
+                    "version": rtime.isoformat(),
+                }
             except (RuntimeError, Exception) as ex:
                 logger.error(f"{type(ex).__name__}: {this}: {ex}")
             finally:
                 continue
+        raster = None
+
+        # read the GRIB once for all bands and write the COGs concurrently
+        outfile_list = cgdal.translate_bands(ds, outfiles)
 
     except (RuntimeError, KeyError) as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
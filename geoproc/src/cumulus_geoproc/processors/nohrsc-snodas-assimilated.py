@@ -16,7 +16,7 @@ import numpy
 
 import pyplugs
 from cumulus_geoproc import logger, utils
-from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils import cgdal, ncread
 from netCDF4 import Dataset
 from osgeo import gdal, osr
 
@@ -85,7 +85,6 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                         lat = ncds.variables["lat"][:]
                         data = ncds.variables["Data"]
                         crs = ncds.variables["crs"]
-                        data_vals = data[:]
 
                         valid_time = datetime.fromisoformat(data.stop_date).replace(
                             tzinfo=timezone.utc
@@ -103,40 +102,37 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
                         geotransform = (xmin, xres, 0, ymax, 0, -yres)
 
-                        raster = gdal.GetDriverByName("GTiff").Create(
-                            tmptif := os.path.join(dst, snodas_assim + ".tmp.tif"),
-                            xsize=ncols,
-                            ysize=nrows,
-                            bands=1,
-                            eType=gdal.GDT_Float32,
-                        )
-
-                        raster.SetGeoTransform(geotransform)
                         srs = osr.SpatialReference()
 
                         # srs.ImportFromEPSG(4326)
                         srs.SetWellKnownGeogCS(crs.horizontal_datum)
 
-                        raster.SetProjection(srs.ExportToWkt())
-                        band = raster.GetRasterBand(1)
-
-                        # Reference the following for reason to flip
-                        # https://www.unidata.ucar.edu/support/help/MailArchives/netcdf/msg03585.html
-                        # Basically, get the array sequence like other Tiffs
-                        data_vals = numpy.flipud(data_vals)
-                        band.WriteArray(data_vals)
-                        raster.FlushCache()
-                        raster = None
-
-                        cgdal.gdal_translate_w_options(
-                            tif := os.path.join(dst, filename_),
-                            tmptif,
-                            noData=data.no_data_value,
+                        raster = gdal.GetDriverByName("MEM").Create(
+                            "", ncols, nrows, 1, gdal.GDT_Float32
                         )
-
-                        # validate COG
-                        if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                            logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
+                        try:
+                            raster.SetGeoTransform(geotransform)
+                            raster.SetProjection(srs.ExportToWkt())
+                            band = raster.GetRasterBand(1)
+                            band.SetNoDataValue(float(data.no_data_value))
+
+                            # Reference the following for reason to flip
+                            # https://www.unidata.ucar.edu/support/help/MailArchives/netcdf/msg03585.html
+                            # Basically, get the array sequence like other Tiffs
+                            # rows are streamed in blocks, each written flipped
+                            for start, rows in ncread.iter_chunks(data):
+                                band.WriteArray(
+                                    numpy.ma.filled(rows, data.no_data_value)[::-1],
+                                    0,
+                                    nrows - start - len(rows),
+                                )
+                            band = None
+
+                            tif = cgdal.dataset_to_cog(
+                                raster, os.path.join(dst, filename_)
+                            )
+                        finally:
+                            raster = None
 
                         # Append dictionary object to outfile list
                         outfile_list.append(
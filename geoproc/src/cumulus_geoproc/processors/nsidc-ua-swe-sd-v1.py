@@ -73,6 +73,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                 tzinfo=timezone.utc
             )
 
+            outfiles = {}
             for band_number in range(1, ds.RasterCount + 1):
                 # set the bands date
                 raster = ds.GetRasterBand(band_number)
@@ -84,23 +85,17 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                     filename, suffix=f"_{datetime_str}_{nc_variable}.tif"
                 )
 
-                cgdal.gdal_translate_w_options(
-                    tif := os.path.join(dst, filename_),
-                    ds,
-                )
-
-                # validate COG
-                if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                    logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-                outfile_list.append(
-                    {
-                        "filetype": nc_slug,
-                        "file": tif,
-                        "datetime": band_date.isoformat(),
-                        "version": None,
-                    }
-                )
+                outfiles[band_number] = {
+                    "filetype": nc_slug,
+                    "file": os.path.join(dst, filename_),
+                    "datetime": band_date.isoformat(),
+                    "version": None,
+                }
+            raster = None
+
+            # read the variable once; only the COG encode runs in parallel
+            outfile_list.extend(cgdal.translate_bands(ds, outfiles))
+            ds = None
 
     except RuntimeError as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
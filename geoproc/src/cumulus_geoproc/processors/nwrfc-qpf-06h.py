@@ -113,6 +113,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             date_str = re.search("\\d+", filename)[0]
             version_datetime = datetime.strptime(date_str, "%Y%m%d%H")
 
+        outfiles = {}
         for band in range(1, ds.RasterCount + 1):
             raster = ds.GetRasterBand(band)
 
@@ -120,25 +121,17 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             time_delta = timedelta(minutes=int(time_delta_str))
             valid_datetime = since_time + time_delta
 
-            nodata = raster.GetNoDataValue()
-
-            cgdal.gdal_translate_w_options(
-                tif := str(
+            outfiles[band] = {
+                "filetype": acquirable,
+                "file": str(
                     dst_path / f'qpf.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
                 ),
-                ds,
-                bandList=[band],
-                noData=nodata,
-            )
+                "datetime": valid_datetime.isoformat(),
+                "version": version_datetime.isoformat(),
+            }
 
-            outfile_list.append(
-                {
-                    "filetype": acquirable,
-                    "file": tif,
-                    "datetime": valid_datetime.isoformat(),
-                    "version": version_datetime.isoformat(),
-                },
-            )
+        # read the source once; bands keep their own nodata
+        outfile_list = cgdal.translate_bands(ds, outfiles, validate=False)
 
     except (RuntimeError, KeyError, Exception) as ex:
         exc_type, exc_value, exc_traceback = sys.exc_info()
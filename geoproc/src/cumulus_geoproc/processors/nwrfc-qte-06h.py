@@ -96,6 +96,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             since_time = datetime(1970, 1, 1, 0, 0).replace(tzinfo=timezone.utc)
             logger.info(f"Assuming since time {since_time=}")
 
+        outfiles = {}
         for band in range(1, ds.RasterCount + 1):
             raster = ds.GetRasterBand(band)
 
@@ -103,25 +104,17 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             time_delta = timedelta(minutes=int(time_delta_str))
             valid_datetime = since_time + time_delta
 
-            nodata = raster.GetNoDataValue()
-
-            cgdal.gdal_translate_w_options(
-                tif := str(
+            outfiles[band] = {
+                "filetype": acquirable,
+                "file": str(
                     dst_path / f'qte.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
                 ),
-                ds,
-                bandList=[band],
-                noData=nodata,
-            )
+                "datetime": valid_datetime.isoformat(),
+                "version": None,
+            }
 
-            outfile_list.append(
-                {
-                    "filetype": acquirable,
-                    "file": tif,
-                    "datetime": valid_datetime.isoformat(),
-                    "version": None,
-                },
-            )
+        # read the source once; bands keep their own nodata
+        outfile_list = cgdal.translate_bands(ds, outfiles, validate=False)
 
     except (RuntimeError, KeyError, Exception) as ex:
         exc_type, exc_value, exc_traceback = sys.exc_info()
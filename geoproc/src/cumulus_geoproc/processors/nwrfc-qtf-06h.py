@@ -112,6 +112,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             date_str = re.search("\\d+", filename)[0]
             version_datetime = datetime.strptime(date_str, "%Y%m%d%H")
 
+        outfiles = {}
         for band in range(1, ds.RasterCount + 1):
             raster = ds.GetRasterBand(band)
 
@@ -119,25 +120,18 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             time_delta = timedelta(minutes=int(time_delta_str))
             valid_datetime = since_time + time_delta
 
-            nodata = raster.GetNoDataValue()
-
-            cgdal.gdal_translate_w_options(
-                tif := str(
+            outfiles[band] = {
+                "filetype": acquirable,
+                "file": str(
                     dst_path / f'qtf.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
                 ),
-                ds,
-                bandList=[band],
-                noData=nodata,
-            )
+                "datetime": valid_datetime.isoformat(),
+                "version": version_datetime.isoformat(),
+            }
+        raster = None
 
-            outfile_list.append(
-                {
-                    "filetype": acquirable,
-                    "file": tif,
-                    "datetime": valid_datetime.isoformat(),
-                    "version": version_datetime.isoformat(),
-                },
-            )
+        # read the source once; only the COG encode runs in parallel
+        outfile_list = cgdal.translate_bands(ds, outfiles)
 
     except (RuntimeError, KeyError, Exception) as ex:
         exc_type, exc_value, exc_traceback = sys.exc_info()
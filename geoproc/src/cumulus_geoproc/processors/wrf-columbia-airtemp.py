@@ -5,11 +5,10 @@
 import os
 import re
 from datetime import datetime, timedelta, timezone
-import numpy
 
 import pyplugs
 from cumulus_geoproc import logger
-from cumulus_geoproc.utils import cgdal
+from cumulus_geoproc.utils import cgdal, ncread
 from netCDF4 import Dataset
 from osgeo import gdal, osr
 
@@ -60,7 +59,7 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         ncds = Dataset(src, "r")
         lon = ncds.variables["lon"][:]
         lat = ncds.variables["lat"][:]
-        var = ncds.variables["var"][:]
+        var = ncds.variables["var"]
         time_ = ncds.variables["time"]
 
         time_pattern = re.compile(r"\w+ \w+ (\d{4}-\d{2}-\d{2} \d+:\d+:\d+)")
@@ -70,8 +69,11 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
         nctimes = (since_time + timedelta(hours=int(td)) for td in time_)
 
         xmin, ymin, xmax, ymax = lon.min(), lat.min(), lon.max(), lat.max()
-        for i, nctime in enumerate(nctimes):
-            bandx = var[i]
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(4326)
+
+        # one timestep in memory at a time rather than the whole cube
+        for (_, bandx), nctime in zip(ncread.iter_steps(var), nctimes):
             nctime_str = datetime.strftime(nctime, "%Y_%m_%d_T%H_%M")
             nrows, ncols = bandx.shape
             xres = (xmax - xmin) / float(ncols)
@@ -79,55 +81,21 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
 
             geotransform = (xmin, xres, 0, ymax, 0, -yres)
 
-            raster = gdal.GetDriverByName("GTiff").Create(
-                tmptif := os.path.join(
-                    dst, src.replace(".nc", f"-{nctime_str}.tmp.tif")
-                ),
-                xsize=ncols,
-                ysize=nrows,
-                bands=1,
-                eType=gdal.GDT_Float32,
-            )
-            raster.SetGeoTransform(geotransform)
-            srs = osr.SpatialReference()
-            srs.ImportFromEPSG(4326)
-
-            raster.SetProjection(srs.ExportToWkt())
-            band = raster.GetRasterBand(1)
-
             # Reference the following for reason to flip
             # https://www.unidata.ucar.edu/support/help/MailArchives/netcdf/msg03585.html
             # Basically, get the array sequence like other Tiffs
-            bandx = numpy.flipud(bandx)
-            band.WriteArray(bandx)
-            raster.FlushCache()
-            raster = None
-
-            cgdal.gdal_translate_w_overviews(
-                tif := os.path.join(dst, src.replace(".nc", f"-{nctime_str}.tif")),
-                tmptif,
-                translate_options={
-                    "format": "COG",
-                    "bandList": [1],
-                    "outputBounds": [-337997.806, 812645.371, 854002.194, -535354.629],
-                    "outputSRS": "+proj=lcc +lat_1=45 +lat_2=45 +lon_0=-120 +lat_0=45.80369 +x_0=0 +y_0=0 +a=6370000 +b=6370000 +units=m",
-                    "creationOptions": [
-                        "RESAMPLING=BILINEAR",
-                        "OVERVIEWS=IGNORE_EXISTING",
-                        "OVERVIEW_RESAMPLING=BILINEAR",
-                    ],
-                },
+            tif = cgdal.array_to_cog(
+                bandx,
+                geotransform,
+                srs,
+                None,
+                os.path.join(dst, src.replace(".nc", f"-{nctime_str}.tif")),
+                flip=True,
+                outputType=gdal.GDT_Float32,
+                outputBounds=[-337997.806, 812645.371, 854002.194, -535354.629],
+                outputSRS="+proj=lcc +lat_1=45 +lat_2=45 +lon_0=-120 +lat_0=45.80369 +x_0=0 +y_0=0 +a=6370000 +b=6370000 +units=m",
             )
 
-            # validate COG
-            if (validate := cgdal.validate_cog("-q", tif)) == 0:
-                logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-            try:
-                os.remove(tmptif)
-            except OSError as ex:
-                print(ex)
-
             outfile_list.append(
                 {
                     "filetype": acquirable,
@@ -138,10 +106,9 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             )
 
     except Exception as ex:
-        print(ex)
+        logger.error(f"{type(ex).__name__}: {this}: {ex}")
     finally:
         if ncds:
             ncds.close()
-        raster = None
 
     return outfile_list
@@ -19,10 +19,15 @@ from datetime import timezone
 import numpy
 import pyplugs
 from cumulus_geoproc import logger
-from netCDF4 import Dataset, date2index, num2date
+from cumulus_geoproc.configurations import RESAMPLE_TIME_CHUNK
+from cumulus_geoproc.utils import cgdal, ncread, resample
+from cumulus_geoproc.utils.parallel import parallel_map
+from netCDF4 import Dataset, num2date
 from osgeo import gdal, osr
 from pyresample import geometry
-from pyresample.bilinear import NumpyBilinearResampler
+
+# float grids; encoded with DEFLATE unless COG_ACQUIRABLE_PROFILES says otherwise
+COG_PROFILE = "deflate"
 
 # netCDF file "var" variable standard_name attribute
 standard_name = {
@@ -113,9 +118,6 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             xcoords = numpy.arange(xmin_pxl, xmin_pxl + (ncols * xres), xres)
             ycoords = numpy.arange(ymin_pxl, ymin_pxl + (nrows * yres), yres)
 
-            # Source Geometry
-            source_geometry = geometry.SwathDefinition(lons=nclon_arr, lats=nclat_arr)
-
             # Target Geometry
             area_extent = (
                 min(xcoords) - xres * 0.5,
@@ -134,21 +136,15 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
             )
 
             # 5000 left some nodata cells so going with 6000 m
-            resampler = NumpyBilinearResampler(source_geometry, target_geometry, 6000)
+            # the WRF domain doesn't change; the kernel is cached across files
+            kernel = resample.bilinear_kernel(
+                nclon_arr, nclat_arr, target_geometry, 6000
+            )
 
-            for dt in num2date(
-                nctime[:], nctime.units, only_use_cftime_datetimes=False
-            ):
-                dt_valid = dt.replace(tzinfo=timezone.utc)
-                idx = date2index(dt, nctime)
-                ncvar = ncsrc.variables["var"][idx]
-                ncvar_arr = ncvar[1:-1, 1:-1]
-
-                # resample to target
-                ncvar_arr_resampled = resampler.resample(
-                    ncvar_arr, fill_value=nodata_value
-                )
+            weights = resample.kernel_matrix(kernel, nclon_arr.size)
 
+            def write_cog(item):
+                dt_valid, resampled = item
                 tiffile = os.path.join(
                     dst,
                     ".".join(
@@ -159,41 +155,49 @@ def process(*, src: str, dst: str = None, acquirable: str = None):
                         ]
                     ),
                 )
-                # Create() GTiff with resampled Albers data
-                raster = gdal.GetDriverByName("GTiff").Create(
-                    f"/vsimem/{tiffile}",
-                    xsize=ncols,
-                    ysize=nrows,
-                    bands=1,
-                    eType=gdal.GDT_Float32,
+                # MEM dataset with resampled Albers data
+                raster = gdal.GetDriverByName("MEM").Create(
+                    "", ncols, nrows, 1, gdal.GDT_Float32
                 )
                 raster.SetGeoTransform([xmin, xres, 0, ymax, 0, -yres])
                 raster.SetProjection(wkt_albers)
                 raster.GetRasterBand(1).SetNoDataValue(nodata_value)
-                raster.GetRasterBand(1).WriteArray(ncvar_arr_resampled)
-
-                raster = None
-
-                # Translate newly created GTiff to COG because COG does not have Create() method
-                gdal.Translate(
-                    tiffile,
-                    f"/vsimem/{tiffile}",
-                    format="COG",
-                    outputType=gdal.GDT_Float32,
-                    resampleAlg="bilinear",
-                    creationOptions=[
-                        "COMPRESS=DEFLATE",
-                        "PREDICTOR=2",
-                    ],
+                raster.GetRasterBand(1).WriteArray(resampled)
+
+                # Translate to COG because COG does not have Create() method
+                try:
+                    cgdal.dataset_to_cog(
+                        raster, tiffile, outputType=gdal.GDT_Float32
+                    )
+                finally:
+                    raster = None
+
+                return {
+                    "filetype": product_slug,
+                    "file": tiffile,
+                    "datetime": dt_valid.isoformat(),
+                    "version": None,
+                }
+
+            # time index is the position in the time variable
+            valid_times = [
+                dt.replace(tzinfo=timezone.utc)
+                for dt in num2date(
+                    nctime[:], nctime.units, only_use_cftime_datetimes=False
                 )
-
-                outfile_list.append(
-                    {
-                        "filetype": product_slug,
-                        "file": tiffile,
-                        "datetime": dt_valid.isoformat(),
-                        "version": None,
-                    }
+            ]
+            # one read and one matrix multiply per chunk of timesteps
+            for start, cube in ncread.iter_chunks(
+                ncvar,
+                (slice(1, -1), slice(1, -1)),
+                max_steps=RESAMPLE_TIME_CHUNK,
+                step_overhead=resample.batch_step_nbytes(weights),
+            ):
+                resampled = resample.apply_kernel_batch(
+                    kernel, weights, cube, fill_value=nodata_value
+                )
+                outfile_list.extend(
+                    parallel_map(write_cog, zip(valid_times[start:], resampled))
                 )
 
     except Exception:
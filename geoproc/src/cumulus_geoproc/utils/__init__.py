@@ -4,9 +4,13 @@
 
 import gzip
 import os
+import shutil
 import tarfile
 import zipfile
+from typing import Callable
+
 from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import DECOMPRESS_BUFFER_SIZE
 
 EXTS = (
     ".bil",
@@ -76,10 +80,59 @@ def file_extension(
     return file + suffix
 
 
-def decompress(src: str, dst: str = "/tmp", recursive: bool = False):
+def _members(names: list, members: Callable[[str], bool] = None):
+    """Filter archive member names with a predicate on their basename"""
+    if members is None:
+        return names
+    return [n for n in names if members(os.path.basename(n))]
+
+
+def gunzip(src: str, dst: str, buffer_size: int = DECOMPRESS_BUFFER_SIZE):
+    """
+    # Stream decompress a gzip file
+
+    Parameters
+    ----------
+    src : str
+        input FQPN to gzip file
+    dst : str
+        FQPN to output file
+    buffer_size : int, optional
+        bytes read per copy, by default DECOMPRESS_BUFFER_SIZE
+
+    Returns
+    -------
+    str
+        FQPN to the decompressed file
+
+    Raises
+    ------
+    OSError
+        src is not a gzip file; partial output is removed
+    """
+    try:
+        with gzip.open(src, "rb") as fh, open(dst, "wb") as fp:
+            shutil.copyfileobj(fh, fp, buffer_size)
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+    return dst
+
+
+def decompress(
+    src: str,
+    dst: str = "/tmp",
+    recursive: bool = False,
+    members: Callable[[str], bool] = None,
+    buffer_size: int = DECOMPRESS_BUFFER_SIZE,
+):
     """
     # Decompress gzip, tar, tar gzip, or zip file
 
+    Files are streamed through a fixed size buffer; a tar gzip is read as
+    a single stream without writing the intermediate tar.
+
     Destination as a temporary directory best used because this methods
     does not clean files/directories
 
@@ -91,6 +144,11 @@ def decompress(src: str, dst: str = "/tmp", recursive: bool = False):
         FQP to output directory, by default "/tmp"
     recursive : bool, optional
         recursive decompress is gzip, tar, tar gzip, or zip file, by default False
+    members : Callable[[str], bool], optional
+        predicate on the member basename selecting tar or zip members to
+        extract, by default None extracting all
+    buffer_size : int, optional
+        bytes read per copy, by default DECOMPRESS_BUFFER_SIZE
 
     Returns
     -------
@@ -110,45 +168,85 @@ def decompress(src: str, dst: str = "/tmp", recursive: bool = False):
     if not src.endswith(exts):
         return False
 
-    # try to decompress if compressed
-    try:
-        with gzip.open(src, "rb") as fh:
-            content = fh.read()
-
-            fname = file_extension(filename, suffix="", maxsplit=1)
-            src = os.path.join(dst, fname)
-
-            with open(src, "wb") as fp:
-                fp.write(content)
-    except OSError as ex:
-        logger.debug(f"Not gzip: {src}")
-        logger.debug(f"{type(ex).__name__}: {this}: {ex}")
-
     try:
         if zipfile.is_zipfile(src):
             with zipfile.ZipFile(src) as zip:
                 fname = file_extension(filename, suffix="")
                 dst_ = os.path.join(dst, fname)
-                zip.extractall(dst_)
+                for name in _members(zip.namelist(), members):
+                    zip.extract(name, path=dst_)
             return dst_
         elif tarfile.is_tarfile(src):
-            with tarfile.open(src) as tar:
+            # "r|*" reads the (compressed) tar forward once
+            with tarfile.open(src, "r|*", bufsize=buffer_size) as tar:
                 fname = file_extension(filename, suffix="")
 
                 dst_ = os.path.join(dst, fname)
 
-                tar.extractall(path=dst_, filter="tar")
-                if recursive:
-                    for member in tar.getmembers():
-                        if member.isfile():
-                            decompress(
-                                os.path.join(dst_, member.name),
-                                dst=dst_,
-                                recursive=recursive,
-                            )
+                extracted = []
+                for member in tar:
+                    if not member.isfile() or not _members([member.name], members):
+                        continue
+                    tar.extract(member, path=dst_, filter="tar")
+                    extracted.append(member.name)
+
+            if recursive:
+                for name in extracted:
+                    decompress(
+                        os.path.join(dst_, name),
+                        dst=dst_,
+                        recursive=recursive,
+                        buffer_size=buffer_size,
+                    )
             return dst_
     except Exception as ex:
         logger.warning(f"{type(ex).__name__}: {this}: {ex}")
         return False
 
+    # try to decompress if compressed
+    try:
+        fname = file_extension(filename, suffix="", maxsplit=1)
+        src = gunzip(src, os.path.join(dst, fname), buffer_size)
+    except OSError as ex:
+        logger.debug(f"Not gzip: {src}")
+        logger.debug(f"{type(ex).__name__}: {this}: {ex}")
+
     return src
+
+
+def vsi_paths(src: str, members: Callable[[str], bool] = None):
+    """
+    # GDAL virtual file system paths for a compressed file
+
+    Nothing is decompressed to disk; GDAL reads through /vsigzip/,
+    /vsitar/ or /vsizip/.  Gzip members of a tar are chained as
+    /vsigzip//vsitar/.
+
+    Parameters
+    ----------
+    src : str
+        input FQPN to compressed file
+    members : Callable[[str], bool], optional
+        predicate on the member basename selecting tar or zip members,
+        by default None selecting all
+
+    Returns
+    -------
+    List[str]
+        GDAL virtual paths; empty if not compressed
+    """
+    if zipfile.is_zipfile(src):
+        with zipfile.ZipFile(src) as zip:
+            names = [i.filename for i in zip.infolist() if not i.is_dir()]
+        return [f"/vsizip/{src}/{n}" for n in _members(names, members)]
+    elif tarfile.is_tarfile(src):
+        with tarfile.open(src, "r|*") as tar:
+            names = [m.name for m in tar if m.isfile()]
+        return [
+            f"/vsigzip//vsitar/{src}/{n}" if n.endswith(".gz") else f"/vsitar/{src}/{n}"
+            for n in _members(names, members)
+        ]
+    elif src.endswith(".gz"):
+        return [f"/vsigzip/{src}"]
+
+    return []
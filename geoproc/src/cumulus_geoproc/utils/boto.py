@@ -3,8 +3,11 @@
 """
 
 import os
+import threading
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from cumulus_geoproc import logger
 from cumulus_geoproc.configurations import (
@@ -12,10 +15,55 @@ from cumulus_geoproc.configurations import (
     AWS_DEFAULT_REGION,
     AWS_SECRET_ACCESS_KEY,
     ENDPOINT_URL_S3,
+    S3_MAX_CONCURRENCY,
+    S3_MAX_POOL_CONNECTIONS,
+    S3_MULTIPART_CHUNKSIZE,
+    S3_MULTIPART_THRESHOLD,
 )
 
 this = os.path.basename(__file__)
 
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=S3_MULTIPART_THRESHOLD,
+    multipart_chunksize=S3_MULTIPART_CHUNKSIZE,
+    max_concurrency=S3_MAX_CONCURRENCY,
+)
+"""TransferConfig: shared transfer settings for uploads and downloads"""
+
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+
+
+def s3_client():
+    """Shared S3 client reused by all callers
+
+    boto3 clients are thread-safe once created but creating one is not,
+    so creation is guarded by a lock.  A forked process gets its own client
+    rather than sharing the parent's connection pool.
+
+    Returns
+    -------
+    botocore.client.S3
+        cached S3 client
+    """
+    global _s3_client, _s3_client_pid
+
+    with _s3_client_lock:
+        if _s3_client is None or _s3_client_pid != os.getpid():
+            session = boto3.session.Session(
+                aws_access_key_id=AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+                region_name=AWS_DEFAULT_REGION,
+            )
+            _s3_client = session.client(
+                service_name="s3",
+                endpoint_url=ENDPOINT_URL_S3,
+                config=Config(max_pool_connections=S3_MAX_POOL_CONNECTIONS),
+            )
+            _s3_client_pid = os.getpid()
+    return _s3_client
+
 
 def s3_upload_file(file_name: str, bucket: str, key: str = None):
     """Wrapper supporting S3 uploading a file
@@ -45,14 +93,12 @@ def s3_upload_file(file_name: str, bucket: str, key: str = None):
 
     # Upload the file
     try:
-        if (
-            s3 := boto3_resource(
-                service_name="s3",
-                endpoint_url=ENDPOINT_URL_S3,
-            )
-        ) is None:
-            raise Exception(ClientError)
-        s3.meta.client.upload_file(Filename=file_name, Bucket=bucket, Key=key)
+        s3_client().upload_file(
+            Filename=file_name,
+            Bucket=bucket,
+            Key=key,
+            Config=TRANSFER_CONFIG,
+        )
         logger.debug(f"{file_name}\t{bucket=}\t{key=}")
     except ClientError as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex} - key: {key}")
@@ -92,17 +138,11 @@ def s3_download_file(bucket: str, key: str, dst: str = "/tmp", prefix: str = Non
 
     # download the file
     try:
-        if (
-            s3 := boto3_resource(
-                service_name="s3",
-                endpoint_url=ENDPOINT_URL_S3,
-            )
-        ) is None:
-            raise Exception(ClientError)
-        s3.meta.client.download_file(
+        s3_client().download_file(
             Bucket=bucket,
             Key=key,
             Filename=filename,
+            Config=TRANSFER_CONFIG,
         )
     except ClientError as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex} - key: {key}")
@@ -127,6 +167,7 @@ def boto3_resource(**kwargs):
 
     return boto3.resource(**kwargs_)
 
+
 def boto3_client(**kwargs):
     """Define boto3 client
 
@@ -2,14 +2,26 @@
 # Cumulus geoprocessor utilities
 """
 
+import asyncio
 from collections import namedtuple
 from urllib.parse import urlencode, urlsplit, urlunsplit
 
 import os
 import httpx
-from cumulus_geoproc.configurations import APPLICATION_KEY
+from cumulus_geoproc.configurations import (
+    APPLICATION_KEY,
+    CUMULUS_API_BACKOFF,
+    CUMULUS_API_CHUNK_SIZE,
+    CUMULUS_API_RETRIES,
+)
 from cumulus_geoproc import logger
 
+# methods safe to resend after a 5xx or a dropped connection
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+# the request never reached the server; any method can be resent
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
 
 # Cumulus API calls
 class CumulusAPI:
@@ -17,17 +29,57 @@ class CumulusAPI:
 
     asyncio implemented with httpx for HTTP/2 protocol
 
+    Used as an async context manager, or after `open()`, one pooled client
+    is held open and reused by every request until exit or `aclose()`.
+    Otherwise each request opens and closes its own client.
+
+    ```
+    async with CumulusAPI(url, http2) as cumulus_api:
+        await cumulus_api.post_chunked(cumulus_api.url, payload)
+    ```
     """
 
-    def __init__(self, url: str, http2: bool = False):
+    def __init__(
+        self,
+        url: str,
+        http2: bool = False,
+        retries: int = CUMULUS_API_RETRIES,
+        backoff: float = CUMULUS_API_BACKOFF,
+    ):
         # set url to env var if not provided
         self.url = url
         self.http2 = http2
         self.url_split = urlsplit(self.url)._asdict()
+        self.retries = retries
+        self.backoff = backoff
+        self.client = None
+        # whether each nested context opened the client it must close
+        self._opened = []
 
     def __repr__(self) -> str:
         return f"{__class__.__name__}({self.url}, {self.http2}, {self.url_split})"
 
+    async def __aenter__(self):
+        self._opened.append(self.client is None or self.client.is_closed)
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args):
+        # only close a client this context opened; an outer owner keeps it
+        if self._opened.pop():
+            await self.aclose()
+
+    async def open(self):
+        """Open the pooled client if not already open"""
+        if self.client is None or self.client.is_closed:
+            self.client = httpx.AsyncClient(http2=self.http2)
+
+    async def aclose(self):
+        """Close the pooled client releasing its connections"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
     @property
     def parameters(self):
         return self.url_split
@@ -58,34 +110,91 @@ class CumulusAPI:
         self.url_split["query"] = urlencode(query)
         self.build_url(self.url_split)
 
+    async def request_(self, method: str, url: str, **kwargs):
+        """Send a request with retries where resending is safe
+
+        Idempotent methods retry 5xx responses and transport errors; others,
+        e.g. the notification POST, only retry when the connection failed
+        before the request was sent.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method
+        url : str
+            request URL
+        **kwargs
+            keyword arguments passed to httpx.AsyncClient.request
+
+        Returns
+        -------
+        httpx.Response | None
+            last response or None if the connection never succeeded
+        """
+        if self.client is None or self.client.is_closed:
+            async with self:
+                return await self.request_(method, url, **kwargs)
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        resp = None
+        for attempt in range(self.retries + 1):
+            try:
+                resp = await self.client.request(method, url, **kwargs)
+                if resp.status_code < 500 or not idempotent:
+                    return resp
+                logger.warning(f"{method} {resp.status_code}: attempt {attempt + 1}")
+            except NOT_SENT_ERRORS as ex:
+                logger.warning(f"{type(ex).__name__}: attempt {attempt + 1}: {ex}")
+            except (httpx.TransportError, ConnectionError) as ex:
+                logger.warning(f"{type(ex).__name__}: attempt {attempt + 1}: {ex}")
+                if not idempotent:
+                    return resp
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2**attempt)
+        return resp
+
     async def post_(self, url, payload):
-        try:
-            client = httpx.AsyncClient(http2=self.http2)
-            headers = [(b"content-type", b"application/json")]
-            resp = await client.post(url, headers=headers, json=payload)
-            if resp.status_code in (200, 201):
-                return resp.json()
-        except ConnectionError as ex:
-            logger.warning(ex)
+        headers = [(b"content-type", b"application/json")]
+        resp = await self.request_("POST", url, headers=headers, json=payload)
+        if resp is not None and resp.status_code in (200, 201):
+            return resp.json()
 
     async def put_(self, url, payload):
-        try:
-            client = httpx.AsyncClient(http2=self.http2)
-            headers = [(b"content-type", b"application/json")]
-            resp = await client.put(url, headers=headers, json=payload)
-            if resp.status_code in (200, 201):
-                return resp.json()
-        except ConnectionError as ex:
-            logger.warning(ex)
+        headers = [(b"content-type", b"application/json")]
+        resp = await self.request_("PUT", url, headers=headers, json=payload)
+        if resp is not None and resp.status_code in (200, 201):
+            return resp.json()
 
     async def get_(self, url):
-        try:
-            async with httpx.AsyncClient(http2=self.http2) as client:
-                resp = await client.get(url)
-                if resp.status_code == 200:
-                    return resp
-        except ConnectionError as ex:
-            logger.warning(ex)
+        resp = await self.request_("GET", url)
+        if resp is not None and resp.status_code == 200:
+            return resp
+
+    async def post_chunked(
+        self, url, payload: list, chunk_size: int = CUMULUS_API_CHUNK_SIZE
+    ):
+        """POST a list payload as concurrent batches of at most chunk_size
+
+        Parameters
+        ----------
+        url : str
+            request URL
+        payload : list
+            list of objects to POST
+        chunk_size : int, optional
+            maximum objects per POST, by default CUMULUS_API_CHUNK_SIZE
+
+        Returns
+        -------
+        list
+            response from each batch in payload order; None for failed batches
+        """
+        chunk_size = max(1, chunk_size)
+        chunks = [
+            payload[i : i + chunk_size] for i in range(0, len(payload), chunk_size)
+        ]
+        async with self:
+            return await asyncio.gather(*[self.post_(url, chunk) for chunk in chunks])
 
 
 class NotifyCumulus(CumulusAPI):
@@ -12,18 +12,46 @@ GTiff Creation Options to be a COG:
 ```
 """
 
+import contextlib
+import functools
+import itertools
 import json
 import os
 import pathlib
 import re
 import subprocess
-from typing import List
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from typing import Dict, List
 from pathlib import Path
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
+import numpy
 from cumulus_geoproc import logger, utils
+from cumulus_geoproc.configurations import (
+    AWS_ACCESS_KEY_ID,
+    AWS_DEFAULT_REGION,
+    AWS_SECRET_ACCESS_KEY,
+    AWS_VIRTUAL_HOSTING,
+    COG_PROFILE,
+    COG_VALIDATION,
+    COG_VALIDATOR,
+    COG_WRITE_WORKERS,
+    CPL_TMPDIR,
+    CPL_VSIL_USE_TEMP_FILE_FOR_RANDOM_WRITE,
+    ENDPOINT_URL_S3,
+    GDAL_CACHEMAX,
+    GDAL_CACHEMAX_WORKERS_PERCENT,
+    GDAL_DISABLE_READDIR_ON_OPEN,
+    GDAL_NUM_THREADS,
+    GDAL_THREAD_BUDGET,
+    VSI_CACHE,
+    VSI_CACHE_SIZE,
+)
 from cumulus_geoproc.utils import cgdal, hrap
-from osgeo import gdal
+from osgeo import gdal, gdal_array, osr
 from osgeo_utils import gdal_calc
 from osgeo_utils.samples import validate_cloud_optimized_geotiff
 
@@ -32,6 +60,142 @@ gdal.UseExceptions()
 this = os.path.basename(__file__)
 
 
+def _physical_memory_mb():
+    """Physical memory in MB, None when unknown"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+# threads this process may give to COG writes; see configure_gdal
+_thread_budget = GDAL_THREAD_BUDGET or (os.cpu_count() or 1)
+
+
+def configure_gdal(processes: int = 1):
+    """Apply the process wide GDAL threading, cache and I/O configuration
+
+    Called with the defaults when the module is imported.  Worker pool
+    processes call it again with the pool size so the cores, and the block
+    cache when GDAL_CACHEMAX is unset, are shared between them.
+
+    Parameters
+    ----------
+    processes : int, optional
+        processes sharing the host, by default 1
+    """
+    global _thread_budget
+    processes = max(1, processes)
+    _thread_budget = GDAL_THREAD_BUDGET or max(1, (os.cpu_count() or 1) // processes)
+
+    options = {
+        "GDAL_DISABLE_READDIR_ON_OPEN": GDAL_DISABLE_READDIR_ON_OPEN,
+        "CPL_VSIL_USE_TEMP_FILE_FOR_RANDOM_WRITE": CPL_VSIL_USE_TEMP_FILE_FOR_RANDOM_WRITE,
+        "CPL_TMPDIR": CPL_TMPDIR,
+        "GDAL_NUM_THREADS": GDAL_NUM_THREADS or str(_thread_budget),
+        "VSI_CACHE": VSI_CACHE,
+        "VSI_CACHE_SIZE": VSI_CACHE_SIZE,
+    }
+    if GDAL_CACHEMAX is not None:
+        options["GDAL_CACHEMAX"] = GDAL_CACHEMAX
+    elif processes > 1 and (memory := _physical_memory_mb()) is not None:
+        share = memory * GDAL_CACHEMAX_WORKERS_PERCENT // 100 // processes
+        options["GDAL_CACHEMAX"] = str(max(64, share))
+
+    for key, val in options.items():
+        gdal.SetConfigOption(key, val)
+    logger.debug(f"GDAL configuration: {options}")
+
+
+configure_gdal()
+
+# COG writes in progress in this process and the threads they hold
+_writers = 0
+_threads_in_use = 0
+_budget = threading.Condition()
+
+
+@contextlib.contextmanager
+def _encoder_threads():
+    """Share of the thread budget for a COG write
+
+    A write takes the free threads, at most an even share with the writes
+    already running, and waits while the whole budget is held, so concurrent
+    writes (translate_bands, parallel_map) never use more than the budget
+    """
+    global _writers, _threads_in_use
+    with _budget:
+        while _threads_in_use >= _thread_budget:
+            _budget.wait()
+        _writers += 1
+        share = -(-_thread_budget // _writers)
+        threads = max(1, min(_thread_budget - _threads_in_use, share))
+        _threads_in_use += threads
+    try:
+        yield threads
+    finally:
+        with _budget:
+            _writers -= 1
+            _threads_in_use -= threads
+            _budget.notify_all()
+
+
+def _with_num_threads(creation_options: list, threads: int):
+    """Add NUM_THREADS to creation options unless already set"""
+    creation_options = list(creation_options or [])
+    if not any(opt.upper().startswith("NUM_THREADS=") for opt in creation_options):
+        creation_options.append(f"NUM_THREADS={threads}")
+    return creation_options
+
+
+def configure_vsis3(endpoint_url: str = ENDPOINT_URL_S3):
+    """Set GDAL /vsis3/ configuration matching the boto3 S3 client
+
+    Parameters
+    ----------
+    endpoint_url : str, optional
+        S3 endpoint URL, by default ENDPOINT_URL_S3; AWS when None
+    """
+    options = {
+        "AWS_ACCESS_KEY_ID": AWS_ACCESS_KEY_ID,
+        "AWS_SECRET_ACCESS_KEY": AWS_SECRET_ACCESS_KEY,
+        "AWS_REGION": AWS_DEFAULT_REGION,
+    }
+    if endpoint_url:
+        url = urlsplit(endpoint_url)
+        options["AWS_S3_ENDPOINT"] = url.netloc
+        options["AWS_HTTPS"] = "YES" if url.scheme == "https" else "NO"
+        options["AWS_VIRTUAL_HOSTING"] = AWS_VIRTUAL_HOSTING
+
+    for key, val in options.items():
+        if val is not None:
+            gdal.SetConfigOption(key, val)
+
+
+def vsi_source(bucket: str, key: str, vsi: str = "vsis3"):
+    """GDAL virtual path to an S3 object
+
+    Parameters
+    ----------
+    bucket : str
+        S3 bucket
+    key : str
+        S3 object key
+    vsi : str, optional
+        'vsis3' or 'vsicurl', by default "vsis3"
+
+    Returns
+    -------
+    str
+        /vsis3/bucket/key or /vsicurl/endpoint/bucket/key
+    """
+    configure_vsis3()
+    if vsi == "vsicurl":
+        endpoint = ENDPOINT_URL_S3 or f"https://s3.{AWS_DEFAULT_REGION}.amazonaws.com"
+        return f"/vsicurl/{endpoint.rstrip('/')}/{bucket}/{key}"
+    return f"/vsis3/{bucket}/{key}"
+
+
 def gdal_translate_options(**kwargs):
     """
     # Return gdal translate options
@@ -56,9 +220,80 @@ def gdal_translate_options(**kwargs):
     return {**base, **kwargs}
 
 
+# COG driver encoding profiles; PREDICTOR=YES picks 2 for integer and 3 for
+# floating point data.  "default" keeps the driver defaults (LZW).
+# NUM_THREADS is added from the thread budget unless a profile sets it
+COG_PROFILES = {
+    "default": {},
+    "deflate": {"COMPRESS": "DEFLATE", "PREDICTOR": "2"},
+    "fast": {
+        "COMPRESS": "ZSTD",
+        "LEVEL": "1",
+        "PREDICTOR": "YES",
+        "BLOCKSIZE": "512",
+    },
+    "small": {
+        "COMPRESS": "ZSTD",
+        "LEVEL": "15",
+        "PREDICTOR": "YES",
+        "BLOCKSIZE": "512",
+    },
+    # precipitation to 0.01 mm
+    "lossy-precip": {
+        "COMPRESS": "LERC_ZSTD",
+        "MAX_Z_ERROR": "0.005",
+        "LEVEL": "9",
+        "BLOCKSIZE": "512",
+    },
+}
+
+_cog_profile = COG_PROFILE
+
+
+def cog_creation_options(profile: str = None):
+    """COG creation options for an encoding profile
+
+    Parameters
+    ----------
+    profile : str, optional
+        COG_PROFILES name, by default the profile in use
+
+    Returns
+    -------
+    List[str]
+        creation options as KEY=VALUE
+    """
+    profile = profile or _cog_profile
+    if profile not in COG_PROFILES:
+        logger.warning(f"Unknown COG profile {profile}; using default")
+        profile = "default"
+    return [f"{k}={v}" for k, v in COG_PROFILES[profile].items()]
+
+
+@contextlib.contextmanager
+def use_cog_profile(profile: str):
+    """Encode COGs written by gdal_translate_w_options with a profile
+
+    The profile is process wide; processors run one at a time per process
+    and threads they start share it.
+
+    Parameters
+    ----------
+    profile : str
+        COG_PROFILES name
+    """
+    global _cog_profile
+    previous, _cog_profile = _cog_profile, profile
+    try:
+        yield
+    finally:
+        _cog_profile = previous
+
+
 def gdal_translate_w_options(
     dst: str,
     src: gdal.Dataset,
+    validate: bool = False,
     **kwargs,
 ):
     """
@@ -70,6 +305,8 @@ def gdal_translate_w_options(
         Output dataset
     src : gdal.Dataset
         Dataset object or a filename
+    validate : bool, optional
+        the caller validates dst with `validate_cog` next, by default False
     **kwargs
         User defined keyword arguments
 
@@ -81,7 +318,12 @@ def gdal_translate_w_options(
                 "RESAMPLING=BILINEAR",
                 "OVERVIEWS=IGNORE_EXISTING",
                 "OVERVIEW_RESAMPLING=BILINEAR",
-                ]
+                ] + the encoding profile in use (see use_cog_profile)
+
+    With COG_VALIDATOR=structural and validate, the COG_VALIDATION policy is
+    decided here: selected COGs are encoded to /vsimem/, checked with
+    `cog_layout_errors` and copied to a local dst.  `validate_cog` reports the
+    result, or the skip, without deciding again or re-opening the file.
     """
     base = {
         "format": "COG",
@@ -90,27 +332,344 @@ def gdal_translate_w_options(
             "RESAMPLING=BILINEAR",
             "OVERVIEWS=IGNORE_EXISTING",
             "OVERVIEW_RESAMPLING=BILINEAR",
+            *cog_creation_options(),
         ],
     }
     """dict: base (default) options but can be re-asigned"""
     _kwargs = {**base, **kwargs}
-    gdal.Translate(
+    precheck = (
+        validate
+        and _kwargs["format"] == "COG"
+        and COG_VALIDATOR == "structural"
+        and isinstance(dst, (str, os.PathLike))
+        and not os.fspath(dst).startswith("/vsi")
+    )
+    # one policy decision per write; validate_cog doesn't decide again
+    skipped = precheck and not _validation_due()
+    precheck = precheck and not skipped
+    target = (
+        f"/vsimem/{uuid.uuid4().hex}-{os.path.basename(dst)}" if precheck else dst
+    )
+    with _encoder_threads() as threads:
+        if _kwargs["format"] in ("COG", "GTiff"):
+            _kwargs["creationOptions"] = _with_num_threads(
+                _kwargs.get("creationOptions"), threads
+            )
+        gdal.Translate(
+            target,
+            src,
+            **_kwargs,
+        )
+
+    # recorded only once dst is written, so every entry is consumed
+    if skipped:
+        _layout_checked[os.fspath(dst)] = _SKIPPED
+    elif precheck:
+        try:
+            errors = cog_layout_errors(target)
+            _vsi_copy(target, dst)
+            _layout_checked[os.fspath(dst)] = errors
+        finally:
+            gdal.Unlink(target)
+
+
+def _vsi_copy(src: str, dst: str, blocksize: int = 2**20):
+    """Copy a GDAL virtual file (e.g. /vsimem/) to a local file"""
+    fptr = gdal.VSIFOpenL(src, "rb")
+    try:
+        with open(dst, "wb") as out:
+            while chunk := gdal.VSIFReadL(1, blocksize, fptr):
+                out.write(chunk)
+    finally:
+        gdal.VSIFCloseL(fptr)
+
+
+def array_to_cog(
+    array: numpy.ndarray,
+    geotransform: tuple,
+    srs,
+    nodata: float,
+    dst: str,
+    profile: str = None,
+    flip: bool = False,
+    **kwargs,
+):
+    """Encode a 2-D array straight to a validated COG
+
+    The array is wrapped as a MEM dataset without copying; only masked
+    values, when any, are filled with nodata in a copy.  NetCDF grids stored
+    south-up are passed with flip=True and read through a reversed row view
+    rather than a numpy.flipud copy.
+
+    Parameters
+    ----------
+    array : numpy.ndarray
+        (rows, cols) data, masked values written as nodata when given
+    geotransform : tuple
+        north-up GDAL geotransform
+    srs : str | osr.SpatialReference
+        WKT or spatial reference
+    nodata : float
+        nodata value, None for none
+    dst : str
+        output COG
+    profile : str, optional
+        COG_PROFILES name, by default the profile in use
+    flip : bool, optional
+        array rows are south to north, by default False
+    **kwargs
+        gdal_translate_w_options keyword arguments, e.g. outputType
+
+    Returns
+    -------
+    str
+        dst
+    """
+    mask = numpy.ma.getmask(array)
+    array = numpy.ma.getdata(array)
+    if nodata is not None and mask is not numpy.ma.nomask and mask.any():
+        array = numpy.where(mask, nodata, array).astype(array.dtype, copy=False)
+    if flip:
+        array = array[::-1]
+
+    try:
+        ds = gdal_array.OpenArray(array)
+    except (RuntimeError, TypeError, ValueError):
+        # builds without negative stride support get a contiguous copy
+        ds = gdal_array.OpenArray(numpy.ascontiguousarray(array))
+
+    try:
+        ds.SetGeoTransform(geotransform)
+        ds.SetProjection(
+            srs.ExportToWkt() if isinstance(srs, osr.SpatialReference) else srs
+        )
+        if nodata is not None:
+            ds.GetRasterBand(1).SetNoDataValue(float(nodata))
+        return dataset_to_cog(ds, dst, profile, **kwargs)
+    finally:
+        ds = None
+
+
+def dataset_to_cog(ds: gdal.Dataset, dst: str, profile: str = None, **kwargs):
+    """Encode an in-memory dataset to a validated COG
+
+    For grids assembled block by block in a MEM dataset; georeferencing and
+    nodata are expected to be set on `ds` already.
+
+    Parameters
+    ----------
+    ds : gdal.Dataset
+        source dataset, usually MEM
+    dst : str
+        output COG
+    profile : str, optional
+        COG_PROFILES name, by default the profile in use
+    **kwargs
+        gdal_translate_w_options keyword arguments, e.g. outputType; the
+        profile's options are appended to any creationOptions given, which
+        take precedence for the same key
+
+    Returns
+    -------
+    str
+        dst
+    """
+    creation_options = kwargs.pop("creationOptions", None) or [
+        "RESAMPLING=BILINEAR",
+        "OVERVIEWS=IGNORE_EXISTING",
+        "OVERVIEW_RESAMPLING=BILINEAR",
+    ]
+    gdal_translate_w_options(
         dst,
-        src,
-        **_kwargs,
+        ds,
+        validate=True,
+        creationOptions=[*creation_options, *cog_creation_options(profile)],
+        **kwargs,
     )
 
+    # validate COG
+    if (validate := validate_cog("-q", dst)) == 0:
+        logger.debug(f"Validate COG = {validate}\t{dst} is a COG")
+    return dst
+
+
+def translate_band(ds: gdal.Dataset, item: tuple):
+    """Translate one band to a validated COG
+
+    Used with `utils.parallel.parallel_map`; the band keeps its nodata value
+
+    Parameters
+    ----------
+    ds : gdal.Dataset
+        source dataset handle
+    item : tuple
+        (band number, processor return object with the COG "file")
+
+    Returns
+    -------
+    dict
+        processor return object
+    """
+    band, outfile = item
+    gdal_translate_w_options(
+        tif := outfile["file"], ds, validate=True, bandList=[band]
+    )
+
+    # validate COG
+    if (validate := validate_cog("-q", tif)) == 0:
+        logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
+    return outfile
+
+
+# translate options applying to the COG output rather than the source read
+_COG_OPTIONS = ("format", "creationOptions")
+
+
+def _write_band_cog(dst: str, src: gdal.Dataset, validate: bool = True, **kwargs):
+    """Write one single band MEM dataset as a COG, validated when asked"""
+    gdal_translate_w_options(dst, src, validate=validate, bandList=[1], **kwargs)
+    if validate and (validated := validate_cog("-q", dst)) == 0:
+        logger.debug(f"Validate COG = {validated}\t{dst} is a COG")
+
+
+def translate_bands(
+    src: gdal.Dataset,
+    outfiles: Dict[int, dict],
+    max_workers: int = COG_WRITE_WORKERS,
+    validate: bool = True,
+    **kwargs,
+):
+    """Write many bands of one source to COGs reading each band once
+
+    Bands are read one at a time into their own MEM dataset on the calling
+    thread, so the source (NetCDF, GRIB) handle is never shared, and encoded
+    to COG by a bounded thread pool while the next band is read; GDAL
+    releases the GIL while compressing.  At most max_workers + 1 bands are
+    in memory.  A band failing to read or write is logged and left out.
+
+    Parameters
+    ----------
+    src : gdal.Dataset
+        Dataset object or a filename
+    outfiles : Dict[int, dict]
+        source band number to processor return object; the COG is written
+        to the object's "file"
+    max_workers : int, optional
+        concurrent COG writes, by default COG_WRITE_WORKERS
+    validate : bool, optional
+        validate the COGs (subject to COG_VALIDATION), by default True
+    **kwargs
+        gdal_translate_w_options keyword arguments; all but format and
+        creationOptions (e.g. outputBounds, outputSRS, noData) apply to the
+        source read
+
+    Returns
+    -------
+    List[dict]
+        processor return objects written, in band order
+    """
+    read_kwargs = {k: v for k, v in kwargs.items() if k not in _COG_OPTIONS}
+    cog_kwargs = {k: v for k, v in kwargs.items() if k in _COG_OPTIONS}
+    max_workers = max(1, max_workers)
+
+    pending = {}
+    written = set()
+
+    def finish(futures):
+        for future in futures:
+            band = pending.pop(future)
+            try:
+                future.result()
+                written.add(band)
+            except Exception as ex:
+                logger.error(f"{type(ex).__name__}: {this}: band {band}: {ex}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for band in sorted(outfiles):
+            # bound the bands held in memory to those being encoded
+            if len(pending) >= max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                finish(done)
+            try:
+                band_ds = gdal.Translate(
+                    "", src, format="MEM", bandList=[band], **read_kwargs
+                )
+            except RuntimeError as ex:
+                logger.error(f"{type(ex).__name__}: {this}: band {band}: {ex}")
+                continue
+            future = executor.submit(
+                _write_band_cog,
+                outfiles[band]["file"],
+                band_ds,
+                validate,
+                **cog_kwargs,
+            )
+            pending[future] = band
+            band_ds = None
+        finish(list(pending))
+
+    return [outfiles[band] for band in sorted(written)]
+
+
+# resampling algorithms the COG driver applies itself with OVERVIEW_RESAMPLING
+COG_OVERVIEW_RESAMPLING = (
+    "nearest",
+    "average",
+    "rms",
+    "bilinear",
+    "cubic",
+    "cubicspline",
+    "lanczos",
+    "mode",
+)
+
+
+def overview_levels(xsize: int, ysize: int, blocksize: int = 512):
+    """Overview decimation factors until the smallest overview fits one block
+
+    Parameters
+    ----------
+    xsize : int
+        raster columns
+    ysize : int
+        raster rows
+    blocksize : int, optional
+        COG tile size, by default 512
+
+    Returns
+    -------
+    List[int]
+        e.g. [2, 4, 8] for a 3000 x 2000 raster
+    """
+    levels = []
+    factor = 2
+    while max(xsize, ysize) / (factor // 2) > blocksize:
+        levels.append(factor)
+        factor *= 2
+    return levels
+
+
+def _set_option(creation_options: list, key: str, value: str):
+    """Creation options with key set to value, replacing an existing key"""
+    prefix = f"{key.upper()}="
+    options = [o for o in creation_options or [] if not o.upper().startswith(prefix)]
+    options.append(f"{key}={value}")
+    return options
+
 
 def gdal_translate_w_overviews(
     dst: str,
     src: gdal.Dataset,
     translate_options: dict,
     resampling: str = None,
-    overviewlist: List[int] = [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048],
+    overviewlist: List[int] = None,
 ):
-    """Build overviews for the gdal dataset with the resampling algorithm provided
+    """Translate with overviews built using the resampling algorithm provided
 
-    If no sampling algorithm is given, only gdal.Translate() executed
+    If no resampling algorithm is given, only gdal.Translate() executed.
+    Algorithms the COG driver supports are passed as OVERVIEW_RESAMPLING;
+    others (gauss, average_magphase) are built on an uncompressed /vsimem/
+    intermediate that is always unlinked.
 
     allowable resampling algorithms:
         nearest,average,rms,bilinear,gauss,cubic,cubicspline,lanczos,average_magphase,mode
@@ -126,60 +685,203 @@ def gdal_translate_w_overviews(
     resampling : str, optional
         resampling algorithm, by default None
     overviewlist : List[int], optional
-        list of integers, by default [2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048]
+        overview levels for the intermediate, by default computed from the
+        raster size with `overview_levels`
+
+    Returns
+    -------
+    bool
+        True if dst was written
     """
 
-    resampling_algo = (
-        "nearest",
-        "average",
-        "rms",
-        "bilinear",
-        "gauss",
-        "cubic",
-        "cubicspline",
-        "lanczos",
-        "average_magphase",
-        "mode",
-    )
+    resampling_algo = COG_OVERVIEW_RESAMPLING + ("gauss", "average_magphase")
     if resampling is not None and resampling not in resampling_algo:
         logger.debug(f"Resampling algorithm {resampling} not available")
         return False
+
+    creation_options = translate_options.get("creationOptions")
+    vsimem = None
+    _ds = None
     try:
-        if resampling:
+        if resampling in COG_OVERVIEW_RESAMPLING:
+            creation_options = _set_option(
+                creation_options, "OVERVIEW_RESAMPLING", resampling.upper()
+            )
+        elif resampling:
+            vsimem = f"/vsimem/{uuid.uuid4().hex}-{os.path.basename(dst)}"
             gdal.Translate(
-                f"/vsimem/{dst}",
+                vsimem,
                 src,
                 format="GTiff",
-                creationOptions=[
-                    "COMPRESS=LZW",
-                    "TILED=YES",
-                ],
+                creationOptions=["TILED=YES", "COMPRESS=NONE"],
             )
-            _ds = gdal.Open(f"/vsimem/{dst}", gdal.GA_Update)
+            _ds = gdal.Open(vsimem, gdal.GA_Update)
+            if overviewlist is None:
+                overviewlist = overview_levels(_ds.RasterXSize, _ds.RasterYSize)
             _ds.BuildOverviews(resampling=resampling, overviewlist=overviewlist)
-            gdal.Translate(
-                dst,
-                _ds,
-                **translate_options,
+            src = _ds
+            creation_options = _set_option(
+                creation_options, "OVERVIEWS", "FORCE_USE_EXISTING"
             )
-        else:
+
+        with _encoder_threads() as threads:
             gdal.Translate(
                 dst,
                 src,
-                **translate_options,
+                **{
+                    **translate_options,
+                    "creationOptions": _with_num_threads(creation_options, threads),
+                },
             )
         return True
     except RuntimeError as ex:
         logger.error(f"{type(ex).__name__}: {this}: {ex}")
     finally:
         _ds = None
+        src = None
+        if vsimem is not None:
+            gdal.Unlink(vsimem)
     return False
 
 
+@functools.lru_cache(maxsize=1024)
+def _band_pattern(val: str, regex_enabled: bool):
+    """Compiled (and escaped unless regex enabled) metadata search pattern"""
+    # Many grib values include regex special characters. e.g. [C] (degrees celsius)
+    # Escaping special characters by default keeps the substring behavior of "in".
+    return re.compile(val if regex_enabled else re.escape(val))
+
+
+class BandIndex:
+    """Band metadata index built in one pass over a dataset's bands
+
+    Metadata is stored as columns, one list per metadata key with a value for
+    every band (None if missing).  Lookups match each distinct value in a
+    column once and cache the matching bands, so several attribute sets can
+    be found without touching the dataset again.
+
+    ```
+    band_index = cgdal.BandIndex(ds)
+    precip, temp = band_index.find_all([precip_attr, temp_attr])
+    ```
+
+    Parameters
+    ----------
+    data_set : gdal.Dataset, optional
+        gdal dataset, by default None
+    """
+
+    def __init__(self, data_set: "gdal.Dataset" = None):
+        self.count = 0
+        self.columns = {}
+        self._cache = {}
+        if data_set is not None:
+            self.add_bands(
+                data_set.GetRasterBand(b).GetMetadata_Dict()
+                for b in range(1, data_set.RasterCount + 1)
+            )
+
+    def __repr__(self) -> str:
+        return f"{__class__.__name__}({self.count} bands, {len(self.columns)} keys)"
+
+    @classmethod
+    def from_json(cls, info: json):
+        """BandIndex from `gdal.Info(ds, format="json")` output"""
+        band_index = cls()
+        band_index.add_bands(band["metadata"].get("", {}) for band in info["bands"])
+        return band_index
+
+    def add_bands(self, metas):
+        """Append band metadata dictionaries as rows of the columns"""
+        for meta in metas:
+            for key, val in meta.items():
+                self.columns.setdefault(key, [None] * self.count).append(val)
+            self.count += 1
+            for column in self.columns.values():
+                if len(column) < self.count:
+                    column.append(None)
+        self._cache.clear()
+
+    def bands(self, key: str, val: str, regex_enabled: bool = False, anchored=False):
+        """Set of band numbers whose metadata key matches the value
+
+        Parameters
+        ----------
+        key : str
+            metadata key, e.g. GRIB_ELEMENT
+        val : str
+            substring or regular expression to match
+        regex_enabled : bool, optional
+            val is a regular expression, by default False
+        anchored : bool, optional
+            match at the start of the value (re.match), by default False
+            searching anywhere (re.search)
+
+        Returns
+        -------
+        frozenset[int]
+            band numbers
+        """
+        cache_key = (key, val, regex_enabled, anchored)
+        if (bands := self._cache.get(cache_key)) is None:
+            pattern = _band_pattern(val, regex_enabled)
+            test = pattern.match if anchored else pattern.search
+            matched = {}
+            found = set()
+            for b, meta_val in enumerate(self.columns.get(key, ()), start=1):
+                if meta_val is None:
+                    continue
+                if (hit := matched.get(meta_val)) is None:
+                    hit = matched[meta_val] = test(meta_val) is not None
+                if hit:
+                    found.add(b)
+            bands = self._cache[cache_key] = frozenset(found)
+        return bands
+
+    def find(self, attr: dict, regex_enabled: bool = False, anchored=False):
+        """Return the first band number matching all attributes
+
+        Parameters
+        ----------
+        attr : dict
+            attributes matching those in the metadata
+        regex_enabled : bool, optional
+            attribute values are regular expressions, by default False
+        anchored : bool, optional
+            match at the start of values, by default False
+
+        Returns
+        -------
+        int | None
+            band number
+        """
+        if not attr:
+            return 1 if self.count else None
+        found = None
+        for key, val in attr.items():
+            bands = self.bands(key, val, regex_enabled, anchored)
+            found = bands if found is None else found & bands
+            if not found:
+                return None
+        return min(found)
+
+    def find_all(self, attrs: list, regex_enabled: bool = False, anchored=False):
+        """Band numbers for several attribute sets from the same index
+
+        Returns
+        -------
+        List[int | None]
+            band number for each attribute set
+        """
+        return [self.find(attr, regex_enabled, anchored) for attr in attrs]
+
+
 # get a band based on provided attributes in the metadata
 def find_band(data_set: "gdal.Dataset", attr: dict = {}, regex_enabled: bool = False):
     """Return the band number
 
+    Builds a BandIndex; use BandIndex directly to search a dataset more than once
+
     Parameters
     ----------
     data_set : gdal.Dataset
@@ -192,68 +894,35 @@ def find_band(data_set: "gdal.Dataset", attr: dict = {}, regex_enabled: bool = F
     int
         band number
     """
-    count = data_set.RasterCount
-    for b in range(1, count + 1):
-        has_attr = 0
-        try:
-            raster = data_set.GetRasterBand(b)
-            meta = raster.GetMetadata_Dict()
-            for key, val in attr.items():
-                if key in meta:
-                    # Many grib values include regex special characters. e.g. [C] (degrees celsius)
-                    # Function escapes special characters by default to avoid breaking changes by introducing re.search().
-                    # Escaping special characters by default will cause this helper function to behave the same way
-                    # it did previously when looking for a substring using "in".
-                    _val = val
-                    if not regex_enabled:
-                        _val = re.escape(_val)
-                    if re.search(_val, raster.GetMetadataItem(key)) is not None:
-                        has_attr += 1
-            if has_attr == len(attr):
-                logger.debug(f"{has_attr=}")
-                return b
-
-        except RuntimeError as ex:
-            logger.error(f"{type(ex).__name__}: {this}: {ex}")
-            continue
-        finally:
-            raster = None
+    try:
+        band_number = BandIndex(data_set).find(attr, regex_enabled)
+        logger.debug(f"{band_number=}")
+        return band_number
+    except RuntimeError as ex:
+        logger.error(f"{type(ex).__name__}: {this}: {ex}")
 
     return None
 
 
 def band_from_json(info: json, attr: dict, rex: bool = False):
-    """band_from_json _summary_
+    """Return the band number from gdal.Info json output
 
     Parameters
     ----------
     info : json
-        _description_
+        gdal.Info(ds, format="json") output
     attr : dict
-        _description_
+        attributes matching those in the metadata, matched at the
+        start of the value
+    rex : bool, optional
+        attribute values are regular expressions, by default False
 
     Returns
     -------
-    _type_
-        _description_
+    int | None
+        band number
     """
-
-    bands = info["bands"]
-    for band in bands:
-        has_match = 0
-        meta = band["metadata"][""]
-        meta_keys = set(meta.keys())
-        attr_keys = set(attr.keys())
-        key_intersect = meta_keys.intersection(attr_keys)
-
-        if len(attr) == len(key_intersect):
-            for key in key_intersect:
-                search_pattern = attr[key] if rex else re.escape(attr[key])
-                search_match = re.match(search_pattern, meta[key])
-                if search_match:
-                    has_match += 1
-            if len(attr) == has_match:
-                return band["band"]
+    return BandIndex.from_json(info).find(attr, rex, anchored=True)
 
 
 def gdal_calculate(*args):
@@ -274,6 +943,8 @@ def gdal_calculate(*args):
 def gdal_fillnodataval(src: str, dst: str, /, *args):
     """Implement gdal-utils gdal_fillnodata CLI utility as a subprocess
 
+    Prefer `fill_nodata` filling in-process
+
     gdal_fillnodata documentation:
 
     https://gdal.org/programs/gdal_fillnodata.html
@@ -293,7 +964,176 @@ def gdal_fillnodataval(src: str, dst: str, /, *args):
         return result
 
 
-def validate_cog(*args):
+def fill_nodata(
+    src,
+    dst: str,
+    max_distance: float,
+    smoothing_iterations: int = 0,
+    band: int = 1,
+    executor: Executor = None,
+    **kwargs,
+):
+    """Fill nodata in memory with gdal.FillNodata and write a COG
+
+    In-process replacement for `gdal_fillnodataval`; the source is copied to
+    a MEM dataset, filled and translated straight to the COG without an
+    intermediate GTiff or a gdal_fillnodata.py subprocess.  GDAL releases the
+    GIL while filling so fills can run concurrently on a thread pool.
+
+    Parameters
+    ----------
+    src : str | gdal.Dataset
+        source filename or dataset
+    dst : str
+        output COG FQPN
+    max_distance : float
+        maximum distance in pixels to search for values; 0 skips the fill
+    smoothing_iterations : int, optional
+        3x3 smoothing filter passes, by default 0
+    band : int, optional
+        band to fill, by default 1
+    executor : Executor, optional
+        run on the executor and return a Future, by default None
+    **kwargs
+        keyword arguments for gdal_translate_w_options
+
+    Returns
+    -------
+    str | None | Future
+        dst or None if failed; Future of the same when executor given
+    """
+    if executor is not None:
+        return executor.submit(
+            fill_nodata,
+            src,
+            dst,
+            max_distance,
+            smoothing_iterations,
+            band,
+            **kwargs,
+        )
+
+    mem_ds = None
+    try:
+        src_ds = gdal.Open(src) if isinstance(src, str) else src
+        mem_ds = gdal.GetDriverByName("MEM").CreateCopy("", src_ds)
+        src_ds = None
+
+        if max_distance > 0:
+            gdal.FillNodata(
+                targetBand=mem_ds.GetRasterBand(band),
+                maskBand=None,
+                maxSearchDist=max_distance,
+                smoothingIterations=smoothing_iterations,
+            )
+
+        gdal_translate_w_options(dst, mem_ds, bandList=[band], **kwargs)
+        return dst
+    except RuntimeError as ex:
+        logger.error(f"{type(ex).__name__}: {this}: {ex}")
+    finally:
+        mem_ds = None
+
+
+def cog_layout_errors(src):
+    """Cheap structural COG check
+
+    Checks the ghost header (LAYOUT=COG), tiling and that the full resolution
+    IFD precedes the overview IFDs in decreasing size order without walking
+    tile offsets.  Works on /vsimem/ buffers before they are copied out.
+
+    Parameters
+    ----------
+    src : str | gdal.Dataset
+        GeoTIFF FQPN, /vsimem/ path or open dataset
+
+    Returns
+    -------
+    List[str]
+        layout errors; empty for a COG
+    """
+    ds = gdal.Open(src) if isinstance(src, str) else src
+    errors = []
+    if ds.GetDriver().ShortName != "GTiff":
+        return [f"{ds.GetDriver().ShortName} is not a GeoTIFF"]
+    if ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") != "COG":
+        errors.append("missing COG ghost header")
+
+    band = ds.GetRasterBand(1)
+    block_x, block_y = band.GetBlockSize()
+    if ds.RasterXSize > 512 and (block_x == ds.RasterXSize or block_y == 1):
+        errors.append("not tiled")
+
+    offsets = [band.GetMetadataItem("IFD_OFFSET", "TIFF")]
+    offsets.extend(
+        band.GetOverview(i).GetMetadataItem("IFD_OFFSET", "TIFF")
+        for i in range(band.GetOverviewCount())
+    )
+    if None not in offsets:
+        offsets = [int(offset) for offset in offsets]
+        if offsets != sorted(offsets):
+            errors.append("IFDs not ordered full resolution then overviews")
+    return errors
+
+
+_validations = itertools.count()
+
+# dst -> cog_layout_errors found before the write, or _SKIPPED by the policy,
+# for gdal_translate_w_options(validate=True); popped by validate_cog
+_layout_checked = {}
+_SKIPPED = object()
+
+
+def _validation_due(policy: str = None):
+    """Whether the validation policy, by default COG_VALIDATION, selects this
+    write"""
+    policy = policy or COG_VALIDATION
+    if policy == "always":
+        return True
+    if policy == "off":
+        return False
+    if policy == "tests-only":
+        return "PYTEST_CURRENT_TEST" in os.environ
+    if policy.startswith("sampled:"):
+        every = max(1, int(policy.split(":", 1)[1]))
+        return next(_validations) % every == 0
+    logger.warning(f"Unknown COG_VALIDATION policy {policy}; validating")
+    return True
+
+
+def validate_cog(*args, force: bool = False):
+    """Validate a COG when the COG_VALIDATION policy selects it
+
+    Parameters
+    ----------
+    *args
+        validate_cloud_optimized_geotiff arguments, e.g. "-q", tif
+    force : bool, optional
+        validate regardless of policy, by default False
+
+    Returns
+    -------
+    int | None
+        0 if a COG, 1 if not, None when skipped by policy
+    """
+    tif = os.fspath(args[-1])
+    checked = _layout_checked.pop(tif, None)
+    if COG_VALIDATOR == "structural" and not force:
+        # policy already decided at the write; checked there in /vsimem/
+        if checked is _SKIPPED:
+            return None
+        if (errors := checked) is None:
+            if not _validation_due():
+                return None
+            errors = cog_layout_errors(tif)
+        if errors:
+            logger.warning(f"{tif} not a COG: {errors}")
+            return 1
+        return 0
+
+    if not (force or _validation_due()):
+        return None
+
     argv = [validate_cloud_optimized_geotiff.__file__]
     argv.extend(list(args))
 
@@ -311,7 +1151,7 @@ def openfileGDAL(src, dst, GDALAccess="Update"):
     dst : str, optional
         path to temporary directory
     GDALAccess: str default 'Update'
-        read_only or update access to object.
+        read_only or update access to object; virtual sources are read only
 
     Returns
     -------
@@ -340,19 +1180,30 @@ def openfileGDAL(src, dst, GDALAccess="Update"):
     #       in the bands that get translated out. Because 'src' is already a copy, no risk of
     #       corrupting the original file at this time. If 'src' is ever passed as a virtual
     #       path to the original file in archive (e.g. /vsis3/...), will want to revisit.
+    #
+    #       Virtual sources (/vsis3/, /vsicurl/) are always opened read-only.  When
+    #       update access is asked for, an in-memory VRT of the dataset is returned
+    #       so the Transform and Projection can still be set.
     exts = (
         ".gz",
         ".tar",
         ".zip",
         ".tar.gz",
     )
-    if GDALAccess == "read_only":
+    virtual = src.startswith("/vsi")
+    as_vrt = virtual and GDALAccess != "read_only"
+    if GDALAccess == "read_only" or virtual:
         GDALAccess = gdal.GA_ReadOnly
     else:
         GDALAccess = gdal.GA_Update
 
     try:
-        if any([x in src for x in exts]):
+        if virtual:
+            vsi = "/vsigzip/" if src.endswith(".gz") else ""
+            ds = gdal.Open(vsi + src, GDALAccess)
+            if as_vrt and ds.RasterCount > 0:
+                ds = gdal.Translate("", ds, format="VRT")
+        elif any([x in src for x in exts]):
             try:
                 ds = gdal.Open("/vsigzip/" + src, GDALAccess)
             except RuntimeError as err:
@@ -468,60 +1319,15 @@ def geoTransform_ds(ds: gdal.Dataset, SUBSET_NAME: str, dstSRS: str = "EPSG:4326
         lonLL, latLL, lonUR, latUR: Lat and long of Lower Left corner and Upper Right corner of dataset
 
     """
-    sub_meta = ds.GetMetadata_Dict()
-
-    # Initial metadata value for qpe_grid#latLonLL looks like: "{-123.6735229012065,29.94159256439344}"
-    # strip() removes characters "{" and "}"
-    # split() returns a list of two strings (which represent numbers), split on the ","
-    # map() converts each string to a float; list() converts the map object back to a list
-    #
-    # lower left coordinates (minimum x, minimum y)
-    lonLL, latLL = list(
-        map(float, sub_meta[f"{SUBSET_NAME}#latLonLL"].strip("{}").split(","))
-    )  # Lon/Lat
-    hrap_xmin, hrap_ymin = list(
-        map(float, sub_meta[f"{SUBSET_NAME}#gridPointLL"].strip("{}").split(","))
-    )  # HRAP
-    ster_xmin, ster_ymin = hrap.ster_x(hrap_xmin), hrap.ster_y(
-        hrap_ymin
-    )  # Polar Stereographic
-
-    #
-    # upper right coordinates (maximum x, maximum y) in geographic space and pixel space
-    lonUR, latUR = list(
-        map(float, sub_meta[f"{SUBSET_NAME}#latLonUR"].strip("{}").split(","))
-    )  # Lon/Lat
-    hrap_xmax, hrap_ymax = list(
-        map(float, sub_meta[f"{SUBSET_NAME}#gridPointUR"].strip("{}").split(","))
-    )  # HRAP
-    ster_xmax, ster_ymax = hrap.ster_x(hrap_xmax), hrap.ster_y(
-        hrap_ymax
-    )  # Polar Stereographic
-    #
-    # size of the grid
-    # nrows = number of rows in the grid (y or latitude direction)
-    # ncols = number of columns in the grid (x or longitude direction)
-    ncols, nrows = list(
-        map(float, sub_meta[f"{SUBSET_NAME}#domainExtent"].strip("{}").split(","))
+    # RFC grids come from a few fixed HRAP domains; geotransform, SRS and
+    # warp output grid are cached per domain in utils.hrap
+    hrap_grid, (lonLL, latLL, lonUR, latUR) = hrap.from_metadata(
+        ds.GetMetadata_Dict(), SUBSET_NAME
     )
 
-    # Grid Cell Resolution; polar stereographic reference
-    xres = (ster_xmax - ster_xmin) / float(ncols)
-    yres = (ster_ymax - ster_ymin) / float(nrows)
-
-    # Specify geotransform
-    # https://gdal.org/tutorials/geotransforms_tut.html#introduction-to-geotransforms
-    # GT(0) x-coordinate of the upper-left corner of the upper-left pixel.
-    # GT(1) w-e pixel resolution / pixel width.
-    # GT(2) row rotation (typically zero).
-    # GT(3) y-coordinate of the upper-left corner of the upper-left pixel.
-    # GT(4) column rotation (typically zero).
-    # GT(5) n-s pixel resolution / pixel height (negative value for a north-up image).
-    geotransform = (ster_xmin, xres, 0, ster_ymax, 0, -yres)
-
-    ds.SetGeoTransform(geotransform)
-    ds.SetProjection(hrap.PROJ4)
-    warp = gdal.Warp("", ds, format="vrt", dstSRS=dstSRS)
+    ds.SetGeoTransform(hrap_grid.geotransform)
+    ds.SetProjection(hrap_grid.wkt)
+    warp = hrap.warp(ds, hrap_grid, dstSRS)
     return warp, lonLL, latLL, lonUR, latUR
 
 
@@ -560,11 +1366,11 @@ def subsetOutFile(
     """
 
     # Get the subset metadata and the valid times as a list
-    outfile_list = []
     sub_meta = ds.GetMetadata_Dict()
     valid_times_list = list(eval(sub_meta[f"{SUBSET_NAME}#validTimes"]))
     valid_times_list.sort()
 
+    outfiles = {}
     for i, t in enumerate(valid_times_list):
         # skip the zero valid time
         if i == 0:
@@ -572,32 +1378,18 @@ def subsetOutFile(
 
         valid_datetime = datetime.fromtimestamp(t).replace(tzinfo=timezone.utc)
 
-        raster_band = ds.GetRasterBand(i)
-
-        nodata = raster_band.GetNoDataValue()
-        cgdal.gdal_translate_w_options(
-            tif := str(
+        outfiles[i] = {
+            "filetype": acquirable,
+            "file": str(
                 dst_path
                 / f'{acquirable}.{version_datetime.strftime("%Y%m%d_%H%M")}.{valid_datetime.strftime("%Y%m%d_%H%M")}.tif'
             ),
-            ds,
-            bandList=[i],
-            noData=nodata,
-            **kwargs,
-        )
+            "datetime": valid_datetime.isoformat(),
+            "version": version_datetime.isoformat(),
+        }
 
-        # validate COG
-        if (validate := cgdal.validate_cog("-q", tif)) == 0:
-            logger.debug(f"Validate COG = {validate}\t{tif} is a COG")
-
-        outfile_list.append(
-            {
-                "filetype": acquirable,
-                "file": tif,
-                "datetime": valid_datetime.isoformat(),
-                "version": version_datetime.isoformat(),
-            },
-        )
+    # each band keeps its own nodata value through the in-memory copy
+    outfile_list = cgdal.translate_bands(ds, outfiles, **kwargs)
     return outfile_list
 
 
@@ -0,0 +1,464 @@
+"""
+# GRIB2 index (idx) utilities
+
+Index files (wgrib2 inventory format) list each GRIB2 message with its byte
+offset so a single message can be read without opening the whole file.
+
+```
+90:45323817:d=2022042912:APCP:surface:0-1 hour acc fcst:
+```
+
+Sources can be local files or GDAL virtual paths (e.g. /vsis3/); only the
+byte range of the selected message is read and written to /vsimem/.  The idx
+is read from next to the source (src + ".idx"); sources without one are left
+to the caller's full open, as generating an idx costs more than that open.
+`generate_idx` builds one from the GRIB2 section headers and GDAL's band
+metadata for publishing alongside a source.
+"""
+
+import os
+import re
+import struct
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Callable, List, Union
+
+from cumulus_geoproc import logger
+from osgeo import gdal
+
+gdal.UseExceptions()
+
+this = os.path.basename(__file__)
+
+IdxRecord = namedtuple(
+    "IdxRecord",
+    ["message", "offset", "length", "cycle", "element", "level", "forecast", "extra"],
+)
+"""namedtuple: idx line; length is None for the last message (read to EOF)"""
+
+# GRIB2 section 0: 'GRIB', reserved(2), discipline(1), edition(1), length(8)
+GRIB2_SECTION0 = struct.Struct(">4s2xBBQ")
+# sections 1-7: length(4), section number(1); section 8 is '7777'
+GRIB2_SECTION = struct.Struct(">IB")
+GRIB2_END = b"7777"
+
+
+def parse_idx(text: str):
+    """Parse idx text into records with byte lengths
+
+    Parameters
+    ----------
+    text : str
+        idx file contents
+
+    Returns
+    -------
+    List[IdxRecord]
+        records in file order
+    """
+    rows = []
+    for line in text.splitlines():
+        parts = line.split(":")
+        if len(parts) < 6:
+            continue
+        try:
+            rows.append(
+                (
+                    parts[0],
+                    int(parts[1]),
+                    parts[2][2:],
+                    parts[3],
+                    parts[4],
+                    parts[5],
+                    ":".join(parts[6:]).strip(":"),
+                )
+            )
+        except ValueError as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex} - {line}")
+
+    records = []
+    for i, (message, offset, cycle, element, level, forecast, extra) in enumerate(
+        rows
+    ):
+        # sub-messages ("5.1", "5.2") share their message's offset; the length
+        # runs to the next message
+        following = (row[1] for row in rows[i + 1 :] if row[1] != offset)
+        end = next(following, None)
+        length = end - offset if end is not None else None
+        records.append(
+            IdxRecord(message, offset, length, cycle, element, level, forecast, extra)
+        )
+    return records
+
+
+def _size(src: str):
+    """File size, FileNotFoundError when src doesn't exist"""
+    if (stat := gdal.VSIStatL(src)) is None:
+        raise FileNotFoundError(src)
+    return stat.size
+
+
+def _open(src: str):
+    """VSI file handle, FileNotFoundError when src can't be opened"""
+    try:
+        fptr = gdal.VSIFOpenL(src, "rb")
+    except RuntimeError as ex:
+        raise FileNotFoundError(f"{src}: {ex}") from ex
+    if fptr is None:
+        raise FileNotFoundError(src)
+    return fptr
+
+
+def vsi_read(src: str, offset: int = 0, length: int = None):
+    """Read a byte range from a local or GDAL virtual file
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path
+    offset : int, optional
+        starting byte, by default 0
+    length : int, optional
+        bytes to read, by default None reading to EOF
+
+    Returns
+    -------
+    bytes
+        bytes read
+    """
+    if length is None:
+        length = _size(src) - offset
+
+    fptr = _open(src)
+    try:
+        gdal.VSIFSeekL(fptr, offset, os.SEEK_SET)
+        return gdal.VSIFReadL(1, length, fptr)
+    finally:
+        gdal.VSIFCloseL(fptr)
+
+
+def read_idx(src: str, idx: str = None):
+    """Read and parse the idx file for a GRIB2 source
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path to the GRIB2 file
+    idx : str, optional
+        idx path, by default src + ".idx"
+
+    Returns
+    -------
+    List[IdxRecord] | None
+        records or None if no idx exists
+    """
+    idx = idx or src + ".idx"
+    try:
+        if gdal.VSIStatL(idx) is None:
+            return None
+        return parse_idx(vsi_read(idx).decode("utf-8"))
+    except RuntimeError as ex:
+        logger.debug(f"{type(ex).__name__}: {this}: {ex}")
+        return None
+
+
+def scan_grib(src: str):
+    """Scan GRIB2 section headers for message offsets, lengths and fields
+
+    Only the 16 byte section 0 and the 5 byte header of each following
+    section are read.  A message holds one field per product definition
+    section (4); GDAL opens each field as a band.
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path to the GRIB2 file
+
+    Returns
+    -------
+    List[tuple[int, int, int]]
+        (offset, length, fields) of each message
+    """
+    messages = []
+    size = _size(src)
+    fptr = _open(src)
+    try:
+        offset = 0
+        while offset + GRIB2_SECTION0.size <= size:
+            gdal.VSIFSeekL(fptr, offset, os.SEEK_SET)
+            header = gdal.VSIFReadL(1, GRIB2_SECTION0.size, fptr)
+            marker, _, edition, length = GRIB2_SECTION0.unpack(header)
+            if marker != b"GRIB" or edition != 2:
+                raise ValueError(f"Not a GRIB2 message at byte {offset}")
+
+            fields = 0
+            position = offset + GRIB2_SECTION0.size
+            end = offset + length - len(GRIB2_END)
+            while position < end:
+                gdal.VSIFSeekL(fptr, position, os.SEEK_SET)
+                section_length, number = GRIB2_SECTION.unpack(
+                    gdal.VSIFReadL(1, GRIB2_SECTION.size, fptr)
+                )
+                if section_length < GRIB2_SECTION.size:
+                    raise ValueError(f"Bad section {number} at byte {position}")
+                fields += number == 4
+                position += section_length
+
+            messages.append((offset, length, max(1, fields)))
+            offset += length
+    finally:
+        gdal.VSIFCloseL(fptr)
+    return messages
+
+
+# GDAL (degrib) element names differing from wgrib2 abbreviations
+GDAL_ELEMENTS = {"T": "TMP", "TD": "DPT", "QPF": "APCP", "MaxT": "TMAX", "MinT": "TMIN"}
+
+# GDAL GRIB_SHORT_NAME level types to wgrib2 level descriptions
+GDAL_LEVELS = {
+    "SFC": "surface",
+    "HTGL": "{} m above ground",
+    "ISBL": "{} mb",
+    "MSL": "mean sea level",
+    "EATM": "entire atmosphere",
+}
+
+# product definition templates wgrib2 lists with a trailing description;
+# `find` excludes them unless asked for
+GDAL_PDTN_EXTRA = {
+    1: "ENS",
+    2: "ens",
+    5: "prob",
+    6: "percentile",
+    9: "prob",
+    10: "percentile",
+    11: "ENS",
+    12: "ens",
+}
+
+
+def wgrib2_fields(meta: dict):
+    """wgrib2 inventory fields from GDAL GRIB band metadata
+
+    Accumulations (GDAL elements like APCP01) become "APCP" with
+    "5-6 hour acc fcst"; other fields "N hour fcst" or "anl".  Levels and
+    names outside GDAL_ELEMENTS/GDAL_LEVELS keep GDAL's value.
+
+    Parameters
+    ----------
+    meta : dict
+        band metadata, e.g. band.GetMetadata_Dict()
+
+    Returns
+    -------
+    Tuple[str, str, str, str]
+        element, level, forecast and extra
+    """
+    element = meta.get("GRIB_ELEMENT", "")
+
+    ref_time = re.match(r"-?\d+", meta.get("GRIB_REF_TIME", ""))
+    valid_time = re.match(r"-?\d+", meta.get("GRIB_VALID_TIME", ""))
+    hours = None
+    if ref_time and valid_time:
+        hours = (int(valid_time[0]) - int(ref_time[0])) // 3600
+
+    accumulation = None
+    if (m := re.fullmatch(r"([A-Za-z]+)(\d{2,3})", element)) and hours is not None:
+        if 0 < int(m[2]) <= hours:
+            element, accumulation = m[1], int(m[2])
+    element = GDAL_ELEMENTS.get(element, element)
+
+    value, _, kind = meta.get("GRIB_SHORT_NAME", "").partition("-")
+    if kind in GDAL_LEVELS:
+        number = float(value) / 100 if kind == "ISBL" else float(value)
+        level = GDAL_LEVELS[kind].format(f"{number:g}")
+    else:
+        level = meta.get("GRIB_SHORT_NAME", "")
+
+    if hours is None:
+        forecast = ""
+    elif accumulation is not None:
+        forecast = f"{hours - accumulation}-{hours} hour acc fcst"
+    else:
+        forecast = f"{hours} hour fcst" if hours else "anl"
+
+    try:
+        extra = GDAL_PDTN_EXTRA.get(int(meta.get("GRIB_PDS_PDTN", 0)), "")
+    except ValueError:
+        extra = ""
+    return element, level, forecast, extra
+
+
+def generate_idx(src: str, dst: str = None):
+    """Generate wgrib2 style idx records by scanning the file once
+
+    Offsets come from `scan_grib`; element, level, forecast and extra are
+    translated from GDAL's band metadata with `wgrib2_fields`.  Messages with
+    more than one field are listed as sub-messages ("5.1", "5.2").
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path to the GRIB2 file
+    dst : str, optional
+        idx FQPN to write for reuse, by default None
+
+    Returns
+    -------
+    List[IdxRecord] | None
+        records or None if messages and bands don't pair up
+    """
+    messages = scan_grib(src)
+    labels = [
+        (str(m) if fields == 1 else f"{m}.{f}", offset)
+        for m, (offset, _, fields) in enumerate(messages, start=1)
+        for f in range(1, fields + 1)
+    ]
+
+    ds = gdal.Open(src)
+    try:
+        if ds.RasterCount != len(labels):
+            logger.warning(f"{len(labels)} fields != {ds.RasterCount} bands")
+            return None
+
+        lines = []
+        for b, (label, offset) in enumerate(labels, start=1):
+            meta = ds.GetRasterBand(b).GetMetadata_Dict()
+            ref_time = re.match(r"-?\d+", meta.get("GRIB_REF_TIME", ""))
+            cycle = (
+                datetime.fromtimestamp(int(ref_time[0]), timezone.utc).strftime(
+                    "%Y%m%d%H"
+                )
+                if ref_time
+                else ""
+            )
+            lines.append(
+                ":".join([label, str(offset), f"d={cycle}", *wgrib2_fields(meta), ""])
+            )
+    finally:
+        ds = None
+
+    text = "\n".join(lines) + "\n"
+    if dst is not None:
+        try:
+            with open(dst, "w", encoding="utf-8") as fptr:
+                fptr.write(text)
+        except OSError as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+    return parse_idx(text)
+
+
+def _matches(pattern: Union[str, Callable[[str], bool]], value: str):
+    if pattern is None:
+        return True
+    if callable(pattern):
+        return pattern(value)
+    return re.fullmatch(pattern, value) is not None
+
+
+def find(
+    records: List[IdxRecord],
+    element: Union[str, Callable[[str], bool]],
+    level: Union[str, Callable[[str], bool]] = None,
+    forecast: Union[str, Callable[[str], bool]] = None,
+    extra: Union[str, Callable[[str], bool]] = "",
+):
+    """Find the first record matching all criteria
+
+    Criteria are full match regular expressions or predicates; None matches
+    anything.  `extra` defaults to "" excluding probability and ensemble
+    statistic messages.
+
+    Parameters
+    ----------
+    records : List[IdxRecord]
+        parsed idx records
+    element : str | Callable[[str], bool]
+        e.g. "APCP"
+    level : str | Callable[[str], bool], optional
+        e.g. "surface", by default None
+    forecast : str | Callable[[str], bool], optional
+        e.g. r"0-1 hour acc fcst", by default None
+    extra : str | Callable[[str], bool], optional
+        trailing fields, by default ""
+
+    Returns
+    -------
+    IdxRecord | None
+        matching record or None
+    """
+    for record in records:
+        if (
+            _matches(element, record.element)
+            and _matches(level, record.level)
+            and _matches(forecast, record.forecast)
+            and _matches(extra, record.extra)
+        ):
+            return record
+    return None
+
+
+def read_message(src: str, record: IdxRecord):
+    """Read one message's byte range into /vsimem/
+
+    The caller opens the returned path and releases it with `gdal.Unlink`
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path to the GRIB2 file
+    record : IdxRecord
+        message to read
+
+    Returns
+    -------
+    str
+        /vsimem/ path to a single message GRIB2 file
+    """
+    data = vsi_read(src, record.offset, record.length)
+    vsimem = f"/vsimem/{uuid.uuid4().hex}-{os.path.basename(src)}"
+    gdal.FileFromMemBuffer(vsimem, data)
+    logger.debug(f"Message {record.message}: {len(data)} bytes -> {vsimem}")
+    return vsimem
+
+
+def open_message(src: str, idx: str = None, **criteria):
+    """Find a message in the idx and read only its byte range
+
+    Parameters
+    ----------
+    src : str
+        local FQPN or GDAL virtual path to the GRIB2 file
+    idx : str, optional
+        idx path, by default src + ".idx"
+    **criteria
+        keyword arguments for `find`
+
+    Returns
+    -------
+    str | None
+        /vsimem/ path to the message or None if there is no idx or no
+        message matches
+    """
+    if (records := read_idx(src, idx)) is None:
+        logger.debug(f"No idx for {src}")
+        return None
+    if (record := find(records, **criteria)) is None:
+        logger.debug(f"No idx message matching {criteria}")
+        return None
+    return read_message(src, record)
+
+
+def accumulation(hours: int):
+    """Predicate matching an idx forecast accumulated over `hours`
+
+    e.g. accumulation(1) matches "5-6 hour acc fcst" but not "0-6 hour acc fcst"
+    """
+    pattern = re.compile(r"(\d+)-(\d+) hour acc")
+
+    def predicate(forecast: str):
+        m = pattern.match(forecast)
+        return m is not None and int(m[2]) - int(m[1]) == hours
+
+    return predicate
@@ -1,9 +1,248 @@
+"""
 # Helper functions and constants related to the HRAP Grid
-# 
+
+HRAP is a polar stereographic grid (true at 60N, orientation 105W) with a
+4762.5 m mesh.  RFC NetCDF files describe their grid with `gridPointLL`,
+`gridPointUR` and `domainExtent` metadata; those come from a small set of
+fixed domains, so each grid's geotransform, SRS and warp template are built
+once per process and reused.
+
+```
+hrap_grid, (lonLL, latLL, lonUR, latUR) = hrap.from_metadata(meta, "qpe_grid")
+ds.SetGeoTransform(hrap_grid.geotransform)
+ds.SetProjection(hrap_grid.wkt)
+```
+
+Conversions between HRAP, polar stereographic and lon/lat accept scalars or
+NumPy arrays.
+
+REFERENCE: https://www.weather.gov/owp/oh_hrl_distmodel_hrap
+"""
+
+import functools
+import os
+from collections import namedtuple
+
+import numpy
+from osgeo import gdal, osr
+
+gdal.UseExceptions()
+
+this = os.path.basename(__file__)
+
 PROJ4 = "+proj=stere +lat_ts=60 +k_0=1 +long_0=-105 +R=6371200 +x_0=0.0 +y_0=0.0 +units=m"
 
+# HRAP mesh length (m), the pole's HRAP coordinate and the projection sphere
+MESH = 4762.5
+POLE_X = 401
+POLE_Y = 1601
+RADIUS = 6371200
+LON_0 = -105
+LAT_TS = 60
+
+# polar stereographic scale from the standard parallel
+_RHO_SCALE = RADIUS * (1 + numpy.sin(numpy.radians(LAT_TS)))
+
+
 # Specific to the HRAP Projection
 # Given a coordinate in HRAP, calculate coordinate in Polar Stereographic
-# REFERENCE: https://www.weather.gov/owp/oh_hrl_distmodel_hrap
-ster_x = lambda hrap_x: hrap_x * 4762.5 - 401 * 4762.5
-ster_y = lambda hrap_y: hrap_y * 4762.5 - 1601 * 4762.5
+def ster_x(hrap_x):
+    """HRAP x to polar stereographic x (m)"""
+    return (numpy.asarray(hrap_x, dtype=numpy.float64) - POLE_X) * MESH
+
+
+def ster_y(hrap_y):
+    """HRAP y to polar stereographic y (m)"""
+    return (numpy.asarray(hrap_y, dtype=numpy.float64) - POLE_Y) * MESH
+
+
+def hrap_x(x):
+    """Polar stereographic x (m) to HRAP x"""
+    return numpy.asarray(x, dtype=numpy.float64) / MESH + POLE_X
+
+
+def hrap_y(y):
+    """Polar stereographic y (m) to HRAP y"""
+    return numpy.asarray(y, dtype=numpy.float64) / MESH + POLE_Y
+
+
+def ster_to_lonlat(x, y):
+    """Polar stereographic (m) to lon/lat (degrees)
+
+    Parameters
+    ----------
+    x : float | numpy.ndarray
+        stereographic x
+    y : float | numpy.ndarray
+        stereographic y
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        longitude, latitude
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    lon = LON_0 + numpy.degrees(numpy.arctan2(x, -y))
+    lat = 90 - 2 * numpy.degrees(numpy.arctan(numpy.hypot(x, y) / _RHO_SCALE))
+    return (lon + 180) % 360 - 180, lat
+
+
+def lonlat_to_ster(lon, lat):
+    """Lon/lat (degrees) to polar stereographic (m)
+
+    Parameters
+    ----------
+    lon : float | numpy.ndarray
+        longitude
+    lat : float | numpy.ndarray
+        latitude
+
+    Returns
+    -------
+    Tuple[numpy.ndarray, numpy.ndarray]
+        stereographic x, y
+    """
+    dlon = numpy.radians(numpy.asarray(lon, dtype=numpy.float64) - LON_0)
+    rho = _RHO_SCALE * numpy.tan(
+        numpy.radians(45 - numpy.asarray(lat, dtype=numpy.float64) / 2)
+    )
+    return rho * numpy.sin(dlon), -rho * numpy.cos(dlon)
+
+
+def hrap_to_lonlat(x, y):
+    """HRAP coordinates to lon/lat (degrees)"""
+    return ster_to_lonlat(ster_x(x), ster_y(y))
+
+
+def lonlat_to_hrap(lon, lat):
+    """Lon/lat (degrees) to HRAP coordinates"""
+    x, y = lonlat_to_ster(lon, lat)
+    return hrap_x(x), hrap_y(y)
+
+
+HrapGrid = namedtuple(
+    "HrapGrid", ["key", "geotransform", "srs", "wkt", "ncols", "nrows"]
+)
+"""namedtuple: HRAP domain with its polar stereographic geotransform and SRS;
+treat srs as read only, it is shared by every user of the grid"""
+
+
+def _parse_pair(value: str):
+    """Metadata value like "{-123.67,29.94}" to a float tuple"""
+    return tuple(map(float, value.strip("{}").split(",")))
+
+
+@functools.lru_cache(maxsize=64)
+def grid(grid_point_ll: tuple, grid_point_ur: tuple, domain_extent: tuple):
+    """HRAP grid from its corner grid points and extent, cached per process
+
+    Parameters
+    ----------
+    grid_point_ll : tuple
+        (x, y) HRAP lower left
+    grid_point_ur : tuple
+        (x, y) HRAP upper right
+    domain_extent : tuple
+        (ncols, nrows)
+
+    Returns
+    -------
+    HrapGrid
+        registry entry
+    """
+    ster_xmin, ster_ymin = ster_x(grid_point_ll[0]), ster_y(grid_point_ll[1])
+    ster_xmax, ster_ymax = ster_x(grid_point_ur[0]), ster_y(grid_point_ur[1])
+    ncols, nrows = domain_extent
+
+    # Grid Cell Resolution; polar stereographic reference
+    xres = (ster_xmax - ster_xmin) / float(ncols)
+    yres = (ster_ymax - ster_ymin) / float(nrows)
+
+    # https://gdal.org/tutorials/geotransforms_tut.html#introduction-to-geotransforms
+    geotransform = (
+        float(ster_xmin),
+        float(xres),
+        0,
+        float(ster_ymax),
+        0,
+        -float(yres),
+    )
+
+    srs = osr.SpatialReference()
+    srs.ImportFromProj4(PROJ4)
+
+    return HrapGrid(
+        key=(grid_point_ll, grid_point_ur, domain_extent),
+        geotransform=geotransform,
+        srs=srs,
+        wkt=srs.ExportToWkt(),
+        ncols=int(ncols),
+        nrows=int(nrows),
+    )
+
+
+def from_metadata(meta: dict, subset_name: str):
+    """Registry grid and lon/lat corners from RFC NetCDF metadata
+
+    Parameters
+    ----------
+    meta : dict
+        dataset metadata, e.g. ds.GetMetadata_Dict()
+    subset_name : str
+        variable prefix, e.g. "qpe_grid"
+
+    Returns
+    -------
+    Tuple[HrapGrid, Tuple[float, float, float, float]]
+        grid and (lonLL, latLL, lonUR, latUR) as given in the metadata
+    """
+    hrap_grid = grid(
+        _parse_pair(meta[f"{subset_name}#gridPointLL"]),
+        _parse_pair(meta[f"{subset_name}#gridPointUR"]),
+        _parse_pair(meta[f"{subset_name}#domainExtent"]),
+    )
+    lonLL, latLL = _parse_pair(meta[f"{subset_name}#latLonLL"])
+    lonUR, latUR = _parse_pair(meta[f"{subset_name}#latLonUR"])
+    return hrap_grid, (lonLL, latLL, lonUR, latUR)
+
+
+# (grid key, dstSRS, source size) -> gdal.WarpOptions with the output grid
+_warp_templates = {}
+
+
+def warp(ds: gdal.Dataset, hrap_grid: HrapGrid, dstSRS: str = "EPSG:4326"):
+    """VRT warp of a dataset on an HRAP grid
+
+    The first warp of a grid lets GDAL suggest the output bounds and size;
+    they are kept as a template so later files skip that search.
+
+    Parameters
+    ----------
+    ds : gdal.Dataset
+        dataset with the grid's geotransform and projection set
+    hrap_grid : HrapGrid
+        registry grid
+    dstSRS : str, optional
+        target SRS, by default "EPSG:4326"
+
+    Returns
+    -------
+    gdal.Dataset
+        VRT dataset
+    """
+    key = (hrap_grid.key, dstSRS, ds.RasterXSize, ds.RasterYSize)
+    if (options := _warp_templates.get(key)) is not None:
+        return gdal.Warp("", ds, options=options)
+
+    vrt = gdal.Warp("", ds, format="vrt", dstSRS=dstSRS)
+    xmin, xres, _, ymax, _, yres = vrt.GetGeoTransform()
+    width, height = vrt.RasterXSize, vrt.RasterYSize
+    _warp_templates[key] = gdal.WarpOptions(
+        format="vrt",
+        dstSRS=dstSRS,
+        outputBounds=(xmin, ymax + yres * height, xmin + xres * width, ymax),
+        width=width,
+        height=height,
+    )
+    return vrt
@@ -0,0 +1,162 @@
+"""
+# Streaming NetCDF variable reads
+
+`variable[:]` loads the whole (time, y, x) cube before the first step is
+used.  These generators read a variable along its leading axis in slabs
+aligned to the file's chunking where they can be and no larger than
+NETCDF_READ_LIMIT_MB, together with whatever the caller allocates per step,
+so memory is bounded by one slab however long the file is.
+
+```
+with Dataset(src, "r") as ncds:
+    for i, grid in ncread.iter_steps(ncds.variables["var"]):
+        ...
+```
+"""
+
+import math
+import os
+from typing import Tuple
+
+import numpy
+from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import NETCDF_READ_LIMIT_MB
+
+this = os.path.basename(__file__)
+
+
+def slab_nbytes(variable, index: Tuple[slice, ...] = ()):
+    """Bytes of one step along the leading axis, including the mask
+
+    Parameters
+    ----------
+    variable : netCDF4.Variable
+        variable to read
+    index : Tuple[slice, ...], optional
+        slices for the trailing dimensions, by default ()
+
+    Returns
+    -------
+    int
+        bytes per step
+    """
+    shape = list(variable.shape[1:])
+    for i, key in enumerate(index):
+        shape[i] = len(range(*key.indices(shape[i])))
+    # masked arrays carry one mask byte per value
+    return math.prod(shape) * (numpy.dtype(variable.dtype).itemsize + 1)
+
+
+def chunk_steps(
+    variable,
+    index: Tuple[slice, ...] = (),
+    limit_mb: int = NETCDF_READ_LIMIT_MB,
+    max_steps: int = None,
+    step_overhead: int = 0,
+):
+    """Steps along the leading axis read together
+
+    As many steps as fit the limit, counting the slab and any working memory
+    the caller holds per step, and never more than max_steps.  When that is
+    at least the on-disk chunk length it is rounded down to a multiple of it
+    so no chunk is decompressed twice; otherwise reads slice within a chunk.
+
+    Parameters
+    ----------
+    variable : netCDF4.Variable
+        variable to read
+    index : Tuple[slice, ...], optional
+        slices for the trailing dimensions, by default ()
+    limit_mb : int, optional
+        memory ceiling in MiB, by default NETCDF_READ_LIMIT_MB
+    max_steps : int, optional
+        upper bound on steps, by default None
+    step_overhead : int, optional
+        bytes per step the caller allocates while processing a slab, e.g.
+        resample.batch_step_nbytes, by default 0
+
+    Returns
+    -------
+    int
+        steps per read, at least 1
+    """
+    length = variable.shape[0]
+    step_nbytes = slab_nbytes(variable, index) + step_overhead
+    steps = max(1, limit_mb * 2**20 // max(1, step_nbytes))
+
+    if max_steps is not None:
+        steps = min(steps, max_steps)
+
+    chunking = variable.chunking()
+    if isinstance(chunking, list) and chunking[0] <= steps < length:
+        steps = steps // chunking[0] * chunking[0]
+    return max(1, min(steps, length))
+
+
+def iter_chunks(
+    variable,
+    index: Tuple[slice, ...] = (),
+    limit_mb: int = NETCDF_READ_LIMIT_MB,
+    max_steps: int = None,
+    step_overhead: int = 0,
+):
+    """Read a variable in slabs along its leading axis
+
+    Parameters
+    ----------
+    variable : netCDF4.Variable
+        variable to read
+    index : Tuple[slice, ...], optional
+        slices for the trailing dimensions, by default ()
+    limit_mb : int, optional
+        memory ceiling in MiB, by default NETCDF_READ_LIMIT_MB
+    max_steps : int, optional
+        upper bound on steps per slab, by default None
+    step_overhead : int, optional
+        bytes per step the caller allocates while processing a slab, by
+        default 0
+
+    Yields
+    ------
+    Tuple[int, numpy.ma.MaskedArray]
+        leading axis offset and the slab
+    """
+    length = variable.shape[0]
+    steps = chunk_steps(variable, index, limit_mb, max_steps, step_overhead)
+    nbytes = steps * (slab_nbytes(variable, index) + step_overhead)
+    # only when a single step is over the ceiling
+    if nbytes > limit_mb * 2**20:
+        logger.warning(
+            f"{this}: {variable.name} step of {nbytes / 2**20:.1f} MiB "
+            f"exceeds {limit_mb} MiB"
+        )
+    logger.debug(f"{variable.name}: {steps} of {length} per read")
+
+    for start in range(0, length, steps):
+        yield start, numpy.ma.asarray(variable[(slice(start, start + steps), *index)])
+
+
+def iter_steps(
+    variable,
+    index: Tuple[slice, ...] = (),
+    limit_mb: int = NETCDF_READ_LIMIT_MB,
+):
+    """Iterate a variable one step of its leading axis at a time
+
+    Parameters
+    ----------
+    variable : netCDF4.Variable
+        variable to read
+    index : Tuple[slice, ...], optional
+        slices for the trailing dimensions, by default ()
+    limit_mb : int, optional
+        memory ceiling in MiB, by default NETCDF_READ_LIMIT_MB
+
+    Yields
+    ------
+    Tuple[int, numpy.ma.MaskedArray]
+        index along the leading axis and that step
+    """
+    for start, chunk in iter_chunks(variable, index, limit_mb):
+        for offset, step in enumerate(chunk):
+            yield start + offset, step
@@ -0,0 +1,82 @@
+"""
+# Parallel map over bands or timesteps
+
+GDAL releases the GIL while decoding and compressing, so independent
+translates run concurrently on threads.  GDAL dataset handles are not
+thread safe; each worker thread opens its own handle to the source.
+
+```
+outfile_list = parallel_map(
+    cgdal.translate_band, [(band, outfile), ...], src=subsetpath
+)
+```
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import PARALLEL_MAP_WORKERS
+from osgeo import gdal
+
+gdal.UseExceptions()
+
+this = os.path.basename(__file__)
+
+
+def parallel_map(
+    func: Callable[..., Any],
+    items: Iterable,
+    src: str = None,
+    max_workers: int = PARALLEL_MAP_WORKERS,
+):
+    """Map a function over items on a thread pool preserving input order
+
+    Items raising an exception are logged and left out of the results.
+
+    Parameters
+    ----------
+    func : Callable[..., Any]
+        func(ds, item) when src is given, otherwise func(item)
+    items : Iterable
+        work items
+    src : str, optional
+        GDAL source opened once per worker thread, by default None
+    max_workers : int, optional
+        worker threads, by default PARALLEL_MAP_WORKERS
+
+    Returns
+    -------
+    List[Any]
+        results in item order
+    """
+    local = threading.local()
+    handles = []
+    lock = threading.Lock()
+
+    def dataset():
+        if getattr(local, "ds", None) is None:
+            local.ds = gdal.Open(src)
+            with lock:
+                handles.append(local.ds)
+        return local.ds
+
+    def call(item):
+        try:
+            result = func(dataset(), item) if src is not None else func(item)
+            return True, result
+        except Exception as ex:
+            logger.error(f"{type(ex).__name__}: {this}: {ex} - {item}")
+            return False, None
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(executor.map(call, items))
+    finally:
+        # release every thread's handle now rather than at thread exit
+        handles.clear()
+        local = None
+
+    return [result for ok, result in results if ok]
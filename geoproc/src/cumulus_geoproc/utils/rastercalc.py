@@ -0,0 +1,202 @@
+"""
+# Raster algebra with NumPy
+
+Block by block replacement for the gdal_calc CLI.  Named inputs are read
+window by window, passed to a vectorised callable and written to a
+/vsimem/ GTiff feeding the COG translate; no argv parsing, `eval` or
+intermediate file on disk.
+
+Like gdal_calc, a pixel is nodata in the output if it's nodata in any input.
+
+```
+rastercalc.calculate_to_cog(
+    {"A": swe, "B": avg_temp},
+    lambda A, B: A.astype(numpy.float32) * 2114 * (B - 273) / 333000,
+    tif,
+)
+```
+"""
+
+import os
+import uuid
+from typing import Callable, Dict, Union
+
+import numpy
+from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import RASTER_CALC_WINDOW
+from cumulus_geoproc.utils import cgdal
+from osgeo import gdal
+
+gdal.UseExceptions()
+
+this = os.path.basename(__file__)
+
+# gdal_calc default output nodata values by data type
+DEFAULT_NODATA = {
+    gdal.GDT_Byte: 0,
+    gdal.GDT_UInt16: 65535,
+    gdal.GDT_Int16: -32768,
+    gdal.GDT_UInt32: 4294967293,
+    gdal.GDT_Int32: -2147483647,
+    gdal.GDT_Float32: 3.402823466e38,
+    gdal.GDT_Float64: 1.7976931348623158e308,
+}
+
+
+def windows(cols: int, rows: int, size: int = RASTER_CALC_WINDOW):
+    """Yield (xoff, yoff, xsize, ysize) windows covering the raster"""
+    for yoff in range(0, rows, size):
+        for xoff in range(0, cols, size):
+            yield xoff, yoff, min(size, cols - xoff), min(size, rows - yoff)
+
+
+def apply(
+    arrays: Dict[str, numpy.ndarray],
+    func: Callable[..., numpy.ndarray],
+    nodata_in: Dict[str, float],
+    nodata: float = None,
+):
+    """Apply a NumPy callable to in-memory arrays propagating nodata
+
+    Parameters
+    ----------
+    arrays : Dict[str, numpy.ndarray]
+        input name (the callable's keyword) to array, all the same shape
+    func : Callable[..., numpy.ndarray]
+        vectorised function of the named input arrays
+    nodata_in : Dict[str, float]
+        input name to nodata value or None
+    nodata : float, optional
+        output nodata where any input is nodata, by default None
+
+    Returns
+    -------
+    numpy.ndarray
+        result array
+    """
+    result = numpy.asarray(func(**arrays))
+    if nodata is None:
+        return result
+
+    mask = None
+    for name, array in arrays.items():
+        if nodata_in.get(name) is not None:
+            is_nodata = array == nodata_in[name]
+            mask = is_nodata if mask is None else mask | is_nodata
+
+    if mask is not None and mask.any():
+        result = numpy.where(mask, nodata, result)
+    return result
+
+
+def calculate(
+    inputs: Dict[str, Union[str, gdal.Dataset]],
+    func: Callable[..., numpy.ndarray],
+    dst: str = None,
+    datatype: int = None,
+    nodata: float = None,
+    window: int = RASTER_CALC_WINDOW,
+):
+    """Apply a NumPy callable to named single band inputs block by block
+
+    Parameters
+    ----------
+    inputs : Dict[str, str | gdal.Dataset]
+        input name (the callable's keyword) to filename or dataset; all the
+        same size, the first defining the geotransform and projection
+    func : Callable[..., numpy.ndarray]
+        vectorised function of the named input arrays
+    dst : str, optional
+        output GTiff, by default a new /vsimem/ file
+    datatype : int, optional
+        gdal data type, by default the largest input type as gdal_calc
+    nodata : float, optional
+        output nodata, by default the gdal_calc default for the type
+    window : int, optional
+        window size in pixels, by default RASTER_CALC_WINDOW
+
+    Returns
+    -------
+    str
+        output filename; /vsimem/ outputs are the caller's to gdal.Unlink
+    """
+    datasets = {
+        name: gdal.Open(src) if isinstance(src, str) else src
+        for name, src in inputs.items()
+    }
+    bands = {name: ds.GetRasterBand(1) for name, ds in datasets.items()}
+    ref = next(iter(datasets.values()))
+    cols, rows = ref.RasterXSize, ref.RasterYSize
+
+    for name, ds in datasets.items():
+        if (ds.RasterXSize, ds.RasterYSize) != (cols, rows):
+            raise ValueError(f"Input {name} size differs from {cols}x{rows}")
+
+    if datatype is None:
+        datatype = max(band.DataType for band in bands.values())
+    if nodata is None:
+        nodata = DEFAULT_NODATA.get(datatype)
+    nodata_in = {name: band.GetNoDataValue() for name, band in bands.items()}
+
+    dst = dst or f"/vsimem/{uuid.uuid4().hex}.tif"
+    out_ds = gdal.GetDriverByName("GTiff").Create(
+        dst, cols, rows, 1, datatype, options=["TILED=YES"]
+    )
+    out_ds.SetGeoTransform(ref.GetGeoTransform())
+    out_ds.SetProjection(ref.GetProjection())
+    out_band = out_ds.GetRasterBand(1)
+    if nodata is not None:
+        out_band.SetNoDataValue(nodata)
+
+    try:
+        for xoff, yoff, xsize, ysize in windows(cols, rows, window):
+            arrays = {
+                name: band.ReadAsArray(xoff, yoff, xsize, ysize)
+                for name, band in bands.items()
+            }
+            result = apply(arrays, func, nodata_in, nodata)
+
+            # GDAL converts to the output type (rounding) as gdal_calc
+            out_band.WriteArray(result, xoff, yoff)
+    except Exception:
+        out_band = out_ds = None
+        if dst.startswith("/vsimem/"):
+            gdal.Unlink(dst)
+        raise
+    finally:
+        out_band = out_ds = None
+        bands = datasets = ref = None
+
+    return dst
+
+
+def calculate_to_cog(
+    inputs: Dict[str, Union[str, gdal.Dataset]],
+    func: Callable[..., numpy.ndarray],
+    dst: str,
+    datatype: int = None,
+    nodata: float = None,
+    window: int = RASTER_CALC_WINDOW,
+    **kwargs,
+):
+    """`calculate` to /vsimem/ and translate straight to a COG
+
+    Parameters
+    ----------
+    dst : str
+        output COG FQPN
+    **kwargs
+        keyword arguments for cgdal.gdal_translate_w_options
+
+    Returns
+    -------
+    str
+        dst
+    """
+    vsimem = calculate(inputs, func, datatype=datatype, nodata=nodata, window=window)
+    try:
+        cgdal.gdal_translate_w_options(dst, vsimem, **kwargs)
+    finally:
+        gdal.Unlink(vsimem)
+    logger.debug(f"Raster calculation: {list(inputs)} -> {dst}")
+    return dst
@@ -0,0 +1,287 @@
+"""
+# Cached bilinear resampling kernels
+
+Bilinear neighbour indices and weights from a source swath (lon/lat arrays)
+to a target area only depend on the two grids.  They are computed once with
+pyresample, kept in the process and persisted to RESAMPLE_KERNEL_CACHE as
+.npz keyed by a hash of the lon/lat arrays, the target area and the radius,
+so each file only applies the weighted sum.
+
+```
+kernel = resample.bilinear_kernel(lons, lats, target_geometry, 6000)
+resampled = resample.apply_kernel(kernel, data, fill_value=-9999)
+```
+
+For many timesteps `kernel_matrix` expresses the kernel as a sparse
+(target pixels x source pixels) matrix and `apply_kernel_batch` resamples a
+(time, rows, cols) cube with one matrix multiply.
+"""
+
+import hashlib
+import os
+import threading
+import uuid
+from collections import namedtuple
+from pathlib import Path
+
+import numpy
+from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import RESAMPLE_KERNEL_CACHE
+from pyresample import geometry
+from pyresample.bilinear import get_bil_info, get_sample_from_bil_info
+from scipy import sparse
+
+this = os.path.basename(__file__)
+
+BilinearKernel = namedtuple(
+    "BilinearKernel", ["t", "s", "input_idxs", "idx_ref", "shape"]
+)
+"""namedtuple: pyresample get_bil_info output and the target (rows, cols)"""
+
+_kernels = {}
+_kernels_lock = threading.Lock()
+
+
+def kernel_key(lons: numpy.ndarray, lats: numpy.ndarray, area_def, radius: float):
+    """Hash identifying a source swath, target area and radius
+
+    Parameters
+    ----------
+    lons : numpy.ndarray
+        source longitudes
+    lats : numpy.ndarray
+        source latitudes
+    area_def : pyresample.geometry.AreaDefinition
+        target area
+    radius : float
+        neighbour search radius in meters
+
+    Returns
+    -------
+    str
+        hex digest
+    """
+    digest = hashlib.sha256()
+    for arr in (lons, lats):
+        arr = numpy.ascontiguousarray(numpy.ma.getdata(arr), dtype=numpy.float64)
+        digest.update(repr(arr.shape).encode())
+        digest.update(arr.tobytes())
+    digest.update(
+        repr(
+            (area_def.proj_str, area_def.shape, tuple(area_def.area_extent), radius)
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+def _load(path: Path):
+    with numpy.load(path) as npz:
+        return BilinearKernel(
+            npz["t"], npz["s"], npz["input_idxs"], npz["idx_ref"], tuple(npz["shape"])
+        )
+
+
+def _save(path: Path, kernel: BilinearKernel):
+    # write then rename so concurrent workers never read a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}-{uuid.uuid4().hex}.tmp.npz")
+    numpy.savez(tmp, **kernel._asdict())
+    os.replace(tmp, path)
+
+
+def bilinear_kernel(
+    lons: numpy.ndarray,
+    lats: numpy.ndarray,
+    area_def,
+    radius: float,
+    cache_dir: str = RESAMPLE_KERNEL_CACHE,
+):
+    """Bilinear kernel from a swath to an area, from cache when available
+
+    Parameters
+    ----------
+    lons : numpy.ndarray
+        source longitudes
+    lats : numpy.ndarray
+        source latitudes
+    area_def : pyresample.geometry.AreaDefinition
+        target area
+    radius : float
+        neighbour search radius in meters
+    cache_dir : str, optional
+        .npz cache directory, by default RESAMPLE_KERNEL_CACHE
+
+    Returns
+    -------
+    BilinearKernel
+        kernel for `apply_kernel`
+    """
+    key = kernel_key(lons, lats, area_def, radius)
+    with _kernels_lock:
+        if key in _kernels:
+            return _kernels[key]
+
+    path = Path(cache_dir, f"bilinear-{key}.npz")
+    kernel = None
+    if path.exists():
+        try:
+            kernel = _load(path)
+            logger.debug(f"Resampling kernel loaded: {path}")
+        except (OSError, KeyError, ValueError) as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    if kernel is None:
+        source_geometry = geometry.SwathDefinition(lons=lons, lats=lats)
+        t, s, input_idxs, idx_ref = get_bil_info(source_geometry, area_def, radius)
+        kernel = BilinearKernel(t, s, input_idxs, idx_ref, tuple(area_def.shape))
+        try:
+            _save(path, kernel)
+            logger.debug(f"Resampling kernel saved: {path}")
+        except OSError as ex:
+            logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    with _kernels_lock:
+        _kernels[key] = kernel
+    return kernel
+
+
+def apply_kernel(kernel: BilinearKernel, data: numpy.ndarray, fill_value: float):
+    """Resample a 2-D array with a precomputed kernel
+
+    Parameters
+    ----------
+    kernel : BilinearKernel
+        kernel from `bilinear_kernel`
+    data : numpy.ndarray
+        source array, the same shape as the kernel's lon/lat arrays
+    fill_value : float
+        value for target cells without valid neighbours
+
+    Returns
+    -------
+    numpy.ndarray
+        resampled array shaped like the target area
+    """
+    result = get_sample_from_bil_info(
+        data.ravel(),
+        kernel.t,
+        kernel.s,
+        kernel.input_idxs,
+        kernel.idx_ref,
+        output_shape=kernel.shape,
+    )
+    result = numpy.ma.filled(result, numpy.nan)
+    return numpy.where(numpy.isnan(result), fill_value, result)
+
+
+def kernel_matrix(kernel: BilinearKernel, source_size: int):
+    """Sparse bilinear weight matrix for a kernel
+
+    Weights follow pyresample's get_sample_from_bil_info: the four
+    neighbours are weighted (1-s)(1-t), s(1-t), (1-s)t and st.
+
+    Parameters
+    ----------
+    kernel : BilinearKernel
+        kernel from `bilinear_kernel`
+    source_size : int
+        number of source pixels (rows x cols)
+
+    Returns
+    -------
+    Tuple[scipy.sparse.csr_matrix, numpy.ndarray]
+        (target pixels x source pixels) weights and a boolean mask of target
+        pixels without a valid kernel
+    """
+    input_idxs = numpy.asarray(kernel.input_idxs)
+    if input_idxs.dtype == bool:
+        input_idxs = numpy.flatnonzero(input_idxs)
+
+    t = numpy.ma.filled(numpy.ma.asarray(kernel.t, dtype=numpy.float64), numpy.nan)
+    s = numpy.ma.filled(numpy.ma.asarray(kernel.s, dtype=numpy.float64), numpy.nan)
+    t, s = t.ravel(), s.ravel()
+    # neighbour searches mark missing neighbours with the input count
+    idx_ref = numpy.ma.filled(numpy.ma.asarray(kernel.idx_ref), len(input_idxs))
+    invalid = (
+        numpy.isnan(t) | numpy.isnan(s) | (idx_ref >= len(input_idxs)).any(axis=1)
+    )
+    t, s = numpy.where(invalid, 0, t), numpy.where(invalid, 0, s)
+
+    idx_ref = numpy.where(invalid[:, None], 0, idx_ref)
+    cols = input_idxs[idx_ref]
+    weights = numpy.stack(
+        [(1 - s) * (1 - t), s * (1 - t), (1 - s) * t, s * t], axis=1
+    )
+    weights[invalid] = 0
+    rows = numpy.repeat(numpy.arange(len(t)), 4)
+
+    matrix = sparse.csr_matrix(
+        (weights.ravel(), (rows, cols.ravel())), shape=(len(t), source_size)
+    )
+    return matrix, invalid
+
+
+def batch_step_nbytes(matrix):
+    """Bytes `apply_kernel_batch` allocates per timestep
+
+    Counted against the read ceiling with ncread.iter_chunks(step_overhead=)
+    so a slab and its resample fit NETCDF_READ_LIMIT_MB together.
+
+    Parameters
+    ----------
+    matrix : Tuple[scipy.sparse.csr_matrix, numpy.ndarray]
+        `kernel_matrix` output
+
+    Returns
+    -------
+    int
+        bytes per timestep
+    """
+    target_size, source_size = matrix[0].shape
+    # float64 source and its mask; float64 result, range masks, float32 output
+    return source_size * (8 + 1) + target_size * (8 + 3 + 4)
+
+
+def apply_kernel_batch(
+    kernel: BilinearKernel,
+    matrix,
+    cube: numpy.ndarray,
+    fill_value: float,
+):
+    """Resample every timestep of a cube with one sparse matrix multiply
+
+    Parameters
+    ----------
+    kernel : BilinearKernel
+        kernel from `bilinear_kernel`
+    matrix : Tuple[scipy.sparse.csr_matrix, numpy.ndarray]
+        `kernel_matrix` output
+    cube : numpy.ndarray
+        (time, rows, cols) source, masked values treated as missing
+    fill_value : float
+        value for target cells without valid neighbours
+
+    Returns
+    -------
+    numpy.ndarray
+        (time, target rows, target cols) resampled float32
+    """
+    weights, invalid = matrix
+    ntime = cube.shape[0]
+
+    # (source pixels x time); one float64 copy, masked values set in place
+    values = numpy.array(numpy.ma.getdata(cube), dtype=numpy.float64)
+    values[numpy.ma.getmaskarray(cube)] = numpy.nan
+    values = values.reshape(ntime, -1).T
+
+    result = weights @ values
+    result[invalid] = numpy.nan
+
+    # as pyresample, values outside the input range are missing
+    with numpy.errstate(invalid="ignore"):
+        lower, upper = numpy.nanmin(values, axis=0), numpy.nanmax(values, axis=0)
+        result[(result < lower) | (result > upper)] = numpy.nan
+    del values
+
+    result[numpy.isnan(result)] = fill_value
+    return result.T.astype(numpy.float32, order="C").reshape(ntime, *kernel.shape)
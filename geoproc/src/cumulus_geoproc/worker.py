@@ -0,0 +1,341 @@
+"""
+# Long-lived SQS worker
+
+Long-poll the geoprocess queue and hand each message to a process pool
+running `handler.handle_message` and `handler.upload_notify`.  In-flight
+messages have their visibility timeout extended until they finish and
+completed receipts are deleted in batches.  A pool broken by a crashed
+process is replaced; its in-flight messages reappear on the queue.
+
+Usage:
+
+    python -m cumulus_geoproc.worker
+"""
+
+import json
+import os
+import signal
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from tempfile import TemporaryDirectory
+
+from botocore.exceptions import ClientError
+from cumulus_geoproc import logger
+from cumulus_geoproc.configurations import (
+    AWS_REGION_SQS,
+    ENDPOINT_URL_SQS,
+    MAX_Q_MESSAGES,
+    QUEUE_NAME,
+    USE_SSL,
+    VISIBILITY_TIMEOUT,
+    WAIT_TIME_SECONDS,
+    WORKER_PROCESSES,
+    WRITE_TO_BUCKET,
+)
+from cumulus_geoproc.utils import boto
+
+this = os.path.basename(__file__)
+
+# SQS batch APIs accept at most 10 entries per request
+SQS_BATCH_SIZE = 10
+
+
+def process_message(body: str):
+    """Process a single SQS message body in a worker process
+
+    Parameters
+    ----------
+    body : str
+        SQS message body as JSON
+
+    Returns
+    -------
+    list
+        responses from handler.upload_notify
+    """
+    # imported here so the parent process doesn't load GDAL and the plugins
+    from cumulus_geoproc.geoprocess import handler
+
+    payload = json.loads(body)
+    geoprocess = payload["geoprocess"]
+    geoprocess_config = payload["geoprocess_config"]
+    GeoCfg = namedtuple("GeoCfg", geoprocess_config.keys())(**geoprocess_config)
+
+    with TemporaryDirectory() as td:
+        proc_list = handler.handle_message(geoprocess, GeoCfg, td)
+        logger.debug(f"Processed list: {proc_list}")
+        return handler.upload_notify(notices=proc_list, bucket=WRITE_TO_BUCKET)
+
+
+def init_process(processes: int):
+    """Pool process initializer sharing GDAL's cores and cache with the pool
+
+    Forked processes inherit the parent's SIGTERM/SIGINT handlers (Worker.stop);
+    they are reset so a stop only drains the parent and a terminal Ctrl-C
+    doesn't interrupt the messages being drained.
+
+    Parameters
+    ----------
+    processes : int
+        pool size
+    """
+    from cumulus_geoproc.utils import cgdal
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    cgdal.configure_gdal(processes=processes)
+
+
+def batches(entries: list, size: int = SQS_BATCH_SIZE):
+    """Split a list into lists of at most size elements
+
+    Parameters
+    ----------
+    entries : list
+        list to split
+    size : int, optional
+        maximum batch size, by default SQS_BATCH_SIZE
+
+    Yields
+    ------
+    list
+        batch of entries
+    """
+    for i in range(0, len(entries), size):
+        yield entries[i : i + size]
+
+
+class Worker:
+    """SQS worker keeping up to `processes` messages in flight
+
+    Parameters
+    ----------
+    queue : sqs.Queue
+        boto3 SQS queue resource
+    processes : int, optional
+        process pool size, by default WORKER_PROCESSES
+    visibility_timeout : int, optional
+        seconds messages stay hidden, by default VISIBILITY_TIMEOUT
+    """
+
+    def __init__(
+        self,
+        queue,
+        processes: int = WORKER_PROCESSES,
+        visibility_timeout: int = VISIBILITY_TIMEOUT,
+    ):
+        self.queue = queue
+        self.processes = max(1, processes)
+        self.visibility_timeout = visibility_timeout
+        # extend visibility at half the timeout so messages never reappear
+        self.extend_interval = max(1, visibility_timeout // 2)
+        self.in_flight = {}
+        self.running = True
+
+    def __repr__(self) -> str:
+        return f"{__class__.__name__}({self.queue.url}, {self.processes})"
+
+    def stop(self, *args):
+        """Stop receiving messages; in-flight messages are drained"""
+        logger.info("Stopping worker after in-flight messages complete")
+        self.running = False
+
+    def pool(self):
+        """New process pool for the worker
+
+        Returns
+        -------
+        ProcessPoolExecutor
+            pool of `processes` initialized with `init_process`
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=init_process,
+            initargs=(self.processes,),
+        )
+
+    def receive(self, executor: ProcessPoolExecutor):
+        """Receive messages for free pool slots and submit them
+
+        Parameters
+        ----------
+        executor : ProcessPoolExecutor
+            process pool
+
+        Raises
+        ------
+        BrokenProcessPool
+            the pool can't take work; messages not submitted are released
+        """
+        slots = min(self.processes - len(self.in_flight), MAX_Q_MESSAGES)
+        if slots <= 0:
+            return
+
+        # don't block on a long poll while other messages need attention
+        wait_time = 0 if self.in_flight else WAIT_TIME_SECONDS
+
+        messages = self.queue.receive_messages(
+            MaxNumberOfMessages=min(slots, SQS_BATCH_SIZE),
+            WaitTimeSeconds=wait_time,
+            VisibilityTimeout=self.visibility_timeout,
+        )
+        for i, message in enumerate(messages):
+            logger.debug(f"Received message: {message.message_id}")
+            try:
+                future = executor.submit(process_message, message.body)
+            except BrokenProcessPool:
+                self.release(messages[i:])
+                raise
+            self.in_flight[future] = message
+
+    def change_visibility(self, messages: list, timeout: int):
+        """Set the visibility timeout of messages in batches
+
+        Parameters
+        ----------
+        messages : list
+            list of sqs.Message
+        timeout : int
+            seconds from now the messages stay hidden
+        """
+        for batch in batches(messages):
+            entries = [
+                {
+                    "Id": str(i),
+                    "ReceiptHandle": message.receipt_handle,
+                    "VisibilityTimeout": timeout,
+                }
+                for i, message in enumerate(batch)
+            ]
+            try:
+                resp = self.queue.change_message_visibility_batch(Entries=entries)
+                for failed in resp.get("Failed", []):
+                    logger.warning(f"Visibility not changed: {failed}")
+            except ClientError as ex:
+                logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    def extend_visibility(self, messages: list):
+        """Extend the visibility timeout of messages still processing
+
+        Parameters
+        ----------
+        messages : list
+            list of sqs.Message
+        """
+        self.change_visibility(messages, self.visibility_timeout)
+
+    def release(self, messages: list):
+        """Make messages visible again for another receive
+
+        Parameters
+        ----------
+        messages : list
+            list of sqs.Message
+        """
+        self.change_visibility(messages, 0)
+
+    def delete(self, messages: list):
+        """Batch delete completed messages
+
+        Parameters
+        ----------
+        messages : list
+            list of sqs.Message
+        """
+        for batch in batches(messages):
+            entries = [
+                {"Id": str(i), "ReceiptHandle": message.receipt_handle}
+                for i, message in enumerate(batch)
+            ]
+            try:
+                resp = self.queue.delete_messages(Entries=entries)
+                for failed in resp.get("Failed", []):
+                    logger.warning(f"Message not deleted: {failed}")
+            except ClientError as ex:
+                logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+
+    def collect(self, timeout: float):
+        """Wait for messages to complete and delete their receipts
+
+        Messages raising an exception are not deleted and reappear
+        when their visibility timeout expires, including those lost with a
+        broken pool; a crashing message isn't retried straight away.
+
+        Parameters
+        ----------
+        timeout : float
+            seconds to wait for at least one message to complete
+        """
+        if not self.in_flight:
+            return
+
+        done, _ = wait(self.in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        completed = []
+        for future in done:
+            message = self.in_flight.pop(future)
+            try:
+                resp = future.result()
+                logger.debug(f"Message {message.message_id} response: {resp}")
+                completed.append(message)
+            except Exception as ex:
+                logger.error(
+                    f"{type(ex).__name__}: {this}: {ex} - message: {message.body}"
+                )
+
+        self.delete(completed)
+
+    def run(self):
+        """Poll the queue until stopped, then drain in-flight messages"""
+        logger.info(f"Starting {self}")
+        last_extended = time.monotonic()
+
+        executor = self.pool()
+        try:
+            while self.running or self.in_flight:
+                if self.running:
+                    try:
+                        self.receive(executor)
+                    except ClientError as ex:
+                        logger.warning(f"{type(ex).__name__}: {this}: {ex}")
+                    except BrokenProcessPool as ex:
+                        # a process died; in-flight futures fail with the
+                        # same error and reappear after their timeout
+                        logger.error(f"{type(ex).__name__}: {this}: {ex}")
+                        for future in self.in_flight:
+                            future.cancel()
+                        executor.shutdown(wait=False)
+                        executor = self.pool()
+
+                if not self.in_flight:
+                    continue
+
+                self.collect(timeout=1 if self.running else self.extend_interval)
+
+                if time.monotonic() - last_extended >= self.extend_interval:
+                    self.extend_visibility(list(self.in_flight.values()))
+                    last_extended = time.monotonic()
+        finally:
+            executor.shutdown(wait=True)
+
+
+def main():
+    """Start the worker on the configured queue"""
+    sqs = boto.boto3_resource(
+        service_name="sqs",
+        endpoint_url=ENDPOINT_URL_SQS,
+        region_name=AWS_REGION_SQS,
+        use_ssl=USE_SSL,
+    )
+    queue = sqs.get_queue_by_name(QueueName=QUEUE_NAME)
+
+    worker = Worker(queue)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import hashlib
 from datetime import datetime
 from pathlib import Path
 
+import pytest
 from osgeo import gdal
 
 from cumulus_geoproc.processors import geo_proc
@@ -16,6 +17,13 @@ from ..conftest import REPO_ROOT, OUTPUT_PRODUCTS
 gdal.UseExceptions()
 
 
+@pytest.fixture(autouse=True)
+def validate_every_cog(monkeypatch):
+    """Full COG validation regardless of COG_VALIDATION in the environment"""
+    monkeypatch.setattr(cgdal, "COG_VALIDATION", "always")
+    monkeypatch.setattr(cgdal, "COG_VALIDATOR", "full")
+
+
 def test_file_exists(products):
     """Test file exists"""
     for prod in products:
@@ -0,0 +1,266 @@
+"""
+Unit test methods for cumulus_geoproc.utils.cgdal raster helpers
+"""
+
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+from osgeo import gdal
+
+from cumulus_geoproc.utils import cgdal
+
+gdal.UseExceptions()
+
+NODATA = -9999
+
+
+def mem_dataset(array: numpy.ndarray, nodata: float = NODATA):
+    """In memory single band dataset with a geotransform"""
+    rows, cols = array.shape
+    ds = gdal.GetDriverByName("MEM").Create(
+        "", cols, rows, 1, gdal.GetDataTypeByName(array.dtype.name.capitalize())
+    )
+    ds.SetGeoTransform((-100.0, 1.0, 0.0, 40.0, 0.0, -1.0))
+    band = ds.GetRasterBand(1)
+    band.SetNoDataValue(nodata)
+    band.WriteArray(array)
+    return ds
+
+
+def test_fill_nodata(tmp_path):
+    """test_fill_nodata"""
+    array = numpy.full((32, 32), 5, dtype=numpy.int16)
+    array[10:12, 10:12] = NODATA
+
+    tif = cgdal.fill_nodata(mem_dataset(array), str(tmp_path / "fill.tif"), 4)
+
+    filled = gdal.Open(tif).GetRasterBand(1).ReadAsArray()
+    assert (filled == 5).all()
+
+
+def test_fill_nodata_executor(tmp_path):
+    """test_fill_nodata_executor"""
+    array = numpy.full((32, 32), 5, dtype=numpy.int16)
+    array[0, 0] = NODATA
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            cgdal.fill_nodata(
+                mem_dataset(array), str(tmp_path / f"fill-{md}.tif"), md, executor=executor
+            )
+            for md in (0, 4)
+        ]
+        no_fill, fill = [gdal.Open(f.result()) for f in futures]
+
+    assert no_fill.GetRasterBand(1).ReadAsArray()[0, 0] == NODATA
+    assert fill.GetRasterBand(1).ReadAsArray()[0, 0] == 5
+
+
+def test_translate_bands(tmp_path):
+    """test_translate_bands"""
+    ds = gdal.GetDriverByName("MEM").Create("", 16, 16, 3, gdal.GDT_Float32)
+    ds.SetGeoTransform((-100.0, 1.0, 0.0, 40.0, 0.0, -1.0))
+    for b in range(1, 4):
+        band = ds.GetRasterBand(b)
+        band.SetNoDataValue(-b)
+        band.WriteArray(numpy.full((16, 16), b, dtype=numpy.float32))
+
+    outfiles = {
+        b: {"file": str(tmp_path / f"band{b}.tif"), "datetime": b} for b in (3, 9, 2)
+    }
+    # band 9 doesn't exist; only that band fails
+    written = cgdal.translate_bands(ds, outfiles, max_workers=1)
+
+    assert [o["datetime"] for o in written] == [2, 3]
+    for b in (2, 3):
+        band = gdal.Open(outfiles[b]["file"]).GetRasterBand(1)
+        assert band.GetNoDataValue() == -b
+        assert (band.ReadAsArray() == b).all()
+
+
+def test_cog_layout_errors():
+    """test_cog_layout_errors"""
+    src = mem_dataset(numpy.ones((1024, 1024), dtype=numpy.int16))
+    try:
+        cgdal.gdal_translate_w_options("/vsimem/cog.tif", src)
+        gdal.Translate("/vsimem/strip.tif", src, format="GTiff")
+
+        assert cgdal.cog_layout_errors("/vsimem/cog.tif") == []
+        errors = cgdal.cog_layout_errors("/vsimem/strip.tif")
+        assert "missing COG ghost header" in errors
+        assert "not tiled" in errors
+    finally:
+        gdal.Unlink("/vsimem/cog.tif")
+        gdal.Unlink("/vsimem/strip.tif")
+
+
+def test_validation_policy():
+    """test_validation_policy"""
+    assert cgdal._validation_due("always")
+    assert not cgdal._validation_due("off")
+    assert cgdal._validation_due("tests-only")
+    assert sum(cgdal._validation_due("sampled:3") for _ in range(9)) == 3
+
+
+def test_use_cog_profile(tmp_path):
+    """test_use_cog_profile"""
+    src = mem_dataset(numpy.ones((64, 64), dtype=numpy.int16))
+
+    with cgdal.use_cog_profile("small"):
+        assert "COMPRESS=ZSTD" in cgdal.cog_creation_options()
+        cgdal.gdal_translate_w_options(tif := str(tmp_path / "small.tif"), src)
+    assert "COMPRESS=ZSTD" not in cgdal.cog_creation_options()
+
+    structure = gdal.Open(tif).GetMetadata("IMAGE_STRUCTURE")
+    assert structure["COMPRESSION"] == "ZSTD"
+
+
+def test_encoder_threads_share_budget(monkeypatch):
+    """test_encoder_threads_share_budget"""
+    monkeypatch.setattr(cgdal, "_thread_budget", 8)
+
+    with cgdal._encoder_threads() as threads:
+        assert threads == 8
+
+    held = []
+    lock = threading.Lock()
+
+    def write(_):
+        with cgdal._encoder_threads() as threads:
+            with lock:
+                held.append(threads)
+                assert sum(held) <= 8
+            time.sleep(0.01)
+            with lock:
+                held.remove(threads)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(write, range(24)))
+    assert cgdal._threads_in_use == 0
+
+    assert cgdal._with_num_threads(["COMPRESS=ZSTD"], 2) == [
+        "COMPRESS=ZSTD",
+        "NUM_THREADS=2",
+    ]
+    assert cgdal._with_num_threads(["NUM_THREADS=ALL_CPUS"], 2) == [
+        "NUM_THREADS=ALL_CPUS"
+    ]
+
+
+def test_overview_levels():
+    """test_overview_levels"""
+    assert cgdal.overview_levels(300, 200) == []
+    assert cgdal.overview_levels(1024, 1024) == [2]
+    assert cgdal.overview_levels(3000, 2000) == [2, 4, 8]
+
+
+def test_translate_w_overviews_unlinks(tmp_path):
+    """test_translate_w_overviews_unlinks"""
+    src = mem_dataset(numpy.ones((1200, 1200), dtype=numpy.float32))
+    before = gdal.ReadDir("/vsimem/") or []
+
+    for resampling in ("gauss", "average"):
+        assert cgdal.gdal_translate_w_overviews(
+            tif := str(tmp_path / f"{resampling}.tif"),
+            src,
+            {"format": "COG", "creationOptions": ["OVERVIEWS=IGNORE_EXISTING"]},
+            resampling=resampling,
+        )
+        assert gdal.Open(tif).GetRasterBand(1).GetOverviewCount() == 2
+
+    assert (gdal.ReadDir("/vsimem/") or []) == before
+
+
+def test_array_to_cog_flip(tmp_path):
+    """test_array_to_cog_flip"""
+    south_up = numpy.arange(64 * 48, dtype=numpy.float32).reshape(64, 48)
+    masked = numpy.ma.masked_equal(south_up, 5)
+
+    tif = cgdal.array_to_cog(
+        masked,
+        (-100.0, 1.0, 0.0, 40.0, 0.0, -1.0),
+        "EPSG:4326",
+        NODATA,
+        str(tmp_path / "flip.tif"),
+        flip=True,
+    )
+
+    band = gdal.Open(tif).GetRasterBand(1)
+    expected = numpy.flipud(south_up)
+    expected[expected == 5] = NODATA
+    numpy.testing.assert_array_equal(band.ReadAsArray(), expected)
+    assert band.GetNoDataValue() == NODATA
+    # the caller's array is untouched
+    assert south_up[0, 5] == 5
+
+
+def test_structural_precheck(tmp_path, monkeypatch):
+    """test_structural_precheck"""
+    monkeypatch.setattr(cgdal, "COG_VALIDATION", "always")
+    monkeypatch.setattr(cgdal, "COG_VALIDATOR", "structural")
+    tif = str(tmp_path / "cog.tif")
+    cgdal.gdal_translate_w_options(
+        tif, mem_dataset(numpy.ones((1024, 1024), dtype=numpy.int16)), validate=True
+    )
+    # checked in /vsimem/ before the copy; validate_cog reports that result
+    assert cgdal._layout_checked[tif] == []
+    assert cgdal.validate_cog("-q", tif) == 0
+    assert tif not in cgdal._layout_checked
+    assert gdal.Open(tif).GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+
+
+def test_structural_sampled_once_per_write(tmp_path, monkeypatch):
+    """test_structural_sampled_once_per_write"""
+    monkeypatch.setattr(cgdal, "COG_VALIDATION", "sampled:2")
+    monkeypatch.setattr(cgdal, "COG_VALIDATOR", "structural")
+    monkeypatch.setattr(cgdal, "_validations", itertools.count())
+    src = mem_dataset(numpy.ones((16, 16), dtype=numpy.int16))
+
+    results = []
+    for i in range(4):
+        tif = str(tmp_path / f"cog-{i}.tif")
+        cgdal.gdal_translate_w_options(tif, src, validate=True)
+        results.append(cgdal.validate_cog("-q", tif))
+
+    assert results == [0, None, 0, None]
+    assert next(cgdal._validations) == 4
+
+    # callers not validating leave nothing behind
+    cgdal.gdal_translate_w_options(str(tmp_path / "plain.tif"), src)
+    assert not cgdal._layout_checked
+
+
+def test_dataset_to_cog_keeps_profile(monkeypatch):
+    """test_dataset_to_cog_keeps_profile"""
+    calls = []
+    monkeypatch.setattr(
+        cgdal, "gdal_translate_w_options", lambda *args, **kwargs: calls.append(kwargs)
+    )
+    monkeypatch.setattr(cgdal, "validate_cog", lambda *args: None)
+
+    cgdal.dataset_to_cog(None, "cog.tif", "deflate", creationOptions=["BLOCKSIZE=256"])
+    cgdal.dataset_to_cog(None, "cog.tif", "deflate")
+
+    assert calls[0]["creationOptions"][0] == "BLOCKSIZE=256"
+    assert "COMPRESS=DEFLATE" in calls[0]["creationOptions"]
+    assert "OVERVIEW_RESAMPLING=BILINEAR" in calls[1]["creationOptions"]
+    assert "COMPRESS=DEFLATE" in calls[1]["creationOptions"]
+
+
+def test_translate_bands_write_oserror(tmp_path, monkeypatch):
+    """test_translate_bands_write_oserror"""
+    write_band_cog = cgdal._write_band_cog
+
+    def full_disk(dst, src, validate=True, **kwargs):
+        if dst.endswith("band1.tif"):
+            raise OSError(28, "No space left on device")
+        return write_band_cog(dst, src, validate, **kwargs)
+
+    monkeypatch.setattr(cgdal, "_write_band_cog", full_disk)
+    ds = mem_dataset(numpy.ones((16, 16), dtype=numpy.int16))
+    outfiles = {1: {"file": str(tmp_path / "band1.tif")}}
+
+    assert cgdal.translate_bands(ds, outfiles) == []
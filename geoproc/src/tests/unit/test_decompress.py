@@ -0,0 +1,64 @@
+"""
+Unit test methods for cumulus_geoproc.utils decompression
+"""
+
+import gzip
+import os
+import tarfile
+
+from cumulus_geoproc import utils
+
+SNODAS_MEMBER = "us_ssmv1{}tS__T0001TTNATS2022010105HP001.{}.gz"
+
+
+def snodas_tar(tmp_path):
+    """Write a SNODAS like tar of gzip members"""
+    tar_file = tmp_path / "SNODAS_20220101.tar"
+    with tarfile.open(tar_file, "w") as tar:
+        for code in ("1025", "1034", "1036"):
+            for ext in ("dat", "txt"):
+                member = tmp_path / SNODAS_MEMBER.format(code, ext)
+                with gzip.open(member, "wb") as fptr:
+                    fptr.write(code.encode() * 100)
+                tar.add(member, arcname=member.name)
+    return str(tar_file)
+
+
+def test_decompress_gzip(tmp_path):
+    """test_decompress_gzip"""
+    src = tmp_path / "product.nc.gz"
+    with gzip.open(src, "wb") as fptr:
+        fptr.write(b"netcdf" * 1000)
+
+    out = utils.decompress(str(src), str(tmp_path), buffer_size=64)
+
+    assert out == str(tmp_path / "product.nc")
+    with open(out, "rb") as fptr:
+        assert fptr.read() == b"netcdf" * 1000
+
+
+def test_decompress_selective_members(tmp_path):
+    """test_decompress_selective_members"""
+    src = snodas_tar(tmp_path)
+    dst = tmp_path / "out"
+    dst.mkdir()
+
+    out = utils.decompress(
+        src, str(dst), recursive=True, members=lambda name: name[8:12] == "1034"
+    )
+
+    files = sorted(f for f in os.listdir(out) if not f.endswith(".gz"))
+    assert files == [
+        "us_ssmv11034tS__T0001TTNATS2022010105HP001.dat",
+        "us_ssmv11034tS__T0001TTNATS2022010105HP001.txt",
+    ]
+
+
+def test_vsi_paths(tmp_path):
+    """test_vsi_paths"""
+    src = snodas_tar(tmp_path)
+
+    paths = utils.vsi_paths(src, members=lambda name: name.endswith(".txt.gz"))
+
+    assert len(paths) == 3
+    assert all(p.startswith(f"/vsigzip//vsitar/{src}/") for p in paths)
@@ -106,3 +106,23 @@ def test_cgdal_find_nbm_qpf_regex():
     band_number = cgdal.band_from_json(gdal_info, attr, True)
 
     assert band_number == band, f"Band number {band_number} != {band}"
+
+
+def test_band_index_find_all():
+    """test_band_index_find_all"""
+    attrs = [
+        {"GRIB_ELEMENT": "QPF01", "GRIB_SHORT_NAME": "0-SFC"},
+        {
+            "GRIB_COMMENT": "Temperature [C]",
+            "GRIB_ELEMENT": "T",
+            "GRIB_SHORT_NAME": "2-HTGL",
+        },
+        {"GRIB_ELEMENT": "NOT_AN_ELEMENT"},
+    ]
+
+    with GDAL_INFO_NBM.open("r", encoding="utf-8") as fptr:
+        gdal_info = json.load(fptr)
+
+    band_index = cgdal.BandIndex.from_json(gdal_info)
+
+    assert band_index.find_all(attrs, anchored=True) == [46, 54, None]
@@ -0,0 +1,152 @@
+"""
+Unit test methods for GRIB2 idx parsing and byte range reads
+"""
+
+import pytest
+from osgeo import gdal
+
+from cumulus_geoproc.utils import gribidx
+
+HRRR_IDX = """\
+88:44918041:d=2022042912:WEASD:surface:0-1 hour acc fcst:
+89:45021811:d=2022042912:APCP:surface:0-1 hour acc fcst:prob >0.254:
+90:45323817:d=2022042912:APCP:surface:0-1 hour acc fcst:
+91:45705230:d=2022042912:FROZR:surface:0-1 hour acc fcst:
+"""
+
+
+def test_parse_idx():
+    """test_parse_idx"""
+    records = gribidx.parse_idx(HRRR_IDX)
+
+    assert len(records) == 4
+    assert records[2].offset == 45323817
+    assert records[2].length == 45705230 - 45323817
+    assert records[1].extra == "prob >0.254"
+    assert records[-1].length is None
+
+
+def test_find_excludes_extra():
+    """test_find_excludes_extra"""
+    records = gribidx.parse_idx(HRRR_IDX)
+
+    record = gribidx.find(
+        records, element="APCP", level="surface", forecast=gribidx.accumulation(1)
+    )
+
+    assert record.message == "90"
+
+
+def test_accumulation():
+    """test_accumulation"""
+    one_hour = gribidx.accumulation(1)
+
+    assert one_hour("5-6 hour acc fcst")
+    assert not one_hour("0-6 hour acc fcst")
+    assert not one_hour("6 hour fcst")
+
+
+def test_read_message(tmp_path):
+    """test_read_message"""
+    src = tmp_path / "hrrr.grib2"
+    src.write_bytes(b"A" * 10 + b"B" * 5 + b"C" * 3)
+    records = gribidx.parse_idx(
+        "1:0:d=2022042912:TMP:surface:anl:\n"
+        "2:10:d=2022042912:APCP:surface:0-1 hour acc fcst:\n"
+        "3:15:d=2022042912:TMP:surface:1 hour fcst:\n"
+    )
+
+    vsimem = gribidx.read_message(str(src), records[1])
+    try:
+        assert gribidx.vsi_read(vsimem) == b"B" * 5
+    finally:
+        gdal.Unlink(vsimem)
+
+
+def grib2_message(fields: int):
+    """Minimal GRIB2 message bytes with `fields` product definitions"""
+    sections = gribidx.GRIB2_SECTION.pack(21, 1) + b"\0" * 16
+    for _ in range(fields):
+        for number in (4, 5, 7):
+            sections += gribidx.GRIB2_SECTION.pack(9, number) + b"\0" * 4
+    length = gribidx.GRIB2_SECTION0.size + len(sections) + len(gribidx.GRIB2_END)
+    return (
+        gribidx.GRIB2_SECTION0.pack(b"GRIB", 0, 2, length)
+        + sections
+        + gribidx.GRIB2_END
+    )
+
+
+def test_scan_grib(tmp_path):
+    """test_scan_grib"""
+    one, two = grib2_message(1), grib2_message(2)
+    src = tmp_path / "fields.grib2"
+    src.write_bytes(one + two)
+
+    assert gribidx.scan_grib(str(src)) == [
+        (0, len(one), 1),
+        (len(one), len(two), 2),
+    ]
+
+
+def test_sub_message_length():
+    """test_sub_message_length"""
+    records = gribidx.parse_idx(
+        "1:0:d=2022042912:TMP:surface:anl:\n"
+        "2.1:10:d=2022042912:UGRD:10 m above ground:anl:\n"
+        "2.2:10:d=2022042912:VGRD:10 m above ground:anl:\n"
+        "3:25:d=2022042912:TMP:surface:1 hour fcst:\n"
+    )
+
+    assert [r.length for r in records] == [10, 15, 15, None]
+
+
+def test_vsi_read_missing(tmp_path):
+    """test_vsi_read_missing"""
+    with pytest.raises(FileNotFoundError):
+        gribidx.vsi_read(str(tmp_path / "missing.grib2"))
+
+
+def test_wgrib2_fields():
+    """test_wgrib2_fields"""
+    ref = 1651233600
+    apcp = {
+        "GRIB_ELEMENT": "APCP01",
+        "GRIB_SHORT_NAME": "0-SFC",
+        "GRIB_REF_TIME": f"{ref} sec UTC",
+        "GRIB_VALID_TIME": f"{ref + 6 * 3600} sec UTC",
+        "GRIB_PDS_PDTN": "8",
+    }
+    assert gribidx.wgrib2_fields(apcp) == (
+        "APCP",
+        "surface",
+        "5-6 hour acc fcst",
+        "",
+    )
+
+    temperature = {
+        **apcp,
+        "GRIB_ELEMENT": "T",
+        "GRIB_SHORT_NAME": "2-HTGL",
+        "GRIB_PDS_PDTN": "0",
+    }
+    element, level, forecast, extra = gribidx.wgrib2_fields(temperature)
+    assert gribidx.find(
+        [gribidx.IdxRecord("1", 0, None, "", element, level, forecast, extra)],
+        element="TMP",
+        level="2 m above ground",
+        forecast=r"\d+ hour fcst",
+    )
+
+    probability = {**apcp, "GRIB_PDS_PDTN": "9"}
+    assert gribidx.wgrib2_fields(probability)[3] == "prob"
+
+
+def test_open_message_without_idx(tmp_path):
+    """test_open_message_without_idx"""
+    src = tmp_path / "hrrr.grib2"
+    src.write_bytes(b"GRIB")
+
+    # no idx next to the source; the caller opens the whole file
+    assert gribidx.open_message(str(src), element="APCP") is None
+    assert not (tmp_path / "hrrr.grib2.idx").exists()
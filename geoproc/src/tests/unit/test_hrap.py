@@ -0,0 +1,46 @@
+"""
+Unit test methods for cumulus_geoproc.utils.hrap
+"""
+
+import numpy
+
+from cumulus_geoproc.utils import hrap
+
+CNRFC_META = {
+    "qpe_grid#gridPointLL": "{1,1}",
+    "qpe_grid#gridPointUR": "{101,51}",
+    "qpe_grid#domainExtent": "{100,50}",
+    "qpe_grid#latLonLL": "{-119.036,23.097}",
+    "qpe_grid#latLonUR": "{-117.0,25.0}",
+}
+
+
+def test_hrap_lonlat_round_trip():
+    """test_hrap_lonlat_round_trip"""
+    # HRAP (1, 1) is the grid's documented origin near 23.097N 119.036W
+    lon, lat = hrap.hrap_to_lonlat(1, 1)
+    assert abs(lon - -119.036) < 1e-3 and abs(lat - 23.097) < 1e-3
+
+    x, y = numpy.meshgrid(numpy.arange(1, 1121, 40.0), numpy.arange(1, 881, 40.0))
+    lon, lat = hrap.hrap_to_lonlat(x, y)
+    hx, hy = hrap.lonlat_to_hrap(lon, lat)
+    numpy.testing.assert_allclose(hx, x, atol=1e-6)
+    numpy.testing.assert_allclose(hy, y, atol=1e-6)
+
+
+def test_grid_registry_cached():
+    """test_grid_registry_cached"""
+    hrap_grid, corners = hrap.from_metadata(CNRFC_META, "qpe_grid")
+    again, _ = hrap.from_metadata(dict(CNRFC_META), "qpe_grid")
+
+    assert again is hrap_grid
+    assert corners == (-119.036, 23.097, -117.0, 25.0)
+    assert hrap_grid.geotransform == (
+        hrap.ster_x(1),
+        hrap.MESH,
+        0,
+        hrap.ster_y(51),
+        0,
+        -hrap.MESH,
+    )
+    assert (hrap_grid.ncols, hrap_grid.nrows) == (100, 50)
@@ -0,0 +1,47 @@
+"""
+Unit test methods for cumulus_geoproc.utils.ncread
+"""
+
+import numpy
+import pytest
+
+netCDF4 = pytest.importorskip("netCDF4")
+
+from cumulus_geoproc.utils import ncread
+
+
+def test_iter_chunks_aligned_and_bounded(tmp_path):
+    """test_iter_chunks_aligned_and_bounded"""
+    data = numpy.arange(10 * 20 * 30, dtype=numpy.float32).reshape(10, 20, 30)
+    with netCDF4.Dataset(tmp_path / "cube.nc", "w") as ncds:
+        for name, size in zip(("time", "y", "x"), data.shape):
+            ncds.createDimension(name, size)
+        var = ncds.createVariable(
+            "var", "f4", ("time", "y", "x"), chunksizes=(2, 20, 30)
+        )
+        var[:] = data
+
+    with netCDF4.Dataset(tmp_path / "cube.nc", "r") as ncds:
+        var = ncds.variables["var"]
+        # 1 MiB holds many steps; bounded to a multiple of the chunk length
+        assert ncread.chunk_steps(var, limit_mb=1, max_steps=5) == 4
+        assert ncread.chunk_steps(var, limit_mb=1) == 10
+        # below the chunk length reads slice within a chunk
+        assert ncread.chunk_steps(var, limit_mb=1, max_steps=1) == 1
+        # working memory per step counts against the limit
+        assert ncread.chunk_steps(var, limit_mb=1, step_overhead=346_525) == 2
+        assert ncread.chunk_steps(var, limit_mb=1, step_overhead=600_000) == 1
+
+        index = (slice(1, -1), slice(1, -1))
+        chunks = list(ncread.iter_chunks(var, index, limit_mb=1, max_steps=4))
+        assert [start for start, _ in chunks] == [0, 4, 8]
+        numpy.testing.assert_array_equal(
+            numpy.concatenate([chunk for _, chunk in chunks]), data[:, 1:-1, 1:-1]
+        )
+
+        steps = list(ncread.iter_steps(var))
+        assert [i for i, _ in steps] == list(range(10))
+
+        chunks = list(ncread.iter_chunks(var, limit_mb=1, max_steps=3))
+        assert [len(chunk) for _, chunk in chunks] == [2] * 5
+        numpy.testing.assert_array_equal(steps[7][1], data[7])
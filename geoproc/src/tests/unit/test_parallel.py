@@ -0,0 +1,44 @@
+"""
+Unit test methods for cumulus_geoproc.utils.parallel
+"""
+
+import threading
+import time
+
+import numpy
+from osgeo import gdal
+
+from cumulus_geoproc.utils.parallel import parallel_map
+
+gdal.UseExceptions()
+
+
+def test_parallel_map_order_and_errors():
+    """test_parallel_map_order_and_errors"""
+
+    def func(item):
+        if item == 3:
+            raise ValueError("bad item")
+        # finish out of order
+        time.sleep(0.01 * (5 - item))
+        return item * 10
+
+    assert parallel_map(func, range(5), max_workers=4) == [0, 10, 20, 40]
+
+
+def test_parallel_map_handle_per_thread(tmp_path):
+    """test_parallel_map_handle_per_thread"""
+    tif = str(tmp_path / "bands.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(tif, 8, 8, 4, gdal.GDT_Byte)
+    for b in range(1, 5):
+        ds.GetRasterBand(b).Fill(b)
+    ds = None
+
+    handles = {}
+
+    def func(ds, band):
+        handles.setdefault(threading.get_ident(), set()).add(id(ds))
+        return int(numpy.unique(ds.GetRasterBand(band).ReadAsArray())[0])
+
+    assert parallel_map(func, [4, 3, 2, 1], src=tif, max_workers=2) == [4, 3, 2, 1]
+    assert all(len(ids) == 1 for ids in handles.values())
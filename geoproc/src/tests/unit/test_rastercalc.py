@@ -0,0 +1,66 @@
+"""
+Unit test methods for cumulus_geoproc.utils.rastercalc
+"""
+
+import numpy
+from osgeo import gdal
+
+from cumulus_geoproc.utils import rastercalc
+
+from .test_cgdal import NODATA, mem_dataset
+
+gdal.UseExceptions()
+
+
+def test_calculate_windows_and_nodata():
+    """test_calculate_windows_and_nodata"""
+    swe = numpy.arange(50 * 70, dtype=numpy.int16).reshape(50, 70)
+    swe[3, 4] = NODATA
+    temp = numpy.full((50, 70), 283, dtype=numpy.int16)
+
+    out = rastercalc.calculate(
+        {"A": mem_dataset(swe), "B": mem_dataset(temp)},
+        lambda A, B: A.astype(numpy.float32) * (B - 273),
+        datatype=gdal.GDT_Float32,
+        window=16,
+    )
+    try:
+        band = gdal.Open(out).GetRasterBand(1)
+        result = band.ReadAsArray()
+        nodata = band.GetNoDataValue()
+    finally:
+        gdal.Unlink(out)
+
+    assert result[3, 4] == numpy.float32(nodata)
+    assert result[49, 69] == swe[49, 69] * 10
+    assert result[0, 1] == 10
+
+
+def test_calculate_to_cog(tmp_path):
+    """test_calculate_to_cog"""
+    snowmelt = numpy.full((20, 20), 200_000, dtype=numpy.int32)
+    tif = str(tmp_path / "snowmelt_mm.tif")
+
+    rastercalc.calculate_to_cog(
+        {"A": mem_dataset(snowmelt)},
+        lambda A: A.astype(numpy.float32) / 100_000 * 1000,
+        tif,
+    )
+
+    assert (gdal.Open(tif).GetRasterBand(1).ReadAsArray() == 2000).all()
+    assert not gdal.ReadDir("/vsimem/")
+
+
+def test_apply_in_memory():
+    """test_apply_in_memory"""
+    swe = numpy.array([[10, NODATA], [30, 40]], dtype=numpy.int16)
+    temp = numpy.array([[283, 283], [-9999, 263]], dtype=numpy.int16)
+
+    result = rastercalc.apply(
+        {"A": swe, "B": temp},
+        lambda A, B: A * (B.astype(numpy.float32) - 273),
+        {"A": NODATA, "B": -9999},
+        -32768,
+    )
+
+    assert result.tolist() == [[100, -32768], [-32768, -400]]
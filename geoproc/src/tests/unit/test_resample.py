@@ -0,0 +1,73 @@
+"""
+Unit test methods for cumulus_geoproc.utils.resample
+"""
+
+import numpy
+import pytest
+
+pytest.importorskip("pyresample")
+pytest.importorskip("scipy")
+
+from pyresample import geometry
+from pyresample.bilinear import NumpyBilinearResampler
+
+from cumulus_geoproc.utils import resample
+
+
+def grids():
+    """Small lon/lat swath and a target area covering it"""
+    lons, lats = numpy.meshgrid(
+        numpy.linspace(-120.0, -119.0, 40), numpy.linspace(46.0, 45.0, 40)
+    )
+    area = geometry.AreaDefinition(
+        "test",
+        "test",
+        "test",
+        "+proj=longlat +datum=WGS84 +no_defs",
+        20,
+        20,
+        (-119.9, 45.1, -119.1, 45.9),
+    )
+    return lons, lats, area
+
+
+def test_bilinear_kernel_cached(tmp_path, monkeypatch):
+    """test_bilinear_kernel_cached"""
+    monkeypatch.setattr(resample, "_kernels", {})
+    lons, lats, area = grids()
+    data = numpy.arange(lons.size, dtype=numpy.float32).reshape(lons.shape)
+
+    kernel = resample.bilinear_kernel(lons, lats, area, 10000, cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("bilinear-*.npz"))) == 1
+
+    # a new process loads the kernel from disk
+    monkeypatch.setattr(resample, "_kernels", {})
+    cached = resample.bilinear_kernel(lons, lats, area, 10000, cache_dir=tmp_path)
+    assert numpy.array_equal(cached.idx_ref, kernel.idx_ref)
+
+    expected = NumpyBilinearResampler(
+        geometry.SwathDefinition(lons=lons, lats=lats), area, 10000
+    ).resample(data, fill_value=-9999)
+    numpy.testing.assert_allclose(
+        resample.apply_kernel(cached, data, -9999), expected, rtol=1e-5
+    )
+
+
+def test_apply_kernel_batch(tmp_path, monkeypatch):
+    """test_apply_kernel_batch"""
+    monkeypatch.setattr(resample, "_kernels", {})
+    lons, lats, area = grids()
+    kernel = resample.bilinear_kernel(lons, lats, area, 10000, cache_dir=tmp_path)
+    weights = resample.kernel_matrix(kernel, lons.size)
+
+    rng = numpy.random.default_rng(0)
+    cube = numpy.ma.masked_array(
+        rng.random((3, *lons.shape), dtype=numpy.float32),
+        mask=rng.random((3, *lons.shape)) < 0.05,
+    )
+    batch = resample.apply_kernel_batch(kernel, weights, cube, -9999)
+
+    for step, data in enumerate(cube):
+        numpy.testing.assert_allclose(
+            batch[step], resample.apply_kernel(kernel, data, -9999), rtol=1e-5
+        )
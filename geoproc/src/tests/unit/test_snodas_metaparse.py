@@ -0,0 +1,73 @@
+"""
+Unit test methods for cumulus_geoproc.geoprocess.snodas.metaparse
+"""
+
+import os
+
+import numpy
+from osgeo import gdal
+
+from cumulus_geoproc.geoprocess.snodas import metaparse
+
+gdal.UseExceptions()
+
+METADATA = """Data file pathname: us_ssmv11034tS__T0001TTNATS2022010105HP001.dat
+Number of columns: 4
+Number of rows: 3
+No data value: -9999
+Horizontal datum: WGS84
+Minimum x-axis coordinate: -124.733749999998
+Maximum x-axis coordinate: -124.700416666665
+Minimum y-axis coordinate: 52.8462499999980
+Maximum y-axis coordinate: 52.8712499999980
+"""
+
+
+def write_snodas(directory):
+    txt = os.path.join(directory, "us_ssmv11034tS__T0001TTNATS2022010105HP001.txt")
+    with open(txt, "w") as fh:
+        fh.write(METADATA)
+    array = numpy.arange(12, dtype=">i2").reshape(3, 4)
+    array[1, 2] = -9999
+    array.tofile(txt.replace(".txt", ".dat"))
+    return txt, array
+
+
+def test_open_dat_without_hdr(tmp_path):
+    """test_open_dat_without_hdr"""
+    txt, expected = write_snodas(str(tmp_path))
+
+    ds, array = metaparse.open_dat(txt)
+    try:
+        band = ds.GetRasterBand(1)
+        assert band.ReadAsArray().tolist() == expected.tolist()
+        assert band.GetNoDataValue() == -9999
+        minx, xres, _, maxy, _, yres = ds.GetGeoTransform()
+        assert (minx, maxy) == (-124.733749999998, 52.8712499999980)
+        assert numpy.isclose(xres, 0.00833333333)
+        assert numpy.isclose(yres, -0.00833333333)
+        assert ds.GetDriver().ShortName == "VRT"
+        assert array.dtype == metaparse.DAT_DTYPE
+        assert array.tolist() == expected.tolist()
+    finally:
+        ds = None
+
+    assert not any(f.endswith(".hdr") for f in os.listdir(tmp_path))
+
+
+def test_parse_schema_and_extras(tmp_path):
+    """test_parse_schema_and_extras"""
+    txt, _ = write_snodas(str(tmp_path))
+    with open(txt, "a") as fh:
+        fh.write("Data units: Meters / 1000.000\nData bytes per pixel: 2\n")
+
+    metadata = metaparse.parse(txt)
+    assert metadata.number_of_columns == 4
+    assert metadata.no_data_value == -9999.0
+    assert metadata.stop_hour is None
+    assert metadata.data_bytes_per_pixel == 2
+    assert metadata.data_units == "Meters / 1000.000"
+
+    assert metaparse.to_dictionary(txt) == metadata._asdict()
+    assert list(metadata._asdict())[0] == "data_file_pathname"
+    assert metaparse.to_dictionary(str(tmp_path / "missing.txt")) is None
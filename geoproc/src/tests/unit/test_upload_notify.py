@@ -0,0 +1,81 @@
+"""
+Unit test methods for uploading and notifying processed products
+"""
+
+import asyncio
+
+import httpx
+
+from cumulus_geoproc.geoprocess import handler
+from cumulus_geoproc.utils import boto, capi
+
+
+def test_upload_notify_partial_success(monkeypatch):
+    """test_upload_notify_partial_success"""
+    posted = []
+
+    def s3_upload_file(file_name, bucket, key=None):
+        return not file_name.endswith("fail.tif")
+
+    async def post_(self, url, payload):
+        posted.extend(payload)
+        return payload
+
+    monkeypatch.setattr(boto, "s3_upload_file", s3_upload_file)
+    monkeypatch.setattr(capi.CumulusAPI, "post_", post_)
+    monkeypatch.setattr(handler, "_notify", None)
+
+    notices = [
+        {"filetype": "nbm-co-airtemp", "file": f"/tmp/{name}.tif"}
+        for name in ("a", "fail", "b")
+    ]
+    responses = handler.upload_notify(notices, "castle-data-develop")
+
+    keys = [r["key"] for r in responses if "key" in r]
+    assert keys == [
+        "cumulus/products/nbm-co-airtemp/a.tif",
+        "cumulus/products/nbm-co-airtemp/b.tif",
+    ]
+    assert [p["file"] for p in posted] == keys
+    # one response per notification POST, as returned by post_
+    assert [r["upload"] for r in responses if "upload" in r] == [posted]
+
+
+def test_post_chunked(monkeypatch):
+    """test_post_chunked"""
+    batches = []
+
+    async def post_(self, url, payload):
+        batches.append(payload)
+        return len(payload)
+
+    monkeypatch.setattr(capi.CumulusAPI, "post_", post_)
+
+    cumulus_api = capi.CumulusAPI("http://api:80")
+    resp = asyncio.run(
+        cumulus_api.post_chunked(cumulus_api.url, list(range(25)), chunk_size=10)
+    )
+
+    assert resp == [10, 10, 5]
+    assert sorted(len(b) for b in batches) == [5, 10, 10]
+    assert cumulus_api.client is None
+
+
+def test_request_retries_idempotent_only():
+    """test_request_retries_idempotent_only"""
+    calls = []
+
+    def respond(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    async def send(method):
+        cumulus_api = capi.CumulusAPI("http://api:80", retries=2, backoff=0)
+        cumulus_api.client = httpx.AsyncClient(transport=httpx.MockTransport(respond))
+        async with cumulus_api:
+            return await cumulus_api.request_(method, cumulus_api.url)
+
+    assert asyncio.run(send("GET")).status_code == 503
+    assert asyncio.run(send("POST")).status_code == 503
+    # the notification POST is not idempotent and is sent once
+    assert calls == ["GET", "GET", "GET", "POST"]
@@ -0,0 +1,71 @@
+"""
+Unit test methods opening acquirables as GDAL virtual sources from a local
+S3 stand-in (moto server)
+"""
+
+import numpy
+import pytest
+from osgeo import gdal
+
+from cumulus_geoproc.utils import cgdal
+
+moto_server = pytest.importorskip("moto.server")
+
+BUCKET = "castle-data-develop"
+KEY = "cumulus/acquirables/test/grid.tif"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint(tmp_path_factory):
+    """Serve a small GeoTIFF from a moto S3 server"""
+    import boto3
+
+    server = moto_server.ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = f"http://{host}:{port}"
+
+    src = str(tmp_path_factory.mktemp("vsis3") / "grid.tif")
+    ds = gdal.GetDriverByName("GTiff").Create(src, 16, 8, 1, gdal.GDT_Int16)
+    ds.SetGeoTransform((-100, 1, 0, 40, 0, -1))
+    ds.GetRasterBand(1).WriteArray(numpy.arange(128, dtype=numpy.int16).reshape(8, 16))
+    ds = None
+
+    s3 = boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+    s3.create_bucket(Bucket=BUCKET)
+    s3.upload_file(src, BUCKET, KEY)
+
+    gdal.SetConfigOption("AWS_ACCESS_KEY_ID", "testing")
+    gdal.SetConfigOption("AWS_SECRET_ACCESS_KEY", "testing")
+    cgdal.configure_vsis3(endpoint_url)
+    gdal.SetConfigOption("AWS_VIRTUAL_HOSTING", "FALSE")
+
+    yield endpoint_url
+
+    server.stop()
+
+
+def test_openfile_vsis3_read_only(s3_endpoint, tmp_path):
+    """test_openfile_vsis3_read_only"""
+    ds, _, _ = cgdal.openfileGDAL(f"/vsis3/{BUCKET}/{KEY}", str(tmp_path))
+
+    # update access on a virtual source is an in-memory VRT
+    assert ds.GetDriver().ShortName == "VRT"
+    ds.SetGeoTransform((0, 1, 0, 0, 0, -1))
+    assert ds.GetRasterBand(1).ReadAsArray()[7, 15] == 127
+    ds = None
+
+
+def test_vsis3_translate(s3_endpoint, tmp_path):
+    """test_vsis3_translate"""
+    tif = str(tmp_path / "grid-cog.tif")
+
+    cgdal.gdal_translate_w_options(tif, f"/vsis3/{BUCKET}/{KEY}")
+
+    assert gdal.Open(tif).GetRasterBand(1).Checksum() > 0
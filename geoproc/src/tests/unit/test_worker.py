@@ -0,0 +1,76 @@
+"""
+Unit test methods for the cumulus-geoproc SQS worker
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from cumulus_geoproc import worker
+
+
+class FakeQueue:
+    """Minimal stand-in for a boto3 SQS queue recording batch calls"""
+
+    url = "http://elasticmq:9324/queue/test"
+
+    def __init__(self):
+        self.deleted = []
+        self.extended = []
+
+    def delete_messages(self, Entries):
+        self.deleted.append(Entries)
+        return {"Successful": Entries}
+
+    def change_message_visibility_batch(self, Entries):
+        self.extended.append(Entries)
+        return {"Successful": Entries}
+
+
+def test_batches():
+    """test_batches"""
+    batches = list(worker.batches(list(range(23))))
+
+    assert [len(b) for b in batches] == [10, 10, 3]
+
+
+def test_delete_in_batches():
+    """test_delete_in_batches"""
+    queue = FakeQueue()
+    messages = [SimpleNamespace(receipt_handle=f"rh-{i}") for i in range(12)]
+
+    worker.Worker(queue, processes=2).delete(messages)
+
+    assert [len(e) for e in queue.deleted] == [10, 2]
+    assert queue.deleted[1][1]["ReceiptHandle"] == "rh-11"
+
+
+def test_extend_visibility():
+    """test_extend_visibility"""
+    queue = FakeQueue()
+    messages = [SimpleNamespace(receipt_handle="rh-0")]
+
+    worker.Worker(queue, visibility_timeout=120).extend_visibility(messages)
+
+    assert queue.extended[0][0]["VisibilityTimeout"] == 120
+
+
+def test_receive_broken_pool_releases():
+    """test_receive_broken_pool_releases"""
+
+    class BrokenPool:
+        def submit(self, *args):
+            raise worker.BrokenProcessPool("process died")
+
+    queue = FakeQueue()
+    queue.receive_messages = lambda **kwargs: [
+        SimpleNamespace(message_id=f"m-{i}", body="{}", receipt_handle=f"rh-{i}")
+        for i in range(2)
+    ]
+    wrkr = worker.Worker(queue, processes=2)
+
+    with pytest.raises(worker.BrokenProcessPool):
+        wrkr.receive(BrokenPool())
+
+    assert not wrkr.in_flight
+    assert [e["VisibilityTimeout"] for e in queue.extended[0]] == [0, 0]